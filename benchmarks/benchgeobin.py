@@ -0,0 +1,438 @@
+## benchgeobin.py
+##
+## Need to install numpy: pip install numpy
+##
+## Input argument: [-q] [-k pattern] [-t minTime] [--baseline file]
+##                 [--save-baseline file] [--update-reference] [--tolerance]
+## Test run: python benchgeobin.py -q
+##
+## Benchmarks of getGeoIDFromLL(), getLLFromGeoID(), llPtInRegion(),
+## geoIDInRegion(), getBinGeoJSONFromGeoID() and getBinsOneLLBound()
+## across bin types, bin sizes (10 m to 5 km), polygon vertex counts (4 to
+## 100k) and zone crossing regions.
+##   Output: ops/sec (best of repeated runs for at least minTime), peak memory
+##           (MB over the process at case start; POSIX only, -1 otherwise) and
+##           result check per case
+##     Note: Each case runs on fixed inputs; its results are hashed (floats
+##           to 9 decimals) and compared with reference.json (--update-reference
+##           writes it). Mismatch exits with 1.
+##     Note: --save-baseline writes ops/sec of this run; --baseline compares
+##           with a saved run and flags cases slower by more than tolerance
+##           (default 0.15) as regressions (exit 2).
+##     Note: Each case runs in its own process on POSIX (fork), so peak
+##           memory is per case.
+##     Note: Import time of the package is measured in a fresh interpreter
+##           (best of 5) against importBudgets; imports that print or load
+##           modules they should not (e.g. numpy for "import geobin") fail
+##           the check. Over budget or side effects exit with 3.
+##     Note: utmproj.py (from_latlon(), to_latlon(), fromLatLons(),
+##           toLatLons()) is compared with the utm package over a point grid
+##           (zone and band edges, Norway and Svalbard zones, both
+##           hemispheres); a difference of 1 mm or more, or a different zone
+##           or band, exits with 4. Skipped if utm is not installed.
+##
+## Functions:
+## getCases(quickFlag)
+##   Output: list of (name, setup); setup() returns run(), and run() returns
+##           (result, numOp)
+## runCase(setup, minTime)
+##   Output: opsPerSec, peakMB, resultHash
+## getImportTime(preload, stmt, noModules)
+##   Output: best import time in ms, loaded modules of noModules, other output
+## getUTMRefErrors()
+##   Output: max errors in meters (from_latlon, fromLatLons, to_latlon,
+##           toLatLons), number of zone or band mismatches; None if utm is
+##           not installed
+##
+
+import math, sys, os, time, json, hashlib, argparse, tempfile, shutil, multiprocessing, subprocess
+import numpy as np
+
+benchPath = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(benchPath, '..', 'geobin'))
+from geoidutm import getGeoIDFromLL, getLLFromGeoID, getGeoIDsFromLLs
+from ptinregion import llPtInRegion, geoIDInRegion, PreparedRegion
+from getBinsInRegions import getBinGeoJSONFromGeoID, getBinsOneLLBound
+import utmproj
+
+try:
+  import resource
+except ImportError:  ## Windows
+  resource = None
+
+referenceFname = os.path.join(benchPath, 'reference.json')
+binSizes = (10, 100, 500, 1000, 5000)
+binSizesQuick = (10, 1000)
+binTypes = (0, 1)  ## Square, hexagon
+vertexCounts = (4, 100, 1000, 10000, 100000)
+vertexCountsQuick = (4, 1000)
+utmMaxErrorMeter = 1e-3  ## utmproj.py vs utm
+
+## Import budgets: (name, preloaded statement (not timed), timed import, budget in ms, modules it must not load)
+importBudgets = (("import geobin", "", "import geobin", 5.0, ("numpy", "geobin.geoidutm", "geobin.getBinsInRegions")),
+                 ("import geobin.getBinsInRegions (numpy loaded)", "import numpy", "import geobin.getBinsInRegions", 15.0, ("multiprocessing",)))
+
+## Regions of getBinsInRegions.py test
+llBoundSF = [-122.51593,37.75312,-122.4993,37.78031,-122.432803,37.795259,-122.44142,37.752214]  ## Small region
+llBoundCrossZone = [-122.51593,37.75312,-122.4993,37.78031,-118.432803,37.795259,-118.44142,37.752214]  ## Zones 10 and 11
+
+##-------------------- Input -----
+def getStarLLBound(numVertex, centerLongi = -122.45, centerLati = 37.77, radiusDeg = 0.03):
+  ## Closed polygon of numVertex vertices: wavy circle with jags of about the edge length (like a coverage boundary)
+  angles = np.arange(numVertex) * (2.0 * math.pi / numVertex)
+  jagDeg = math.pi * radiusDeg / numVertex
+  radii = radiusDeg * (1.0 + 0.1 * np.sin(5.0 * angles)) + np.where(np.arange(numVertex) % 2 == 0, jagDeg, -jagDeg)
+  llBound = np.empty(numVertex * 2)
+  llBound[0::2] = centerLongi + radii * np.cos(angles) / math.cos(math.radians(centerLati))
+  llBound[1::2] = centerLati + radii * np.sin(angles)
+  return llBound.tolist()
+
+def getBoxLLBound(centerLongi, centerLati, halfSizeDeg):
+  return [centerLongi - halfSizeDeg, centerLati - halfSizeDeg, centerLongi - halfSizeDeg, centerLati + halfSizeDeg,
+          centerLongi + halfSizeDeg, centerLati + halfSizeDeg, centerLongi + halfSizeDeg, centerLati - halfSizeDeg]
+
+def getLLs(numPt, seed = 0):
+  ## Random points around San Francisco plus points near the zone 10/11 border
+  rng = np.random.RandomState(seed)
+  longis = -122.6 + rng.rand(numPt) * 0.4
+  latis = 37.6 + rng.rand(numPt) * 0.3
+  longis[::10] = -120.0 + (rng.rand(len(longis[::10])) - 0.5) * 0.02
+  return longis, latis
+
+##-------------------- Cases -----
+def encodeSetup(binSizeMeter, binType, numPt):
+  def setup():
+    longis, latis = getLLs(numPt)
+    longis = longis.tolist()
+    latis = latis.tolist()
+    def run():
+      result = [getGeoIDFromLL(longis[i], latis[i], binSizeMeter, binType)[1] for i in xrange(numPt)]
+      return result, numPt
+    return run
+  return setup
+
+def decodeSetup(binSizeMeter, binType, numPt):
+  def setup():
+    longis, latis = getLLs(numPt)
+    geoIDs = getGeoIDsFromLLs(longis, latis, binSizeMeter, binType)[1].tolist()
+    def run():
+      result = [getLLFromGeoID(geoID)[2] for geoID in geoIDs]
+      return result, numPt
+    return run
+  return setup
+
+def ptInRegionSetup(numVertex, preparedFlag, numPt):
+  def setup():
+    llBound = getStarLLBound(numVertex)
+    numValInBound = len(llBound)
+    if (preparedFlag == 1):
+      llBound = PreparedRegion(numValInBound, llBound)
+    longis, latis = getLLs(numPt, 1)
+    longis = (-122.45 + (longis + 122.4) * 0.2).tolist()  ## Mostly inside the bounding box
+    latis = (37.77 + (latis - 37.75) * 0.3).tolist()
+    def run():
+      result = [llPtInRegion(longis[i], latis[i], numValInBound, llBound)[1] for i in xrange(numPt)]
+      return result, numPt
+    return run
+  return setup
+
+def geoIDInRegionSetup(numVertex, binSizeMeter, numPt):
+  def setup():
+    llBound = getStarLLBound(numVertex)
+    numValInBound = len(llBound)
+    longis, latis = getLLs(numPt, 2)
+    longis = -122.45 + (longis + 122.4) * 0.2
+    latis = 37.77 + (latis - 37.75) * 0.3
+    geoIDs = getGeoIDsFromLLs(longis, latis, binSizeMeter, 1)[1].tolist()
+    def run():
+      result = [geoIDInRegion(geoID, numValInBound, llBound)[1] for geoID in geoIDs]
+      return result, numPt
+    return run
+  return setup
+
+def geoJSONSetup(binSizeMeter, binType, numPt):
+  def setup():
+    longis, latis = getLLs(numPt, 3)
+    geoIDs = getGeoIDsFromLLs(longis, latis, binSizeMeter, binType)[1].tolist()
+    args = {"strokeColor": "#FF0000", "binSize": binSizeMeter}
+    def run():
+      result = [getBinGeoJSONFromGeoID(geoID, **args)[1] for geoID in geoIDs]
+      return result, numPt
+    return run
+  return setup
+
+def binRegionSetup(llBound, binSizeMeter, binType, coverMode = 0):
+  ## Files written to a temporary folder; result is GeoBin.json content (bins are the ops)
+  def setup():
+    numValInBound = len(llBound)
+    def run():
+      pathName = tempfile.mkdtemp(prefix='geobinbench')
+      try:
+        retVal = getBinsOneLLBound(numValInBound, llBound, binSizeMeter, binType, pathName, -1, coverMode, outFormats=("geojson",))
+        with open(os.path.join(pathName, 'GeoBin.json'), 'rb') as in_file:
+          data = in_file.read()
+      finally:
+        shutil.rmtree(pathName, ignore_errors=True)
+      return (retVal, hashlib.md5(data).hexdigest()), max(1, data.count('"Feature"'))
+    return run
+  return setup
+
+def getCases(quickFlag):
+  cases = []
+  numPt = 2000  ## Same inputs in quick mode (reference hashes)
+  for binSizeMeter in (binSizesQuick if (quickFlag == 1) else binSizes):
+    for binType in binTypes:
+      cases.append(('getGeoIDFromLL size%d type%d' % (binSizeMeter, binType), encodeSetup(binSizeMeter, binType, numPt)))
+      cases.append(('getLLFromGeoID size%d type%d' % (binSizeMeter, binType), decodeSetup(binSizeMeter, binType, numPt)))
+  for numVertex in (vertexCountsQuick if (quickFlag == 1) else vertexCounts):
+    numPtV = max(20, min(numPt, 2000000 // numVertex))  ## Plain llBound is O(numVertex) per point
+    cases.append(('llPtInRegion vertex%d' % numVertex, ptInRegionSetup(numVertex, 0, numPtV)))
+    cases.append(('llPtInRegion prepared vertex%d' % numVertex, ptInRegionSetup(numVertex, 1, numPt)))
+    cases.append(('geoIDInRegion size100 vertex%d' % numVertex, geoIDInRegionSetup(numVertex, 100, numPtV)))
+  for binType in binTypes:
+    cases.append(('getBinGeoJSONFromGeoID size100 type%d' % binType, geoJSONSetup(100, binType, numPt)))
+  for binType in binTypes:
+    cases.append(('getBinsOneLLBound small size100 type%d' % binType, binRegionSetup(llBoundSF, 100, binType)))
+    cases.append(('getBinsOneLLBound small size100 type%d scan' % binType, binRegionSetup(llBoundSF, 100, binType, 1)))
+    cases.append(('getBinsOneLLBound small size100 type%d cover' % binType, binRegionSetup(llBoundSF, 100, binType, 2)))
+  cases.append(('getBinsOneLLBound box size10 type1', binRegionSetup(getBoxLLBound(-122.45, 37.77, 0.004), 10, 1)))
+  cases.append(('getBinsOneLLBound crosszone size5000 type1', binRegionSetup(llBoundCrossZone, 5000, 1)))
+  if (quickFlag == 0):
+    cases.append(('getBinsOneLLBound crosszone size500 type1 scan', binRegionSetup(llBoundCrossZone, 500, 1, 1)))
+    cases.append(('getBinsOneLLBound box size5000 type0', binRegionSetup(getBoxLLBound(-120.0, 37.0, 1.0), 5000, 0)))
+    cases.append(('getBinsOneLLBound star100000 size100 type1 scan', binRegionSetup(getStarLLBound(100000), 100, 1, 1)))
+  return cases
+
+##-------------------- Run -----
+def getResultHash(result):
+  ## Floats to 9 decimals so the hash does not depend on repr() details
+  def norm(val):
+    if isinstance(val, (float, np.floating)):
+      return '%.9f' % val
+    if isinstance(val, (list, tuple)):
+      return [norm(v) for v in val]
+    return val
+  return hashlib.md5(json.dumps(norm(result))).hexdigest()
+
+def getMaxRSSMB():
+  if (resource is None):
+    return -1.0
+  maxRSS = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  if (sys.platform == 'darwin'):  ## Bytes on macOS, KB on Linux
+    return maxRSS / 1048576.0
+  return maxRSS / 1024.0
+
+def runCase(setup, minTime):
+  startMB = getMaxRSSMB()
+  run = setup()
+  result, numOp = run()  ## Warm up and result check
+  resultHash = getResultHash(result)
+  del result
+  bestTime = float('inf')
+  totalTime = 0.0
+  numRun = 0
+  while ((totalTime < minTime) or (numRun < 3)):
+    t0 = time.time()
+    run()
+    elapsed = time.time() - t0
+    bestTime = min(bestTime, elapsed)
+    totalTime += elapsed
+    numRun += 1
+    if ((numRun >= 1) and (elapsed > minTime)):  ## Slow case; one timed run is enough
+      break
+  peakMB = -1.0
+  if (startMB >= 0):
+    peakMB = getMaxRSSMB() - startMB
+  return numOp / max(bestTime, 1e-9), peakMB, resultHash
+
+def runCaseWorker(queue, setup, minTime):
+  queue.put(runCase(setup, minTime))
+
+def runCaseProcess(setup, minTime):
+  ## Own process for per-case peak memory (fork; setup closures are not pickled)
+  if ((resource is None) or (not hasattr(os, 'fork'))):
+    return runCase(setup, minTime)
+  queue = multiprocessing.Queue()
+  proc = multiprocessing.Process(target=runCaseWorker, args=(queue, setup, minTime))
+  proc.start()
+  result = queue.get()
+  proc.join()
+  return result
+
+importChkCode = """import sys, time
+{0}
+t0 = time.time()
+{1}
+elapsed = time.time() - t0
+sys.stdout.write("\\nimportChk %r %r\\n" % (elapsed * 1000.0, [name for name in {2!r} if sys.modules.get(name) is not None]))
+"""
+
+def getImportTime(preload, stmt, noModules, numRun = 5):
+  ## Best of numRun fresh interpreters (first run may compile .pyc)
+  env = dict(os.environ)
+  env["PYTHONPATH"] = os.path.join(benchPath, '..') + os.pathsep + env.get("PYTHONPATH", "")
+  bestMs = float('inf')
+  loadedModules = []
+  otherOutput = ""
+  for i in xrange(0, numRun):
+    proc = subprocess.Popen([sys.executable, '-c', importChkCode.format(preload, stmt, tuple(noModules))], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=env, cwd=tempfile.gettempdir())
+    output = proc.communicate()[0]
+    lines = output.rstrip("\n").split("\n")
+    if ((proc.returncode != 0) or (not lines[-1].startswith("importChk "))):
+      return -1.0, [], output
+    elapsedMs, loadedModules = [eval(val) for val in lines[-1][len("importChk "):].split(" ", 1)]
+    bestMs = min(bestMs, elapsedMs)
+    otherOutput = "\n".join(lines[:-1]).strip()
+  return bestMs, loadedModules, otherOutput
+
+##-------------------- UTM reference -----
+def getUTMRefLLs():
+  ## Latitude and longitude grid: world, band and zone edges, Norway and Svalbard zones
+  edgeOffs = np.array([-1e-7, 0.0, 1e-7])
+  latis = np.concatenate((np.linspace(-80.0, 84.0, 83), (np.arange(-72.0, 81.0, 8.0)[:, np.newaxis] + edgeOffs).ravel(), [-80.0, 84.0, -1e-9, 0.0, 1e-9]))
+  longis = np.concatenate((np.linspace(-180.0, 179.5, 72), (np.arange(-174.0, 180.0, 6.0)[:, np.newaxis] + edgeOffs).ravel()))
+  latis, longis = [vals.ravel() for vals in np.meshgrid(latis, longis)]
+  norwayLatis, norwayLongis = [vals.ravel() for vals in np.meshgrid(np.linspace(55.9, 64.1, 42), np.linspace(2.9, 12.1, 47))]
+  svalbardLatis, svalbardLongis = [vals.ravel() for vals in np.meshgrid(np.linspace(71.9, 84.0, 62), np.linspace(-0.1, 42.1, 212))]
+  latis = np.concatenate((latis, norwayLatis, svalbardLatis))
+  longis = np.concatenate((longis, norwayLongis, svalbardLongis))
+  keepFlags = (latis >= -80.0) & (latis <= 84.0)
+  return latis[keepFlags], longis[keepFlags]
+
+def getLLErrorMeters(latis, longis, refLatis, refLongis):
+  ## Distance in meters for small latitude and longitude differences
+  return np.hypot(latis - refLatis, (longis - refLongis) * np.cos(np.radians(refLatis))) * 111320.0
+
+def getUTMRefErrors():
+  try:
+    import utm
+  except ImportError:
+    return None
+  latis, longis = getUTMRefLLs()
+  refs = [utm.from_latlon(latis[i], longis[i]) for i in xrange(len(latis))]
+  refEastings = np.array([ref[0] for ref in refs])
+  refNorthings = np.array([ref[1] for ref in refs])
+  refZoneNums = np.array([ref[2] for ref in refs])
+  refLatiBands = np.array([ref[3] for ref in refs])
+  refInvs = np.array([utm.to_latlon(refEastings[i], refNorthings[i], int(refZoneNums[i]), refLatiBands[i], strict=False) for i in xrange(len(latis))])
+
+  ## Forward: per point (math) and batch
+  outs = [utmproj.from_latlon(float(latis[i]), float(longis[i])) for i in xrange(len(latis))]
+  eastings, northings, zoneNums, latiBands = utmproj.fromLatLons(latis, longis)
+  numMismatch = sum(int((out[2] != refZoneNums[i]) or (out[3] != refLatiBands[i])) for i, out in enumerate(outs))
+  numMismatch += int(np.sum((zoneNums != refZoneNums) | (latiBands != refLatiBands)))
+  errFwd = max(np.max(np.abs(np.array([out[0] for out in outs]) - refEastings)), np.max(np.abs(np.array([out[1] for out in outs]) - refNorthings)))
+  errFwds = max(np.max(np.abs(eastings - refEastings)), np.max(np.abs(northings - refNorthings)))
+
+  ## Inverse of the utm coordinates: per point (math) and batch
+  invs = np.array([utmproj.to_latlon(float(refEastings[i]), float(refNorthings[i]), int(refZoneNums[i]), refLatiBands[i], strict=False) for i in xrange(len(latis))])
+  invLatis, invLongis = utmproj.toLatLons(refEastings, refNorthings, refZoneNums, refLatiBands)
+  errInv = np.max(getLLErrorMeters(invs[:, 0], invs[:, 1], refInvs[:, 0], refInvs[:, 1]))
+  errInvs = np.max(getLLErrorMeters(invLatis, invLongis, refInvs[:, 0], refInvs[:, 1]))
+  return (float(errFwd), float(errFwds), float(errInv), float(errInvs)), numMismatch
+
+def loadJson(fname):
+  try:
+    with open(fname) as in_file:
+      return json.load(in_file)
+  except (IOError, ValueError):
+    return {}
+
+def saveJson(fname, data):
+  with open(fname, 'w') as out_file:
+    json.dump(data, out_file, indent=1, separators=(',', ': '), sort_keys=True)
+    out_file.write('\n')
+
+def main(argv = None):
+  parser = argparse.ArgumentParser(description='geobins benchmarks')
+  parser.add_argument('-q', '--quick', action='store_true', help='fewer cases and points')
+  parser.add_argument('-k', dest='pattern', default='', help='only cases whose name contains pattern')
+  parser.add_argument('-t', dest='minTime', type=float, default=0.5, help='min timed seconds per case')
+  parser.add_argument('--baseline', default='', help='compare ops/sec with this saved run')
+  parser.add_argument('--save-baseline', dest='saveBaseline', default='', help='save ops/sec of this run')
+  parser.add_argument('--tolerance', type=float, default=0.15, help='slowdown flagged as regression')
+  parser.add_argument('--update-reference', dest='updateReference', action='store_true', help='store result hashes as reference')
+  args = parser.parse_args(argv)
+
+  reference = loadJson(referenceFname)
+  baseline = loadJson(args.baseline) if args.baseline else {}
+  results = {}
+  numMismatch = 0
+  numRegression = 0
+  print '%-48s %14s %9s %8s %s' % ('case', 'ops/sec', 'peakMB', 'check', 'baseline')
+  for name, setup in getCases(1 if args.quick else 0):
+    if (args.pattern not in name):
+      continue
+    opsPerSec, peakMB, resultHash = runCaseProcess(setup, args.minTime)
+    results[name] = {"opsPerSec": opsPerSec, "peakMB": peakMB, "hash": resultHash}
+    check = 'new'
+    if (name in reference):
+      check = 'ok'
+      if (reference[name] != resultHash):
+        check = 'MISMATCH'
+        numMismatch += 1
+    cmpStr = ''
+    if ("opsPerSec" in baseline.get(name, {})):
+      ratio = opsPerSec / baseline[name]["opsPerSec"]
+      cmpStr = '%+.1f%%' % ((ratio - 1.0) * 100.0)
+      if (ratio < 1.0 - args.tolerance):
+        cmpStr += ' REGRESSION'
+        numRegression += 1
+    print '%-48s %14.1f %9.1f %8s %s' % (name, opsPerSec, peakMB, check, cmpStr)
+    sys.stdout.flush()
+
+  numOverBudget = 0
+  for name, preload, stmt, budgetMs, noModules in importBudgets:
+    if (args.pattern not in name):
+      continue
+    importMs, loadedModules, otherOutput = getImportTime(preload, stmt, noModules)
+    results[name] = {"importMs": importMs}
+    check = 'ok'
+    if (importMs < 0):
+      check = 'FAILED ' + otherOutput.strip().split("\n")[-1]
+    elif (len(otherOutput) > 0):
+      check = 'PRINTS ' + otherOutput.split("\n")[0][:40]
+    elif (len(loadedModules) > 0):
+      check = 'LOADS ' + ' '.join(loadedModules)
+    elif (importMs > budgetMs):
+      check = 'OVER BUDGET'
+    if (check != 'ok'):
+      numOverBudget += 1
+    print '%-48s %11.2f ms %9s %s' % (name, importMs, '<= %g' % budgetMs, check)
+
+  numUTMFail = 0
+  name = 'utmproj vs utm'
+  if (args.pattern in name):
+    utmRef = getUTMRefErrors()
+    if (utmRef is None):
+      print '%-48s %14s %9s %s' % (name, '', '', 'skipped (utm not installed)')
+    else:
+      errors, numZoneMismatch = utmRef
+      results[name] = {"maxErrorMeters": list(errors)}
+      check = 'ok'
+      if ((max(errors) >= utmMaxErrorMeter) or (numZoneMismatch > 0)):
+        check = 'FAILED (zone or band mismatch: %d)' % numZoneMismatch
+        numUTMFail += 1
+      print '%-48s %11.2g m %9s %s' % (name, max(errors), '< %g' % utmMaxErrorMeter, check)
+
+  if args.updateReference:
+    reference.update((name, result["hash"]) for name, result in results.iteritems() if ("hash" in result))
+    saveJson(referenceFname, reference)
+  if args.saveBaseline:
+    saveJson(args.saveBaseline, results)
+  if (numMismatch > 0):
+    print 'Result mismatch:', numMismatch
+    return 1
+  if (numRegression > 0):
+    print 'Regression:', numRegression
+    return 2
+  if (numOverBudget > 0):
+    print 'Import over budget or with side effects:', numOverBudget
+    return 3
+  if (numUTMFail > 0):
+    print 'utmproj differs from utm'
+    return 4
+  return 0
+
+if __name__ == '__main__':
+  sys.exit(main())
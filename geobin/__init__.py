@@ -1,3 +1,53 @@
-from geobin.geoidutm import getGeoIDFromLL, getLLFromGeoID
-from ptinregion import llPtInRegion, geoIDInRegion
-from getBinsInRegion import getBinsInARegion, getBinGeoJSONFromGeoID
+## geobin package
+##
+## Public functions and classes of the modules below are attributes of the
+## package (e.g. geobin.getGeoIDFromLL); a module is imported on first use
+## of one of its names, so "import geobin" does not import numpy, project or
+## write anything.
+##   geoidutm: GeoID encode and decode, neighbors, hierarchy, radius
+##   ptinregion: point and GeoID in region
+##   getBinsInRegions: region binning and output files
+##   binaggregate, binindex, bincache, binstats, binconvert, regionscan, utmproj
+##
+
+import sys, types
+
+lazyNames = {
+  "geoidutm": ("getGeoIDFromLL", "getLLFromGeoID", "getCenterLLFromGeoID", "getGeoIDsFromLLs", "getLLsFromGeoIDs",
+               "getCenterLLsFromGeoIDs", "getGeoIntsFromLLs", "geoIDToInt", "intToGeoID", "geoIDsToInts", "intsToGeoIDs",
+               "getNeighborGeoIDs", "getNeighborGeoIDsFromGeoIDs", "getParentGeoID", "getParentGeoIDsFromGeoIDs",
+               "getChildGeoIDs", "getBinsWithinRadius"),
+  "ptinregion": ("llPtInRegion", "llPtsInRegion", "utmPtsInRegion", "geoIDInRegion", "geoIDsInRegion", "PreparedRegion"),
+  "getBinsInRegions": ("getBinsOneLLBound", "getBinsOneLLBoundWStats", "iterBinsInRegion", "iterBinsInRegions",
+                       "getBinsLLBounds", "getBinGeoJSONFromGeoID", "loadBinsColumnar", "loadBinsColumnarCover",
+                       "BinRecord", "BinCoverRecord"),
+  "binaggregate": ("BinAggregator", "rollUp", "rollUpAggs"),
+  "binindex": ("BinIndex", "BinIndexWriter", "buildBinIndex"),
+  "bincache": ("getLLFromGeoIDCached", "getBinGeoJSONFromGeoIDCached", "setCacheMaxSizes", "clearCaches", "getCacheStats"),
+  "binstats": ("BinStats",),
+  "binconvert": ("convertCSVFile", "convertParquetFile"),
+}
+lazyModules = dict((name, modName) for modName, names in lazyNames.iteritems() for name in names)
+
+__all__ = sorted(lazyModules)
+
+class LazyModule(types.ModuleType):
+  ## Package module; imports the module of a name on first attribute access
+
+  def __getattr__(self, name):
+    modName = lazyModules.get(name)
+    if (modName is None):
+      raise AttributeError("module 'geobin' has no attribute '{0}'".format(name))
+    __import__(self.__name__ + "." + modName)
+    value = getattr(sys.modules[self.__name__ + "." + modName], name)
+    setattr(self, name, value)  ## Later access skips __getattr__
+    return value
+
+  def __dir__(self):
+    return sorted(set(self.__dict__) | set(lazyModules))
+
+## Replace this module in sys.modules; keep the original alive (its globals are used by LazyModule)
+lazyPackage = LazyModule(__name__)
+lazyPackage.__dict__.update(sys.modules[__name__].__dict__)
+lazyPackage.originalModule = sys.modules[__name__]
+sys.modules[__name__] = lazyPackage
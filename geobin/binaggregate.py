@@ -0,0 +1,278 @@
+## binaggregate.py
+##
+## Need to install numpy: pip install numpy
+##
+## Input argument: None
+## Test run: python binaggregate.py
+##
+## Classes:
+## BinAggregator(binSizeMeter, binType, zoneNumIn = -1, maxBinInMem = 2000000, spillPath = '')
+##   Input: Bin size in meters, binType, optional forced zoneNum (same as
+##          getGeoIDFromLL()), optional max number of bins kept in memory,
+##          optional folder for spill files (default: temporary folder)
+##     Note: count, sum, sum of squares, min and max of values per bin, in
+##           arrays sorted by packed GeoID (geoInt; see geoIDToInt()).
+##     Note: When more than maxBinInMem bins are in memory, they are written
+##           to a spill file (sorted run) and merged again, a key range at a
+##           time, when results are read.
+##   addLLs(longis, latis, values)
+##     Input: longitude array, latitude array, value array (one chunk)
+##     Output: retVal array
+##     Return: same bits as getGeoIntsFromLLs() per element, plus
+##             negative bit 6: invalid value (NaN or infinite)
+##   addGeoIDs(geoIDs, values)
+##     Input: GeoID (string or packed integer) array, value array
+##     Output: retVal array
+##     Return: same bits as geoIDsToInts() per element, plus
+##             negative bit 6: invalid value (NaN or infinite)
+##   addChunks(chunks)
+##     Input: iterator of (longis, latis, values)
+##     Output: numPt, numInvalid
+##   addAggs(geoInts, counts, sums, sumSqs, mins, maxs)
+##     Input: partial aggregates (e.g. results of another BinAggregator)
+##   iterResults(maxBinInChunk = -1)
+##     Output: generator of (geoInts, counts, sums, sumSqs, mins, maxs) in
+##             geoInt order; at most maxBinInChunk bins each (-1:
+##             maxBinInMem)
+##   getResults()
+##     Output: geoInts, counts, sums, sumSqs, mins, maxs (all bins)
+##   iterGeoJSON(**kwargs)
+##     Output: generator of GeoJSON features (string) as
+##             getBinGeoJSONFromGeoID() with properties count, sum, mean,
+##             std, min, max and kwargs
+##   writeGeoJSON(pathName, fname = "GeoBinAgg.json", **kwargs)
+##     Output: retVal (same bits as getBinsOneLLBound() file errors)
+##   rollUp(targetBinSize, targetBinType = -1)
+##     Output: new BinAggregator of the parent bins (see rollUpAggs()), read a
+##             chunk at a time; e.g. a zoom pyramid 25 m -> 100 m -> 500 m
+##             from one binning pass
+##   close()
+##     Note: Remove spill files.
+##
+## Functions:
+## rollUp(geoIDs, values, targetBinSize, targetBinType = -1)
+##   Input: GeoID (string or packed integer) array, value array, parent bin
+##          size, optional parent bin type (-1: same type)
+##   Output: retVal array, geoInts, counts, sums, sumSqs, mins, maxs of the
+##           parent bins (sorted by geoInt)
+##     Note: No raw points and no projection; parents of
+##           getParentGeoIDsFromGeoIDs() (exact for squares whose sizes
+##           divide evenly, by bin center for hexagons).
+##   Return: same bits as getParentGeoIDsFromGeoIDs() per element, plus
+##           negative bit 7: invalid value (NaN or infinite)
+## rollUpAggs(geoInts, counts, sums, sumSqs, mins, maxs, targetBinSize, targetBinType = -1)
+##   Input: child bin aggregates (e.g. BinAggregator results), parent bin
+##          size, optional parent bin type
+##   Output: retVal array, parent aggregates as rollUp()
+##
+
+import math, sys, os, tempfile, shutil
+import numpy as np
+from geoidutm import getGeoIntsFromLLs, geoIDsToInts, getLLsFromGeoIDs, intsToGeoIDs, getParentGeoIDsFromGeoIDs
+from getBinsInRegions import writeDataJsonGeoStr, writeHeaderJsonGeo, openFileWMkdir
+
+aggFields = ("geoInts", "counts", "sums", "sumSqs", "mins", "maxs")
+
+## Function
+def mergeBinAggs(geoInts, counts, sums, sumSqs, mins, maxs):
+  ## Combine entries of same geoInt; return arrays sorted by geoInt
+  order = np.argsort(geoInts, kind='mergesort')
+  geoInts = geoInts[order]
+  if (len(geoInts) == 0):
+    return geoInts, counts[order], sums[order], sumSqs[order], mins[order], maxs[order]
+  starts = np.concatenate(([0], np.flatnonzero(geoInts[1:] != geoInts[:-1]) + 1))
+  return (geoInts[starts], np.add.reduceat(counts[order], starts), np.add.reduceat(sums[order], starts),
+          np.add.reduceat(sumSqs[order], starts), np.minimum.reduceat(mins[order], starts), np.maximum.reduceat(maxs[order], starts))
+
+def getBinAggsFromValues(geoInts, values):
+  values = np.asarray(values, dtype=np.float64)
+  return mergeBinAggs(geoInts, np.ones(len(geoInts), dtype=np.int64), values, values * values, values, values)
+
+def getMeanStds(counts, sums, sumSqs):
+  ## Mean and population standard deviation
+  means = sums / counts
+  stds = np.sqrt(np.maximum(sumSqs / counts - means * means, 0.0))
+  return means, stds
+
+def rollUpAggs(geoInts, counts, sums, sumSqs, mins, maxs, targetBinSize, targetBinType = -1):
+  ## Child aggregates merged into parent bins; count, sum and sum of squares add up, min and max of mins and maxs
+  retVals, parentInts = getParentGeoIDsFromGeoIDs(np.asarray(geoInts, dtype=np.int64).ravel(), targetBinSize, targetBinType)
+  validInx = np.flatnonzero(retVals == 0)
+  return (retVals,) + mergeBinAggs(parentInts[validInx], np.asarray(counts, dtype=np.int64)[validInx], np.asarray(sums, dtype=np.float64)[validInx],
+                                   np.asarray(sumSqs, dtype=np.float64)[validInx], np.asarray(mins, dtype=np.float64)[validInx], np.asarray(maxs, dtype=np.float64)[validInx])
+
+def rollUp(geoIDs, values, targetBinSize, targetBinType = -1):
+  retVals, geoInts = geoIDsToInts(geoIDs)
+  values = np.asarray(values, dtype=np.float64).ravel()
+  retVals[(retVals == 0) & ~np.isfinite(values)] = -128
+  validInx = np.flatnonzero(retVals == 0)
+  aggs = rollUpAggs(geoInts[validInx], np.ones(len(validInx), dtype=np.int64), values[validInx], values[validInx] * values[validInx],
+                    values[validInx], values[validInx], targetBinSize, targetBinType)
+  retVals[validInx] = aggs[0]
+  return (retVals,) + aggs[1:]
+
+##-------------------- Class -----
+class BinAggregator(object):
+
+  def __init__(self, binSizeMeter, binType, zoneNumIn = -1, maxBinInMem = 2000000, spillPath = ''):
+    self.binSizeMeter = binSizeMeter
+    self.binType = binType
+    self.zoneNumIn = zoneNumIn
+    self.maxBinInMem = maxBinInMem
+    self.spillPath = spillPath
+    self.spillPathMade = 0  ## 1 if temporary folder made here
+    self.runs = []  ## Spill file name prefixes
+    self.aggs = mergeBinAggs(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(0))
+    self.pendingAggs = []  ## Chunk aggregates not merged yet
+    self.numPending = 0
+
+  def addBinAggs(self, aggs):
+    ## Chunks are merged when they have as many entries as the merged arrays (amortized)
+    self.pendingAggs.append(aggs)
+    self.numPending += len(aggs[0])
+    if (self.numPending >= max(len(self.aggs[0]), 65536)):
+      self.flushPending()
+
+  def flushPending(self):
+    if (len(self.pendingAggs) > 0):
+      self.aggs = mergeBinAggs(*[np.concatenate(field) for field in zip(self.aggs, *self.pendingAggs)])
+      self.pendingAggs = []
+      self.numPending = 0
+    if (len(self.aggs[0]) > self.maxBinInMem):
+      self.spill()
+
+  def spill(self):
+    ## Write merged arrays as a sorted run
+    if (len(self.spillPath) <= 0):
+      self.spillPath = tempfile.mkdtemp(prefix="geobinagg")
+      self.spillPathMade = 1
+    elif (not os.path.isdir(self.spillPath)):
+      os.makedirs(self.spillPath)
+    runPre = os.path.join(self.spillPath, "run{0:05d}_{1}".format(len(self.runs), os.getpid()))
+    for field, vals in zip(aggFields, self.aggs):
+      np.save(runPre + field + ".npy", vals)
+    self.runs.append(runPre)
+    self.aggs = tuple(vals[0:0] for vals in self.aggs)
+
+  def addLLs(self, longis, latis, values):
+    retVals, geoInts = getGeoIntsFromLLs(longis, latis, self.binSizeMeter, self.binType, self.zoneNumIn)
+    return self.addGeoIntValues(retVals, geoInts, values)
+
+  def addGeoIDs(self, geoIDs, values):
+    retVals, geoInts = geoIDsToInts(geoIDs)
+    return self.addGeoIntValues(retVals, geoInts, values)
+
+  def addGeoIntValues(self, retVals, geoInts, values):
+    values = np.asarray(values, dtype=np.float64).ravel()
+    retVals[(retVals == 0) & ~np.isfinite(values)] = -64
+    validInx = np.flatnonzero(retVals == 0)
+    if (len(validInx) > 0):
+      self.addBinAggs(getBinAggsFromValues(geoInts[validInx], values[validInx]))
+    return retVals
+
+  def addChunks(self, chunks):
+    numPt = 0
+    numInvalid = 0
+    for longis, latis, values in chunks:
+      retVals = self.addLLs(longis, latis, values)
+      numPt += len(retVals)
+      numInvalid += int(np.count_nonzero(retVals))
+    return numPt, numInvalid
+
+  def addAggs(self, geoInts, counts, sums, sumSqs, mins, maxs):
+    self.addBinAggs(mergeBinAggs(np.asarray(geoInts, dtype=np.int64), np.asarray(counts, dtype=np.int64), np.asarray(sums, dtype=np.float64),
+                                 np.asarray(sumSqs, dtype=np.float64), np.asarray(mins, dtype=np.float64), np.asarray(maxs, dtype=np.float64)))
+
+  def iterResults(self, maxBinInChunk = -1):
+    if (maxBinInChunk < 1):
+      maxBinInChunk = self.maxBinInMem
+    self.flushPending()
+
+    ## Sorted runs: spill files (memory mapped) and merged arrays
+    runs = [tuple(np.load(runPre + field + ".npy", mmap_mode='r') for field in aggFields) for runPre in self.runs]
+    runs.append(self.aggs)
+    numEntry = sum(len(run[0]) for run in runs)
+
+    ## Key range boundaries from sampled keys of every run; each range has about maxBinInChunk entries
+    numPart = max(1, int(math.ceil(numEntry / float(maxBinInChunk))))
+    bounds = []
+    if (numPart > 1):
+      samples = np.concatenate([np.asarray(run[0][::max(1, len(run[0]) // (numPart * 16))]) for run in runs])
+      bounds = list(np.unique(np.percentile(samples, np.linspace(0, 100, numPart + 1)[1:-1], interpolation='lower').astype(np.int64)))
+    lows = [None] + bounds
+    highs = bounds + [None]
+    for low, high in zip(lows, highs):
+      parts = []
+      for run in runs:
+        inxStart = 0
+        inxEnd = len(run[0])
+        if (low is not None):
+          inxStart = int(np.searchsorted(run[0], low, 'left'))
+        if (high is not None):
+          inxEnd = int(np.searchsorted(run[0], high, 'left'))
+        parts.append(tuple(np.array(vals[inxStart:inxEnd]) for vals in run))
+      aggs = mergeBinAggs(*[np.concatenate(field) for field in zip(*parts)])
+      for inxStart in xrange(0, len(aggs[0]), maxBinInChunk):
+        yield tuple(vals[inxStart:inxStart + maxBinInChunk] for vals in aggs)
+
+  def getResults(self):
+    aggsList = list(self.iterResults())
+    if (len(aggsList) == 0):
+      return tuple(vals[0:0] for vals in self.aggs)
+    return tuple(np.concatenate(field) for field in zip(*aggsList))
+
+  def iterGeoJSON(self, **kwargs):
+    for geoInts, counts, sums, sumSqs, mins, maxs in self.iterResults(65536):
+      means, stds = getMeanStds(counts, sums, sumSqs)
+      retVals, numValInBounds, llBounds = getLLsFromGeoIDs(geoInts)[0:3]
+      retValsT, geoIDs = intsToGeoIDs(geoInts)
+      for i in np.flatnonzero(retVals == 0):
+        llBound = llBounds[i, 0:numValInBounds[i] // 2].ravel().tolist()
+        props = dict(kwargs)
+        props.update({"count": int(counts[i]), "sum": float(sums[i]), "mean": float(means[i]), "std": float(stds[i]), "min": float(mins[i]), "max": float(maxs[i])})
+        yield writeDataJsonGeoStr(geoIDs[i], int(numValInBounds[i]), llBound, **props)
+
+  def writeGeoJSON(self, pathName, fname = "GeoBinAgg.json", **kwargs):
+    retVal, geojson_file = openFileWMkdir(pathName, fname)
+    if (retVal == 0):
+      writeHeaderJsonGeo(geojson_file, **kwargs)
+      geojson_file.write("  },\n  \"features\": [\n")
+      firstFlag = 1
+      for data in self.iterGeoJSON():
+        if (firstFlag != 1):
+          geojson_file.write(",\n")
+        geojson_file.write("    " + data)
+        firstFlag = 0
+      geojson_file.write("\n  ]\n}\n")
+      geojson_file.close()
+    return -retVal
+
+  def rollUp(self, targetBinSize, targetBinType = -1):
+    if (targetBinType < 0):
+      targetBinType = self.binType
+    spillPath = self.spillPath
+    if (self.spillPathMade == 1):  ## Temporary folder removed by close()
+      spillPath = ''
+    binAgg = BinAggregator(targetBinSize, targetBinType, self.zoneNumIn, self.maxBinInMem, spillPath)
+    for aggs in self.iterResults():
+      binAgg.addAggs(*rollUpAggs(*(aggs + (targetBinSize, targetBinType)))[1:])
+    return binAgg
+
+  def close(self):
+    for runPre in self.runs:
+      for field in aggFields:
+        os.remove(runPre + field + ".npy")
+    self.runs = []
+    if (self.spillPathMade == 1):
+      shutil.rmtree(self.spillPath, True)
+      self.spillPath = ''
+      self.spillPathMade = 0
+
+##-------------------- Test -----
+if __name__ == '__main__':
+  ## Function test
+  binAgg = BinAggregator(100, 1)
+  retVals = binAgg.addLLs([51.2, 51.2001, -122.45], [7.5, 7.5001, 37.77], [-80.0, -90.0, -100.0])
+  geoInts, counts, sums, sumSqs, mins, maxs = binAgg.getResults()
+  #print 'BinAggregator():', retVals, geoInts, counts, sums, mins, maxs  ## Echo print
+  binAgg.close()
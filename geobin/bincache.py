@@ -0,0 +1,173 @@
+## bincache.py
+##
+## Input argument: None
+## Test run: python bincache.py
+##
+## Functions:
+## getLLFromGeoIDCached(geoID)
+##   Same output and return bits as getLLFromGeoID(); results are kept in the
+##   geometry cache (keyed by GeoID; binType, binSize, zone and band are part
+##   of it). llBound is a copy, so callers can change it.
+## getBinGeoJSONFromGeoIDCached(geoID, **kwargs)
+##   Same output and return bits as getBinGeoJSONFromGeoID(); strings are kept
+##   in the GeoJSON cache keyed by GeoID and rendered properties (so equal
+##   values of different types, e.g. 100 and 100.0, are separate entries).
+##   Geometry comes from getLLFromGeoIDCached().
+## setCacheMaxSizes(geometryMaxSize = -1, geoJSONMaxSize = -1)
+##   Input: max number of entries of the geometry and GeoJSON caches (< 0:
+##          unchanged; 0: no caching); entries over the size are evicted
+## clearCaches()
+##   Note: Remove all entries and reset statistics.
+## getCacheStats()
+##   Output: {"geometry": stats, "geoJSON": stats} (see LRUCache.getStats())
+##
+## Classes:
+## LRUCache(maxSize = 65536)
+##   Bounded least recently used cache; safe to share across threads.
+##   get(key)
+##     Output: foundFlag, value (None if not found)
+##   put(key, value)
+##   setMaxSize(maxSize)
+##   clear()
+##   getStats()
+##     Output: dictionary of size, maxSize, hits, misses, evictions
+##
+
+import sys, threading
+from geoidutm import getLLFromGeoID, isGeoInt, intToGeoID
+from getBinsInRegions import getPropsJsonGeoStr, getDataJsonGeoFeatureStr
+
+##-------------------- Class -----
+class LRUCache(object):
+  ## Dictionary of links [prev, next, key, value] in a circular doubly linked list
+  ## (as functools.lru_cache); OrderedDict is pure Python in 2.7 and slower
+
+  def __init__(self, maxSize = 65536):
+    self.maxSize = maxSize
+    self.entries = {}
+    self.root = []  ## Sentinel; root[NEXT] is least recently used
+    self.root[:] = [self.root, self.root, None, None]
+    self.lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def get(self, key):
+    with self.lock:
+      link = self.entries.get(key)
+      if (link is None):
+        self.misses += 1
+        return 0, None
+      linkPrev, linkNext, key, value = link
+      linkPrev[1] = linkNext  ## Unlink and move to most recently used
+      linkNext[0] = linkPrev
+      last = self.root[0]
+      last[1] = self.root[0] = link
+      link[0] = last
+      link[1] = self.root
+      self.hits += 1
+      return 1, value
+
+  def put(self, key, value):
+    with self.lock:
+      if (self.maxSize <= 0):
+        return
+      link = self.entries.get(key)
+      if (link is not None):
+        link[0][1] = link[1]  ## Unlink and move to most recently used
+        link[1][0] = link[0]
+        last = self.root[0]
+        last[1] = self.root[0] = link
+        link[0] = last
+        link[1] = self.root
+        link[3] = value
+        return
+      last = self.root[0]
+      link = [last, self.root, key, value]
+      last[1] = self.root[0] = self.entries[key] = link
+      self.evict()
+
+  def evict(self):
+    ## Lock held by caller
+    while (len(self.entries) > self.maxSize):
+      oldest = self.root[1]
+      self.root[1] = oldest[1]
+      oldest[1][0] = self.root
+      del self.entries[oldest[2]]
+      self.evictions += 1
+
+  def setMaxSize(self, maxSize):
+    with self.lock:
+      self.maxSize = maxSize
+      self.evict()
+
+  def clear(self):
+    with self.lock:
+      self.entries.clear()
+      self.root[:] = [self.root, self.root, None, None]
+      self.hits = 0
+      self.misses = 0
+      self.evictions = 0
+
+  def getStats(self):
+    with self.lock:
+      return {"size": len(self.entries), "maxSize": self.maxSize, "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+geometryCache = LRUCache(65536)
+geoJSONCache = LRUCache(16384)
+
+## Function
+def getCacheKey(geoID):
+  ## Packed and string GeoIDs are separate keys (outputs differ only for GeoJSON)
+  if ((not isinstance(geoID, str)) and isGeoInt(geoID)):
+    return int(geoID)
+  return geoID
+
+def getLLFromGeoIDCached(geoID):
+  key = getCacheKey(geoID)
+  foundFlag, result = geometryCache.get(key)
+  if (foundFlag == 0):
+    result = getLLFromGeoID(geoID)
+    if (result[0] == 0):  ## Errors are not cached
+      geometryCache.put(key, result)
+  retVal, numValInBound, llBound, centerLongi, centerLati, binSizeMeter, binType = result
+  return retVal, numValInBound, list(llBound), centerLongi, centerLati, binSizeMeter, binType
+
+def getBinGeoJSONFromGeoIDCached(geoID, **kwargs):
+  ## Same as getBinGeoJSONFromGeoID() (string format) with cached geometry and strings
+  propsStr = getPropsJsonGeoStr(**kwargs)
+  key = (getCacheKey(geoID), propsStr)
+  foundFlag, data = geoJSONCache.get(key)
+  if (foundFlag == 1):
+    return 0, data
+  data = ""
+  retVal, numValInBound, llBound, centerLongi, centerLati, binSizeMeter, binType = getLLFromGeoIDCached(geoID)
+  if (retVal == 0):
+    geoIDStr = geoID
+    if (isGeoInt(geoID)):  ## Packed GeoID; output GeoID string
+      geoIDStr = intToGeoID(geoID)[1]
+    data = getDataJsonGeoFeatureStr(geoIDStr, numValInBound, llBound, propsStr)
+    geoJSONCache.put(key, data)
+  return retVal, data
+
+def setCacheMaxSizes(geometryMaxSize = -1, geoJSONMaxSize = -1):
+  if (geometryMaxSize >= 0):
+    geometryCache.setMaxSize(geometryMaxSize)
+  if (geoJSONMaxSize >= 0):
+    geoJSONCache.setMaxSize(geoJSONMaxSize)
+
+def clearCaches():
+  geometryCache.clear()
+  geoJSONCache.clear()
+
+def getCacheStats():
+  return {"geometry": geometryCache.getStats(), "geoJSON": geoJSONCache.getStats()}
+
+##-------------------- Test -----
+if __name__ == '__main__':
+  ## Function test
+  geoID = '00000000001010010S0000000725200000096535'
+  retVal, data = getBinGeoJSONFromGeoIDCached(geoID, strokeColor="#FF0000", binSize=100)
+  retVal, data = getBinGeoJSONFromGeoIDCached(geoID, strokeColor="#FF0000", binSize=100)
+  #print 'getBinGeoJSONFromGeoIDCached():', retVal, data, getCacheStats()  ## Echo print
+  clearCaches()
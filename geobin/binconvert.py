@@ -0,0 +1,455 @@
+## binconvert.py
+##
+## Need to install numpy: pip install numpy
+## Parquet files need pyarrow (0.15 or later): pip install pyarrow
+##
+## Input argument: see main() (scripts/geobin-converter)
+## Test run: python binconvert.py
+##
+## Functions:
+## convertCSVFile(inFname, outFname, binSizeMeter, binType, zoneNum = -1, lonCol = "", latCol = "", delimiter = ",",
+##                headerFlag = 1, numWorker = 1, chunkBytes = chunkBytesDef, resumeFlag = 0, progress = None)
+##   Input: CSV file of longitude and latitude rows, output CSV file name,
+##          bin size in meters, binType, optional forced zoneNum (same as
+##          getGeoIDFromLL()), longitude and latitude columns (header name
+##          or 0-based index; "": first known name, e.g. lon and lat),
+##          delimiter, header line flag, number of worker processes (<= 0:
+##          number of CPUs), chunk size in bytes, resume flag, optional
+##          progress(numRow, numRowRun) called after each chunk (rows of
+##          the file and of this run)
+##   Output: retVal, numRow, numInvalid
+##     Note: Each output row is the input row plus geoID, centerLongi,
+##           centerLati and zoneNum columns (empty for invalid rows). Rows
+##           are in input order; blank lines are dropped.
+##     Note: The file is read in chunks of whole lines; at most 2 chunks per
+##           worker are in memory.
+##     Note: After each chunk, the output is flushed and <outFname>.ckpt
+##           records input and output offsets. With resumeFlag = 1, a run
+##           with the same input and arguments truncates the output to the
+##           checkpoint and continues after it. The checkpoint is removed
+##           at the end.
+## convertParquetFile(inFname, outPath, binSizeMeter, binType, zoneNum = -1, lonCol = "", latCol = "",
+##                    numWorker = 1, resumeFlag = 0, progress = None)
+##   Input: Parquet file, output folder; others same as convertCSVFile()
+##   Output: retVal, numRow, numInvalid
+##     Note: One part file (part-00000.parquet, ...) per row group of the
+##           input, with geoID, centerLongi, centerLati and zoneNum columns
+##           added (null for invalid rows). Workers read and write their own
+##           row groups; with resumeFlag = 1, existing parts are skipped.
+## main(argv = None)
+##   Input: command line arguments (geobin-converter -h)
+##   Output: exit code (0: done; 1: invalid arguments or files)
+##
+## Return: negative bit 0: input file cannot be read
+##         negative bit 1: output file cannot be written
+##         negative bit 2: invalid binSizeMeter
+##         negative bit 3: invalid binType
+##         negative bit 4: longitude or latitude column not found
+##         negative bit 5: checkpoint does not match input or arguments
+##         negative bit 6: pyarrow not installed (Parquet)
+##
+
+import csv, json, os, sys, time
+from collections import deque
+import numpy as np
+from geoidutm import getGeoIDsFromLLs
+
+chunkBytesDef = 8 << 20
+lonNames = ("longitude", "longi", "lon", "lng", "long", "x")
+latNames = ("latitude", "lati", "lat", "y")
+outColNames = ("geoID", "centerLongi", "centerLati", "zoneNum")
+ckptVersion = 1
+
+## Function
+##-------------------- Columns and arguments -----
+def getColumnInx(colNames, col, knownNames):
+  ## Column index of a header name or 0-based index; -1 if not found
+  if (col == ""):
+    lowerNames = [name.strip().lower() for name in colNames]
+    for name in knownNames:
+      if (name in lowerNames):
+        return lowerNames.index(name)
+    return -1
+  if (col in colNames):
+    return colNames.index(col)
+  try:
+    inx = int(col)
+  except ValueError:
+    return -1
+  if ((inx < 0) or ((len(colNames) > 0) and (inx >= len(colNames)))):
+    return -1
+  return inx
+
+def convertChkPara(binSizeMeter, binType):
+  retVal = 0  ## Init.
+  if ((binSizeMeter < 1) or (binSizeMeter > 9999)):
+    retVal |= 4
+  if ((binType != 0) and (binType != 1)):
+    retVal |= 8
+  return retVal
+
+def getNumWorker(numWorker):
+  if (numWorker <= 0):
+    import multiprocessing
+    numWorker = multiprocessing.cpu_count()
+  return numWorker
+
+##-------------------- CSV chunks -----
+def parseLLsSlow(rows, lonInx, latInx):
+  ## Per row; missing or unparsable values are NaN (invalid rows)
+  longis = np.empty(len(rows))
+  latis = np.empty(len(rows))
+  for i, row in enumerate(rows):
+    try:
+      longis[i] = float(row[lonInx])
+      latis[i] = float(row[latInx])
+    except (IndexError, ValueError):
+      longis[i] = latis[i] = np.nan
+  return longis, latis
+
+def parseLLs(data, lines, lonInx, latInx, delimiter):
+  ## Longitude and latitude arrays of CSV lines
+  if ('"' not in data):
+    ## Same number of columns in each line: one split of the chunk
+    numCol = lines[0].count(delimiter) + 1
+    if ((max(lonInx, latInx) < numCol) and all(line.count(delimiter) == numCol - 1 for line in lines)):
+      fields = data.replace("\r", "").replace("\n", delimiter).split(delimiter)
+      numField = len(lines) * numCol  ## Without the empty field after the last newline
+      try:
+        return (np.array(fields[lonInx:numField:numCol], dtype=np.float64),
+                np.array(fields[latInx:numField:numCol], dtype=np.float64))
+      except ValueError:
+        pass
+    rows = [line.split(delimiter) for line in lines]
+  else:  ## Quoted fields
+    rows = list(csv.reader(lines, delimiter=delimiter))
+  return parseLLsSlow(rows, lonInx, latInx)
+
+def convertCSVChunk(task):
+  ## Worker: CSV lines (one string) -> output lines (one string), numRow, numInvalid
+  data, lonInx, latInx, delimiter, binSizeMeter, binType, zoneNum = task
+  lines = data.splitlines()
+  if (("" in lines) or (data[-1:] != "\n")):  ## Blank lines or no last newline
+    lines = [line for line in lines if (line != "")]
+    data = "\n".join(lines) + "\n"
+  numRow = len(lines)
+  if (numRow == 0):
+    return "", 0, 0
+  longis, latis = parseLLs(data, lines, lonInx, latInx, delimiter)
+  retVals, geoIDs, centerLongis, centerLatis, zoneNums = getGeoIDsFromLLs(longis, latis, binSizeMeter, binType, zoneNum)
+
+  ## One format of the chunk (faster than a format per row)
+  d = delimiter
+  vals = [None] * (numRow * 5)
+  vals[0::5] = lines
+  vals[1::5] = geoIDs.tolist()
+  vals[2::5] = centerLongis.tolist()
+  vals[3::5] = centerLatis.tolist()
+  vals[4::5] = zoneNums.tolist()
+  outData = ("%s" + d + "%s" + d + "%.9f" + d + "%.9f" + d + "%d\n") * numRow % tuple(vals)
+  invalidInx = np.flatnonzero(retVals != 0)
+  if (len(invalidInx) > 0):  ## Empty columns of invalid rows
+    outLines = outData.split("\n")
+    for i in invalidInx:
+      outLines[i] = lines[i] + d * 4
+    outData = "\n".join(outLines)
+  return outData, numRow, len(invalidInx)
+
+def readCSVChunk(inFile, chunkBytes):
+  ## Whole lines of about chunkBytes
+  data = inFile.read(chunkBytes)
+  if ((len(data) > 0) and (data[-1] != "\n")):
+    data += inFile.readline()
+  return data
+
+##-------------------- Checkpoint -----
+def getCkptFname(outFname):
+  return outFname + ".ckpt"
+
+def readCkpt(ckptFname):
+  try:
+    with open(ckptFname, "r") as ckptFile:
+      return json.load(ckptFile)
+  except (IOError, ValueError):
+    return None
+
+def writeCkpt(ckptFname, ckpt):
+  ## Write and rename, so a checkpoint is never partial
+  tmpFname = ckptFname + ".tmp"
+  with open(tmpFname, "w") as ckptFile:
+    json.dump(ckpt, ckptFile)
+    ckptFile.flush()
+    os.fsync(ckptFile.fileno())
+  os.rename(tmpFname, ckptFname)
+
+def getInputInfo(inFname):
+  st = os.stat(inFname)
+  return {"fname": os.path.abspath(inFname), "size": st.st_size, "mtime": int(st.st_mtime)}
+
+##-------------------- Convert -----
+def convertCSVFile(inFname, outFname, binSizeMeter, binType, zoneNum = -1, lonCol = "", latCol = "", delimiter = ",",
+                   headerFlag = 1, numWorker = 1, chunkBytes = chunkBytesDef, resumeFlag = 0, progress = None):
+  retVal = convertChkPara(binSizeMeter, binType)
+  numRow = 0
+  numInvalid = 0
+  if (retVal != 0):
+    return -retVal, numRow, numInvalid
+  try:
+    inFile = open(inFname, "rb")
+  except IOError:
+    return -(retVal | 1), numRow, numInvalid
+  with inFile:
+    ## Columns
+    header = ""
+    colNames = []
+    if (headerFlag == 1):
+      header = inFile.readline()
+      colNames = next(csv.reader([header.rstrip("\r\n")], delimiter=delimiter), [])
+    lonInx = getColumnInx(colNames, lonCol, lonNames)
+    latInx = getColumnInx(colNames, latCol, latNames)
+    if ((lonInx < 0) or (latInx < 0)):
+      return -(retVal | 16), numRow, numInvalid
+    inputOffset = inFile.tell()
+
+    ## Checkpoint
+    ckptFname = getCkptFname(outFname)
+    params = {"binSizeMeter": binSizeMeter, "binType": binType, "zoneNum": zoneNum, "lonInx": lonInx, "latInx": latInx,
+              "delimiter": delimiter, "headerFlag": headerFlag}
+    ckpt = {"version": ckptVersion, "input": getInputInfo(inFname), "params": params,
+            "inputOffset": inputOffset, "outputOffset": 0, "numRow": 0, "numInvalid": 0}
+    outputOffset = -1  ## New output
+    if ((resumeFlag == 1) and os.path.exists(ckptFname) and os.path.exists(outFname)):
+      prevCkpt = readCkpt(ckptFname)
+      if ((prevCkpt is None) or (prevCkpt.get("version") != ckptVersion) or (prevCkpt["input"] != ckpt["input"])
+          or (prevCkpt["params"] != params) or (os.path.getsize(outFname) < prevCkpt["outputOffset"])):
+        return -(retVal | 32), numRow, numInvalid
+      ckpt = prevCkpt
+      outputOffset = ckpt["outputOffset"]
+      numRow = ckpt["numRow"]
+      numInvalid = ckpt["numInvalid"]
+    numRowStart = numRow
+    try:
+      if (outputOffset >= 0):
+        outFile = open(outFname, "r+b")
+        outFile.truncate(outputOffset)  ## Drop rows written after the checkpoint
+        outFile.seek(outputOffset)
+        inFile.seek(ckpt["inputOffset"])
+      else:
+        outFile = open(outFname, "wb")
+        if (headerFlag == 1):
+          outFile.write(delimiter.join([header.rstrip("\r\n")] + list(outColNames)) + "\n")
+        ckpt["outputOffset"] = outFile.tell()
+        writeCkpt(ckptFname, ckpt)
+    except (IOError, OSError):
+      return -(retVal | 2), numRow, numInvalid
+
+    ## Chunks in input order; at most 2 per worker in flight
+    numWorker = getNumWorker(numWorker)
+    pool = None
+    if (numWorker > 1):
+      import multiprocessing
+      pool = multiprocessing.Pool(numWorker)
+    try:
+      with outFile:
+        pending = deque()
+        eofFlag = 0
+        while True:
+          while ((eofFlag == 0) and (len(pending) < max(numWorker * 2, 1))):
+            data = readCSVChunk(inFile, chunkBytes)
+            if (len(data) == 0):
+              eofFlag = 1
+              break
+            task = (data, lonInx, latInx, delimiter, binSizeMeter, binType, zoneNum)
+            if (pool is None):
+              pending.append((convertCSVChunk(task), inFile.tell()))
+            else:
+              pending.append((pool.apply_async(convertCSVChunk, (task,)), inFile.tell()))
+          if (len(pending) == 0):
+            break
+          result, endOffset = pending.popleft()
+          if (pool is not None):
+            result = result.get()
+          outData, numRowChunk, numInvalidChunk = result
+          outFile.write(outData)
+          numRow += numRowChunk
+          numInvalid += numInvalidChunk
+          outFile.flush()
+          os.fsync(outFile.fileno())
+          ckpt.update(inputOffset=endOffset, outputOffset=outFile.tell(), numRow=numRow, numInvalid=numInvalid)
+          writeCkpt(ckptFname, ckpt)
+          if (progress is not None):
+            progress(numRow, numRow - numRowStart)
+    except (IOError, OSError):
+      return -(retVal | 2), numRow, numInvalid
+    finally:
+      if (pool is not None):
+        pool.terminate()
+        pool.join()
+  os.remove(ckptFname)
+  return -retVal, numRow, numInvalid
+
+##-------------------- Parquet -----
+def importPyarrow():
+  ## pyarrow, pyarrow.parquet; None, None if not installed
+  try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+  except ImportError:
+    return None, None
+  return pa, pq
+
+def getPartFname(outPath, rowGroupInx):
+  return os.path.join(outPath, "part-{0:05d}.parquet".format(rowGroupInx))
+
+def getColumnFloats(column):
+  ## ChunkedArray column as a float64 array; nulls as nan
+  if (column.num_chunks == 0):
+    return np.zeros(0, dtype=np.float64)
+  vals = []
+  for chunk in column.chunks:
+    if (chunk.null_count == 0):
+      vals.append(chunk.to_numpy().astype(np.float64))
+    else:
+      vals.append(np.array(chunk.to_pylist(), dtype=np.float64))
+  return np.concatenate(vals)
+
+def convertParquetRowGroup(task):
+  ## Worker: read one row group, write its part file; numRow, numInvalid
+  inFname, rowGroupInx, outPath, lonInx, latInx, binSizeMeter, binType, zoneNum = task
+  pa, pq = importPyarrow()
+  table = pq.ParquetFile(inFname).read_row_group(rowGroupInx)
+  longis = getColumnFloats(table.column(lonInx))
+  latis = getColumnFloats(table.column(latInx))
+  retVals, geoIDs, centerLongis, centerLatis, zoneNums = getGeoIDsFromLLs(longis, latis, binSizeMeter, binType, zoneNum)
+  invalidFlags = (retVals != 0)
+  geoIDList = geoIDs.tolist()
+  for i in np.flatnonzero(invalidFlags):
+    geoIDList[i] = None
+  table = table.append_column("geoID", pa.array(geoIDList, type=pa.string()))
+  table = table.append_column("centerLongi", pa.array(centerLongis, mask=invalidFlags))
+  table = table.append_column("centerLati", pa.array(centerLatis, mask=invalidFlags))
+  table = table.append_column("zoneNum", pa.array(zoneNums.astype(np.int32), mask=invalidFlags))
+  partFname = getPartFname(outPath, rowGroupInx)
+  pq.write_table(table, partFname + ".tmp")
+  os.rename(partFname + ".tmp", partFname)  ## Complete parts only; resume skips them
+  return table.num_rows, int(np.count_nonzero(invalidFlags))
+
+def convertParquetFile(inFname, outPath, binSizeMeter, binType, zoneNum = -1, lonCol = "", latCol = "",
+                       numWorker = 1, resumeFlag = 0, progress = None):
+  retVal = convertChkPara(binSizeMeter, binType)
+  numRow = 0
+  numInvalid = 0
+  pa, pq = importPyarrow()
+  if (pa is None):
+    retVal |= 64
+  if (retVal != 0):
+    return -retVal, numRow, numInvalid
+  try:
+    parquetFile = pq.ParquetFile(inFname)
+  except (IOError, OSError, pa.ArrowException):
+    return -(retVal | 1), numRow, numInvalid
+  colNames = list(parquetFile.schema.names)
+  lonInx = getColumnInx(colNames, lonCol, lonNames)
+  latInx = getColumnInx(colNames, latCol, latNames)
+  if ((lonInx < 0) or (latInx < 0)):
+    return -(retVal | 16), numRow, numInvalid
+  try:
+    if (not os.path.isdir(outPath)):
+      os.makedirs(outPath)
+  except OSError:
+    return -(retVal | 2), numRow, numInvalid
+
+  tasks = []
+  for rowGroupInx in xrange(0, parquetFile.num_row_groups):
+    partFname = getPartFname(outPath, rowGroupInx)
+    if ((resumeFlag == 1) and os.path.exists(partFname)):
+      continue
+    tasks.append((inFname, rowGroupInx, outPath, lonInx, latInx, binSizeMeter, binType, zoneNum))
+  numWorker = min(getNumWorker(numWorker), max(len(tasks), 1))
+  if (numWorker > 1):
+    import multiprocessing
+    pool = multiprocessing.Pool(numWorker)
+    results = pool.imap_unordered(convertParquetRowGroup, tasks)
+  else:
+    pool = None
+    results = (convertParquetRowGroup(task) for task in tasks)
+  try:
+    for numRowPart, numInvalidPart in results:
+      numRow += numRowPart
+      numInvalid += numInvalidPart
+      if (progress is not None):
+        progress(numRow, numRow)
+  except (IOError, OSError):
+    retVal |= 2
+  finally:
+    if (pool is not None):
+      pool.terminate()
+      pool.join()
+  return -retVal, numRow, numInvalid
+
+##-------------------- Command line -----
+def main(argv = None):
+  import argparse
+  parser = argparse.ArgumentParser(prog="geobin-converter",
+                                   description="Add geoID, centerLongi, centerLati and zoneNum columns to a CSV or Parquet file of longitude and latitude rows.")
+  parser.add_argument("input", help="input CSV or Parquet (.parquet, .pq) file")
+  parser.add_argument("output", help="output CSV file (Parquet: output folder of part files)")
+  parser.add_argument("-s", "--bin-size", type=int, default=100, help="bin size in meters (1 ~ 9999; default 100)")
+  parser.add_argument("-t", "--bin-type", type=int, default=1, choices=(0, 1), help="0: square; 1: hexagon (default)")
+  parser.add_argument("-z", "--zone", type=int, default=-1, help="forced UTM zone (default: zone of each point)")
+  parser.add_argument("--lon-col", default="", help="longitude column name or 0-based index (default: lon, lng, longitude, ...)")
+  parser.add_argument("--lat-col", default="", help="latitude column name or 0-based index (default: lat, latitude, ...)")
+  parser.add_argument("-d", "--delimiter", default=",", help="CSV delimiter (default ,)")
+  parser.add_argument("--no-header", action="store_true", help="CSV has no header line (columns by index; default 0 and 1)")
+  parser.add_argument("--format", choices=("csv", "parquet"), default="", help="input format (default: by file extension)")
+  parser.add_argument("-w", "--workers", type=int, default=0, help="worker processes (default 0: number of CPUs)")
+  parser.add_argument("--chunk-mb", type=float, default=chunkBytesDef / float(1 << 20), help="CSV chunk size in MB (default 8)")
+  parser.add_argument("-r", "--resume", action="store_true", help="continue a partially converted output")
+  parser.add_argument("-q", "--quiet", action="store_true", help="no progress output")
+  args = parser.parse_args(argv)
+
+  fileFormat = args.format
+  if (fileFormat == ""):
+    fileFormat = "parquet" if (os.path.splitext(args.input)[1].lower() in (".parquet", ".pq")) else "csv"
+  delimiter = args.delimiter.decode("string_escape")  ## e.g. \t
+  lonCol = args.lon_col
+  latCol = args.lat_col
+  if (args.no_header and (lonCol == "") and (latCol == "")):
+    lonCol, latCol = "0", "1"
+
+  startTime = time.time()
+  status = {"numRowRun": 0, "printTime": 0.0}
+  def progress(numRow, numRowRun):
+    status["numRowRun"] = numRowRun
+    if ((not args.quiet) and (time.time() - status["printTime"] >= 1.0)):  ## At most once a second
+      status["printTime"] = time.time()
+      sys.stderr.write("\r{0} rows, {1:.0f} rows/sec".format(numRow, numRowRun / max(time.time() - startTime, 1e-9)))
+      sys.stderr.flush()
+
+  if (fileFormat == "parquet"):
+    retVal, numRow, numInvalid = convertParquetFile(args.input, args.output, args.bin_size, args.bin_type, args.zone, lonCol, latCol,
+                                                    args.workers, int(args.resume), progress)
+  else:
+    retVal, numRow, numInvalid = convertCSVFile(args.input, args.output, args.bin_size, args.bin_type, args.zone, lonCol, latCol,
+                                                delimiter, int(not args.no_header), args.workers, int(args.chunk_mb * (1 << 20)),
+                                                int(args.resume), progress)
+  if (retVal < 0):
+    messages = ((1, "input file cannot be read"), (2, "output file cannot be written"), (4, "invalid bin size"),
+                (8, "invalid bin type"), (16, "longitude or latitude column not found"),
+                (32, "checkpoint does not match input or arguments (run without --resume to start over)"),
+                (64, "Parquet needs pyarrow: pip install pyarrow"))
+    for bit, message in messages:
+      if (((-retVal) & bit) != 0):
+        sys.stderr.write("geobin-converter: {0}\n".format(message))
+    return 1
+  if (not args.quiet):
+    seconds = max(time.time() - startTime, 1e-9)
+    sys.stderr.write("\r{0} rows ({1} invalid) in {2:.1f} sec, {3:.0f} rows/sec\n".format(numRow, numInvalid, seconds, status["numRowRun"] / seconds))
+  return 0
+
+##-------------------- Test -----
+if __name__ == '__main__':
+  ## Function test
+  task = ("-122.4194,37.7749\nbad,37.0\n", 0, 1, ",", 100, 1, -1)
+  outData, numRow, numInvalid = convertCSVChunk(task)
+  #print 'convertCSVChunk():', numRow, numInvalid, outData  ## Echo print
@@ -0,0 +1,348 @@
+## binindex.py
+##
+## Need to install numpy: pip install numpy
+##
+## Input argument: None
+## Test run: python binindex.py
+##
+## Functions:
+## buildBinIndex(bins, pathName, fname = "GeoBin.idx")
+##   Input: bins (iterable of BinRecord, or of (attrs, BinRecord) with attrs
+##          a dictionary of properties or a regionId, e.g. iterBinsInRegion()
+##          or iterBinsInRegions()), pathName, optional file name
+##   Return: same bits as BinIndexWriter.close()
+##     Note: Streaming; records are written to temporary files as they come
+##           and only the packed GeoIDs are sorted in memory.
+##
+## Classes:
+## BinIndexWriter(pathName, fname = "GeoBin.idx")
+##   addBins(binRecs, attrsList = None)
+##     Input: list of BinRecord, optional list of property dictionaries
+##   close()
+##     Return: negative bit 5: path cannot be created
+##             negative bit 6: file cannot be created
+##             0: successful
+##     Note: Bins are sorted by packed GeoID (geoInt; see geoIDToInt()); the
+##           first of duplicated bins is kept. Bins whose GeoID cannot be
+##           packed (geoIDToInt() error) are dropped; numBinDropped counts
+##           duplicated and dropped bins after close().
+## BinIndex(fname)
+##   Read only index opened with memory maps; no projection at lookup.
+##     Note: File layout (little-endian): 64-byte header (magic, numBin,
+##           binType, binSizeMeter, numVertex, offsets), sorted geoInts
+##           (int64), fixed-size geometry records (float64: center longitude,
+##           latitude, numVertex x [longitude, latitude]), optional payload
+##           offsets (int64, numBin + 1) and payload bytes (properties as
+##           JSON members with a trailing comma, json.dumps(); features
+##           render them with getPropsJsonGeoStr()).
+##   lookup(geoID)
+##     Input: geoID (string or packed integer)
+##     Output: retVal, numValInBound, llBound, centerLongi, centerLati, attrs
+##     Return: same bits as geoIDToInt(), plus
+##             negative bit 6: GeoID not in index
+##   lookups(geoIDs)
+##     Input: GeoID sequence or array
+##     Output: retVal array, index array (-1 if not found), numValInBound,
+##             llBound array (N, numVertex, 2), centerLongi array,
+##             centerLati array
+##     Note: Requests are sorted once and merged with the sorted keys a
+##           block at a time; the key cursor only moves forward.
+##   getBinGeoJSON(geoID, **kwargs)
+##     Output: retVal, data (same GeoJSON string layout as
+##             getBinGeoJSONFromGeoID() with stored properties and kwargs)
+##   getBinGeoJSONs(geoIDs, **kwargs)
+##     Output: retVal array, list of data ('' if not found)
+##   close()
+##
+
+import sys, os, struct, json
+import numpy as np
+from geoidutm import geoIDToInt, geoIDsToInts, isGeoInt, intToGeoID
+from getBinsInRegions import BinRecord, getPropsJsonGeoStr, getDataJsonGeoFeatureStr, mkdirWChk, openFileWChk, outBufSize
+
+idxMagic = "GEOBIDX1"
+idxHeaderFmt = "<8s7q"  ## magic, numBin, binType, binSizeMeter, numVertex, geomOff, payIdxOff (0: no payload), payOff
+idxHeaderSize = 64
+idxSortChunk = 1 << 16  ## Records copied per chunk when sorting
+
+## Function
+def getIdxTmpFnames(fname):
+  return [fname + ext for ext in (".key.tmp", ".geom.tmp", ".paylen.tmp", ".pay.tmp")]
+
+def getPayStr(attrs):
+  ## Properties as JSON members for getAttrs(); strings escaped
+  if (len(attrs) == 0):
+    return ""
+  return json.dumps(attrs, separators=(",", ":"))[1:-1] + ","
+
+def mapRawFile(fname, dtype, shape):
+  if (shape[0] == 0):  ## Empty file cannot be mapped
+    return np.zeros(shape, dtype=dtype)
+  return np.memmap(fname, dtype=dtype, mode="r", shape=shape)
+
+##-------------------- Class -----
+class BinIndexWriter(object):
+
+  def __init__(self, pathName, fname = "GeoBin.idx"):
+    self.pathName = pathName
+    self.fname = os.path.join(pathName, fname)
+    self.tmp_files = []
+    self.numBin = 0
+    self.binType = -1
+    self.binSizeMeter = 0
+    self.numVertex = 0
+    self.payFlag = 0  ## 1 if any bin has properties
+    self.numBinDropped = 0  ## Duplicated or not packable bins (after close())
+    self.retVal = mkdirWChk(pathName)
+    for tmpFname in getIdxTmpFnames(self.fname):
+      if (self.retVal == 0):
+        self.retVal, tmp_file = openFileWChk(pathName, os.path.basename(tmpFname), outBufSize, "wb")
+        if (self.retVal == 0):
+          self.tmp_files.append(tmp_file)
+
+  def addBins(self, binRecs, attrsList = None):
+    if ((self.retVal != 0) or (len(binRecs) == 0)):
+      return
+    if (self.numBin == 0):  ## Same bin size and type for all bins of a run
+      self.binType = int(binRecs[0].geoID[10:11])
+      self.binSizeMeter = int(binRecs[0].geoID[11:15])
+      self.numVertex = binRecs[0].numBinBound
+    key_file, geom_file, paylen_file, pay_file = self.tmp_files
+    key_file.write(geoIDsToInts([binRec.geoID for binRec in binRecs])[1].astype('<i8').tostring())
+    geoms = np.array([[binRec.centerLongi, binRec.centerLati] + [val for i in xrange(0, self.numVertex) for val in (binRec.lonClock[i], binRec.latClock[i])]
+                      for binRec in binRecs], dtype='<f8')
+    geom_file.write(geoms.tostring())
+    pays = [""] * len(binRecs)
+    if (attrsList is not None):
+      pays = [getPayStr(attrs) for attrs in attrsList]
+      self.payFlag |= int(any(len(pay) > 0 for pay in pays))
+    paylen_file.write(np.array([len(pay) for pay in pays], dtype='<i8').tostring())
+    pay_file.write("".join(pays))
+    self.numBin += len(binRecs)
+
+  def close(self):
+    for tmp_file in self.tmp_files:
+      tmp_file.close()
+    tmpFnames = getIdxTmpFnames(self.fname)
+    if (self.retVal == 0):
+      self.retVal = self.writeIndex(tmpFnames)
+    for tmpFname in tmpFnames:
+      if (os.path.isfile(tmpFname)):
+        os.remove(tmpFname)
+    self.tmp_files = []
+    retVal = self.retVal
+    if (retVal > 0):
+      retVal *= -1
+    return retVal
+
+  def writeIndex(self, tmpFnames):
+    ## Sort keys in memory; copy geometry and payload records in key order a chunk at a time
+    numStride = 2 + 2 * self.numVertex
+    keys = mapRawFile(tmpFnames[0], '<i8', (self.numBin,))
+    geoms = mapRawFile(tmpFnames[1], '<f8', (self.numBin, numStride))
+    payLens = mapRawFile(tmpFnames[2], '<i8', (self.numBin,))
+    order = np.argsort(keys, kind='mergesort')  ## Stable; first of duplicated bins kept
+    sortedKeys = np.asarray(keys[order])
+    keepFlags = (sortedKeys >= 0)
+    keepFlags[1:] &= (sortedKeys[1:] != sortedKeys[:-1])
+    order = order[keepFlags]
+    numBin = len(order)
+    self.numBinDropped = self.numBin - numBin
+
+    geomOff = idxHeaderSize + 8 * numBin
+    payIdxOff = 0
+    payOff = geomOff + 8 * numStride * numBin
+    if (self.payFlag == 1):
+      payIdxOff = payOff
+      payOff = payIdxOff + 8 * (numBin + 1)
+    retVal, idx_file = openFileWChk(self.pathName, os.path.basename(self.fname), outBufSize, "wb")
+    if (retVal != 0):
+      return retVal
+    idx_file.write(struct.pack(idxHeaderFmt, idxMagic, numBin, self.binType, self.binSizeMeter, self.numVertex, geomOff, payIdxOff, payOff))
+    idx_file.write(sortedKeys[keepFlags].astype('<i8').tostring())
+    for inxStart in xrange(0, numBin, idxSortChunk):
+      idx_file.write(np.asarray(geoms[order[inxStart:inxStart + idxSortChunk]], dtype='<f8').tostring())
+    if (self.payFlag == 1):
+      payStarts = np.concatenate(([0], np.cumsum(payLens)))
+      idx_file.write(np.concatenate(([0], np.cumsum(np.asarray(payLens[order])))).astype('<i8').tostring())
+      pays = mapRawFile(tmpFnames[3], 'S1', (int(payStarts[-1]),))
+      for inxStart in xrange(0, numBin, idxSortChunk):
+        idx_file.write("".join([pays[payStarts[i]:payStarts[i + 1]].tostring() for i in order[inxStart:inxStart + idxSortChunk]]))
+      del pays
+    idx_file.close()
+    del keys, geoms, payLens  ## Unmap before temporary files are removed
+    return 0
+
+class BinIndex(object):
+
+  def __init__(self, fname):
+    with open(fname, "rb") as idx_file:
+      header = struct.unpack(idxHeaderFmt, idx_file.read(struct.calcsize(idxHeaderFmt)))
+    if (header[0] != idxMagic):
+      raise ValueError("BinIndex(): not a bin index file: " + fname)
+    magic, self.numBin, self.binType, self.binSizeMeter, self.numVertex, geomOff, payIdxOff, payOff = header
+    self.keys = np.zeros(0, dtype='<i8')
+    self.geoms = np.zeros((0, 2 + 2 * self.numVertex), dtype='<f8')
+    self.payStarts = None
+    self.pays = None
+    if (self.numBin > 0):
+      self.keys = np.memmap(fname, dtype='<i8', mode="r", offset=idxHeaderSize, shape=(self.numBin,))
+      self.geoms = np.memmap(fname, dtype='<f8', mode="r", offset=geomOff, shape=(self.numBin, 2 + 2 * self.numVertex))
+      if (payIdxOff > 0):
+        self.payStarts = np.memmap(fname, dtype='<i8', mode="r", offset=payIdxOff, shape=(self.numBin + 1,))
+        if (self.payStarts[-1] > 0):
+          self.pays = np.memmap(fname, dtype='S1', mode="r", offset=payOff, shape=(int(self.payStarts[-1]),))
+
+  def find(self, geoInt):
+    ## Index of geoInt in keys; -1 if not found
+    inx = int(np.searchsorted(self.keys, geoInt))
+    if ((inx < self.numBin) and (self.keys[inx] == geoInt)):
+      return inx
+    return -1
+
+  def getPropsStr(self, inx):
+    if (self.pays is None):
+      return ""
+    return self.pays[self.payStarts[inx]:self.payStarts[inx + 1]].tostring()
+
+  def getAttrs(self, inx):
+    propsStr = self.getPropsStr(inx)
+    if (len(propsStr) == 0):
+      return {}
+    return json.loads("{" + propsStr[:-1] + "}")
+
+  def getFeaturePropsStr(self, inx):
+    ## Stored properties rendered by getPropsJsonGeoStr(), as getBinGeoJSONFromGeoID() does
+    attrs = {}
+    for key, value in self.getAttrs(inx).iteritems():
+      if (type(value) == unicode):
+        value = value.encode("utf-8")
+      attrs[key.encode("utf-8")] = value
+    return getPropsJsonGeoStr(**attrs)
+
+  def lookup(self, geoID):
+    numValInBound = 0
+    llBound = []
+    centerLongi = 0.0
+    centerLati = 0.0
+    attrs = {}
+    retVal, geoInt = geoIDToInt(geoID)
+    inx = -1
+    if (retVal == 0):
+      inx = self.find(geoInt)
+      if (inx < 0):
+        retVal = -64
+    if (retVal == 0):
+      geom = self.geoms[inx].tolist()
+      centerLongi, centerLati = geom[0:2]
+      llBound = geom[2:]
+      numValInBound = 2 * self.numVertex
+      attrs = self.getAttrs(inx)
+    return retVal, numValInBound, llBound, centerLongi, centerLati, attrs
+
+  def mergeSorted(self, sortedInts):
+    ## Insertion indices of sorted requests; merge with the keys a block of requests at a time.
+    ## The key cursor only moves forward; a galloping search bounds the key window of each block.
+    inxs = np.zeros(len(sortedInts), dtype=np.int64)
+    cursor = 0
+    for inxStart in xrange(0, len(sortedInts), idxSortChunk):
+      block = sortedInts[inxStart:inxStart + idxSortChunk]
+      step = len(block)
+      inxEnd = min(cursor + step, self.numBin)
+      while ((inxEnd < self.numBin) and (self.keys[inxEnd - 1] < block[-1])):
+        step *= 2
+        inxEnd = min(cursor + step, self.numBin)
+      inxs[inxStart:inxStart + len(block)] = cursor + np.searchsorted(self.keys[cursor:inxEnd], block)
+      cursor = int(inxs[inxStart + len(block) - 1])
+    return inxs
+
+  def lookups(self, geoIDs):
+    retVals, geoInts = geoIDsToInts(geoIDs)
+    order = np.argsort(geoInts, kind='mergesort')
+    inxs = self.mergeSorted(geoInts[order])
+    inxs = np.minimum(inxs, max(self.numBin - 1, 0))
+    foundFlags = np.zeros(len(geoInts), dtype=bool)
+    if (self.numBin > 0):
+      foundFlags[order] = (np.asarray(self.keys)[inxs] == geoInts[order])
+    retVals[(retVals == 0) & ~foundFlags] = -64
+    foundInxs = np.zeros(len(geoInts), dtype=np.int64)
+    foundInxs.fill(-1)
+    foundInxs[order] = inxs
+    foundInxs[retVals != 0] = -1
+    llBounds = np.zeros((len(geoInts), self.numVertex, 2))
+    llBounds.fill(np.nan)
+    centerLongis = np.zeros(len(geoInts))
+    centerLatis = np.zeros(len(geoInts))
+    validInx = np.flatnonzero(foundInxs >= 0)
+    if (len(validInx) > 0):
+      validInx = validInx[np.argsort(foundInxs[validInx], kind='mergesort')]  ## Read the file in key order
+      geoms = self.geoms[foundInxs[validInx]]
+      centerLongis[validInx] = geoms[:, 0]
+      centerLatis[validInx] = geoms[:, 1]
+      llBounds[validInx] = geoms[:, 2:].reshape(-1, self.numVertex, 2)
+    return retVals, foundInxs, 2 * self.numVertex, llBounds, centerLongis, centerLatis
+
+  def getFeatureStr(self, inx, geoID, propsStr):
+    geom = self.geoms[inx].tolist()
+    return getDataJsonGeoFeatureStr(geoID, 2 * self.numVertex, geom[2:], propsStr + self.getFeaturePropsStr(inx))
+
+  def getBinGeoJSON(self, geoID, **kwargs):
+    data = ""
+    retVal, geoInt = geoIDToInt(geoID)
+    if (retVal == 0):
+      inx = self.find(geoInt)
+      if (inx < 0):
+        retVal = -64
+      else:
+        if (isGeoInt(geoID)):  ## Packed GeoID; output GeoID string
+          geoID = intToGeoID(geoInt)[1]
+        data = self.getFeatureStr(inx, geoID, getPropsJsonGeoStr(**kwargs))
+    return retVal, data
+
+  def getBinGeoJSONs(self, geoIDs, **kwargs):
+    retVals, inxs = self.lookups(geoIDs)[0:2]
+    propsStr = getPropsJsonGeoStr(**kwargs)
+    datas = [""] * len(inxs)
+    for i in np.flatnonzero(inxs >= 0):
+      datas[i] = self.getFeatureStr(inxs[i], intToGeoID(int(self.keys[inxs[i]]))[1], propsStr)
+    return retVals, datas
+
+  def close(self):
+    self.keys = None
+    self.geoms = None
+    self.payStarts = None
+    self.pays = None
+
+def buildBinIndex(bins, pathName, fname = "GeoBin.idx"):
+  binIdxWriter = BinIndexWriter(pathName, fname)
+  binRecs = []
+  attrsList = []
+  for item in bins:
+    if (isinstance(item, BinRecord)):
+      binRecs.append(item)
+      attrsList.append({})
+    else:
+      attrs, binRec = item
+      if (not isinstance(attrs, dict)):  ## e.g. regionId of iterBinsInRegions()
+        attrs = {"regionId": attrs}
+      binRecs.append(binRec)
+      attrsList.append(attrs)
+    if (len(binRecs) >= idxSortChunk):
+      binIdxWriter.addBins(binRecs, attrsList)
+      binRecs = []
+      attrsList = []
+  binIdxWriter.addBins(binRecs, attrsList)
+  return binIdxWriter.close()
+
+##-------------------- Test -----
+if __name__ == '__main__':
+  ## Function test
+  numValInBound = 8
+  llBound = [-122.51593,37.75312,-122.4993,37.78031,-122.432803,37.795259,-122.44142,37.752214]  ## in region; small region
+  pathName = 'C:\\Users\\wyang.TTSWIRELESS\\Desktop\\MyProjects\\Python\\MyProjects\\GeoID'  ## Path to store GeoBin.idx
+  geoID = '00000000001010010S0000000725200000096535'
+  #from getBinsInRegions import iterBinsInRegion  ## Uncomment to build and read an index
+  #retVal = buildBinIndex(iterBinsInRegion(numValInBound, llBound, 100, 1), pathName)
+  #binIdx = BinIndex(os.path.join(pathName, "GeoBin.idx"))
+  #print 'BinIndex.getBinGeoJSON():', binIdx.getBinGeoJSON(geoID, binSize=100), ':', geoID  ## Echo print
+  #binIdx.close()
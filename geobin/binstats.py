@@ -0,0 +1,141 @@
+## binstats.py
+##
+## Input argument: None
+## Test run: python binstats.py
+##
+## Classes:
+## BinStats(callback = None)
+##   Input: optional callback(event, zoneNum, counts) for a metrics system;
+##          event "zone" at the end of each zone (zoneNum, counts of the
+##          zone), "run" at the end of the run (zoneNum -1, totals)
+##     Note: Counts per zone of a getBinsOneLLBoundWStats() run:
+##           cellsVisited: lattice cells of the walked rows
+##           fromLatLonCalls, toLatLonCalls: UTM conversions (utmproj.py;
+##             batch conversions count each point)
+##           ptInRegionCalls, edgesTested: bin vertex checks and the polygon
+##             edges they test (llPtInRegion(); in coverMode 1 and 2 only
+##             the vertices near the boundary)
+##           scanPtsClassified, scanEdgesTested: lattice vertices and bin
+##             boxes classified by the scanline engine (coverMode 1 and 2,
+##             regionscan.py) and the region edges of the rows and bands
+##             it tests for them (edge crossings, touched boxes, clipping)
+##           binsEmitted: bins in region
+##           binsSkippedSeam: bins skipped by the startChkH/endChkH zone
+##             seam check (center in the next zone)
+##           binsClipped: boundary bins clipped for the cover fraction
+##             (coverMode 2)
+##           seconds: wall time of the zone (including output of its bins)
+##     Note: Counting is enabled only while a BinStats is active (start() to
+##           stop()); otherwise the hot paths only test for None. One active
+##           BinStats per process; pool workers count their own strips and
+##           the counts are merged into the zone.
+##   start(), stop()
+##     Note: Activate and deactivate counting (stop() calls callback "run").
+##   startZone(zoneNum), endZone()
+##   addCounts(counts)
+##     Input: counts dictionary added to the current zone (pool worker counts)
+##   addFileBytes(fname, numByte)
+##   getTotals()
+##     Output: counts dictionary of all zones
+##   toDict()
+##     Output: {"zones": {zoneNum: counts}, "totals": counts, "bytesWritten":
+##             {fname: bytes}, "seconds": run seconds} (JSON serializable)
+##
+## Functions:
+## getActiveStats()
+##   Output: active BinStats or None
+##
+
+import sys, time
+import utmproj
+
+counterNames = ("cellsVisited", "fromLatLonCalls", "toLatLonCalls", "ptInRegionCalls", "edgesTested", "scanPtsClassified", "scanEdgesTested",
+                "binsEmitted", "binsSkippedSeam", "binsClipped")
+
+## BinStats of the current instrumented run; None when not counting
+activeStats = None
+
+##-------------------- Class -----
+class BinStats(object):
+
+  def __init__(self, callback = None):
+    self.callback = callback
+    self.zones = {}  ## zoneNum: counts
+    self.bytesWritten = {}
+    self.seconds = 0.0
+    self.cur = None  ## Counts of the current zone
+    self.curZoneNum = -1
+    self.startTime = 0.0
+    self.zoneStartTime = 0.0
+    self.zoneStartCalls = [0, 0]
+    self.prevStats = None
+    self.prevCallCounts = None
+
+  def start(self):
+    global activeStats
+    self.prevStats = activeStats
+    self.prevCallCounts = utmproj.callCounts
+    activeStats = self
+    utmproj.callCounts = [0, 0]
+    self.startTime = time.time()
+
+  def stop(self):
+    global activeStats
+    if (self.cur is not None):
+      self.endZone()
+    self.seconds += time.time() - self.startTime
+    activeStats = self.prevStats
+    utmproj.callCounts = self.prevCallCounts
+    if (self.callback is not None):
+      self.callback("run", -1, self.getTotals())
+
+  def startZone(self, zoneNum):
+    if (self.cur is not None):
+      self.endZone()
+    if (zoneNum not in self.zones):
+      self.zones[zoneNum] = dict.fromkeys(counterNames + ("seconds",), 0)
+    self.cur = self.zones[zoneNum]
+    self.curZoneNum = zoneNum
+    self.zoneStartTime = time.time()
+    self.zoneStartCalls = list(utmproj.callCounts)
+
+  def endZone(self):
+    cur = self.cur
+    cur["fromLatLonCalls"] += utmproj.callCounts[0] - self.zoneStartCalls[0]
+    cur["toLatLonCalls"] += utmproj.callCounts[1] - self.zoneStartCalls[1]
+    cur["seconds"] += time.time() - self.zoneStartTime
+    self.cur = None
+    if (self.callback is not None):
+      self.callback("zone", self.curZoneNum, dict(cur))
+
+  def addCounts(self, counts):
+    for name in counterNames:
+      self.cur[name] += counts[name]
+
+  def addFileBytes(self, fname, numByte):
+    self.bytesWritten[fname] = self.bytesWritten.get(fname, 0) + numByte
+
+  def getTotals(self):
+    totals = dict.fromkeys(counterNames + ("seconds",), 0)
+    for counts in self.zones.itervalues():
+      for name in totals:
+        totals[name] += counts[name]
+    totals["bytesWritten"] = sum(self.bytesWritten.itervalues())
+    return totals
+
+  def toDict(self):
+    return {"zones": dict((zoneNum, dict(counts)) for zoneNum, counts in self.zones.iteritems()),
+            "totals": self.getTotals(), "bytesWritten": dict(self.bytesWritten), "seconds": self.seconds}
+
+## Function
+def getActiveStats():
+  return activeStats
+
+##-------------------- Test -----
+if __name__ == '__main__':
+  ## Class test
+  stats = BinStats()
+  stats.start()
+  stats.startZone(10)
+  stats.stop()
+  #print 'BinStats():', stats.toDict()  ## Echo print
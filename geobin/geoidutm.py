@@ -1,353 +1,1356 @@
-## geoidutm.py
-##
-## Need to install utm: pip install utm
-##
-## Input argument: None
-## Test run: python geoidutm.py
-##
-## Fuctions:
-## getGeoIDFromLL(longi, lati, binSizeMeter, binType, zoneNumIn = -1)
-##   Input: Longitude, Latitude, Bin size in meters, binType
-##     Note: Bin size should be positive integer in meters (1 ~ 9999).
-##     Note: binType 0: square (center location as geoID),
-##                   1: Hexagon (center location as geoID)
-##   Output: GeoID[40], centerLongi, centerLati, zoneNum
-##     Note: GeoID: [Reserved][BinType][BinSize][ZoneNum][LatitudeBand]
-##       [Easting][Northing]
-##           #Bytes: 10,1,4,3,11,11 = 40 characters
-##   Return: negative bit 0: invalid longitude
-##           negative bit 1: invalid latitude
-##           negative bit 2: invalid bin size
-##           negative bit 3: invalid bin type
-##           0 (successful)
-## getLLFromGeoID(geoID)
-##   Input: geoID
-##   Output: numValInBound, llBound, centerLongitude, centerLatitude,
-##     binSizeMeter, binType
-##   Return: negative bit 0: invalid geoID length
-##           negative bit 1: invalid geoID binType
-##           negative bit 2: invalid geoID binSize
-##           negative bit 3: invalid geoID zoneNum
-##           negative bit 4: invalid geoID latitudeBand
-##           0 (successful)
-##
-
-import utm, math, sys
-
-minLenGeoID = 25
-
-## Function
-##-------------------- For bin in in general -----
-def getLLBoundFromUTMBound(numVal, eastingClock, northingClock, zoneNum, latiBand):
-  lonClock = [0] * numVal
-  latClock = [0] * numVal
-  for p in xrange(0, numVal):
-    latClock[p], lonClock[p] = utm.to_latlon(eastingClock[p], northingClock[p], zoneNum, latiBand)
-  return lonClock, latClock
-
-def getLLBoundFromUTMBound2(numVal, eastingClock, northingClock, zoneNum, latiBand):
-  inxBound = 0
-  numValInBound = numVal * 2
-  for i in xrange(0, numVal):
-    llBound[inxBound+1], llBound[inxBound] = utm.to_latlon(eastingClock[i], northingClock[i], zoneNum, latiBand)
-    inxBound += 2
-  return numValInBound, llBound
-
-##-------------------- Square bin -----
-def getBoundFromCenterSquare(xOffset, yOffset, easting, northing):
-  eastingClock = [0] * 4
-  northingClock = [0] * 4
-  eastingClock[0] = easting - xOffset
-  eastingClock[1] = easting - xOffset
-  eastingClock[2] = easting + xOffset
-  eastingClock[3] = easting + xOffset
-  northingClock[0] = northing - yOffset
-  northingClock[1] = northing + yOffset
-  northingClock[2] = northing + yOffset
-  northingClock[3] = northing - yOffset
-  return eastingClock, northingClock
-
-def getGeoIDXYCenterSquare(easting, northing, binSizeMeter, zoneNum, latiBand):
-  halfBinSize = binSizeMeter / 2.0
-  xSeg = binSizeMeter
-  xOffset = halfBinSize
-  ySeg = binSizeMeter
-  yOffset = halfBinSize
-  x = int(easting / xSeg)
-  y = int(northing / ySeg)
-  centerEasting = x * xSeg + xOffset
-  centerNorthing = y * ySeg + yOffset
-  centerLati, centerLongi = utm.to_latlon(centerEasting, centerNorthing, zoneNum, latiBand)
-  return x, y, centerLongi, centerLati
-
-def getGeoIDCenterBoundLLSquare(binSizeMeter, x, y):
-  eastingClock = [0,1,2,3]
-  northingClock = [0,1,2,3]
-  halfBinSize = binSizeMeter / 2.0
-  xSeg = binSizeMeter
-  xOffset = halfBinSize
-  ySeg = binSizeMeter
-  yOffset = halfBinSize
-  easting = x * xSeg + xOffset
-  northing = y * ySeg + yOffset
-  centerLati, centerLongi = utm.to_latlon(easting, northing, zoneNum, latiBand)
-  eastingClock, northingClock = getBoundFromCenterSquare(xOffset, yOffset, easting, northing)
-  numValInBound, llBound = getLLBoundFromUTMBound2(4, eastingClock, northingClock, zoneNum, latiBand)
-  return numValInBound, llBound, centerLongi, centerLati
-
-##-------------------- Hexagon bin -----
-def isLeft(x, y, aX, aY, bX, bY):
-  ## http://stackoverflow.com/questions/1560492/
-  ##   how-to-tell-whether-a-point-is-to-the-right-or-left-side-of-a-line
-  ## (x, y): poiny to check; (aX, aY): line point 1; (bX, bY): line point 2
-  ## val: 0: colinear; > 0: left; < 0: right
-  ##   line horizontal -> > 0: above the line
-  leftFlag = 0
-  val = (bX - aX) * (y - aY) - (bY - aY) * (x - aX)
-  if (val > 0):
-    leftFlag = 1
-  elif (val < 0):
-    leftFlag = 0
-  return leftFlag
-
-def getBoundFromCenterHexagon(xSeg, ySeg, centerEasting, centerNorthing):
-  eastingClock = [0,1,2,3,4,5]
-  northingClock = [0,1,2,3,4,5]
-  eastingClock[0] = centerEasting - 2.0 * xSeg
-  eastingClock[1] = centerEasting - xSeg
-  eastingClock[2] = centerEasting + xSeg
-  eastingClock[3] = centerEasting + 2.0 * xSeg
-  eastingClock[4] = centerEasting + xSeg
-  eastingClock[5] = centerEasting - xSeg
-  northingClock[0] = centerNorthing
-  northingClock[1] = centerNorthing + ySeg
-  northingClock[2] = centerNorthing + ySeg
-  northingClock[3] = centerNorthing
-  northingClock[4] = centerNorthing - ySeg
-  northingClock[5] = centerNorthing - ySeg
-  return eastingClock, northingClock
-
-def getGeoIDXYCenterHexagon(easting, northing, binSizeMeter, zoneNum, latiBand):
-  eastingClock = [0,1,2,3,4,5]
-  northingClock = [0,1,2,3,4,5]
-  xSeg = binSizeMeter / 4.0
-  xSegNum = math.floor(easting / xSeg)
-  xRegionNum = math.floor(xSegNum / 6)
-  xRegionRem = xSegNum % 6               ## 0 ~ 5
-
-  ySeg = binSizeMeter / 2.0 * math.sin(math.pi / 3.0)
-  ySegNum = math.floor(northing / ySeg)
-  yRegionRem = ySegNum % 2
-
-  x = math.floor(xSegNum/3)
-  y = ySegNum
-
-  ## Init. center and hexagon bound
-  if ((xRegionRem >= 0) and (xRegionRem < 3)):
-    centerEasting = xRegionNum * 1.5 * binSizeMeter + 0.5 * binSizeMeter
-  else:
-    centerEasting = xRegionNum * 1.5 * binSizeMeter + binSizeMeter + xSeg
-  centerNorthing = ySegNum * ySeg
-  eastingClock, northingClock = getBoundFromCenterHexagon(xSeg, ySeg, centerEasting, centerNorthing)
-
-  #print 'A', xSeg, xSegNum, xRegionNum, xRegionRem, ySeg, ySegNum, yRegionRem, x, y, centerEasting, centerNorthing  ## Echo print
-
-  ## Revise x, y
-  if ((xRegionRem == 0) and (yRegionRem == 0)):
-    leftFlag = isLeft(easting, northing, eastingClock[0], northingClock[0], eastingClock[1], northingClock[1])
-    if (leftFlag != 1):
-      x += 1  ## (x, y) = (odd, even)
-    else:
-      y += 1  ## (even, odd)
-  elif (((xRegionRem == 1) or (xRegionRem == 2)) and (yRegionRem == 0)):
-    x += 1  ## (odd, even)
-  elif ((xRegionRem == 3) and (yRegionRem == 0)):
-    leftFlag = isLeft(easting, northing, eastingClock[5], northingClock[5], eastingClock[0], northingClock[0])
-    if (leftFlag == 0):
-      x += 1  ## (even, odd)
-      y += 1
-  elif (((xRegionRem == 4) or (xRegionRem == 5)) and (yRegionRem == 0)):
-    x += 1  ## (even, odd)
-    y += 1
-  elif ((xRegionRem == 0) and (yRegionRem == 1)):
-    leftFlag = isLeft(easting, northing, eastingClock[5], northingClock[5], eastingClock[0], northingClock[0])
-    if (leftFlag != 1):
-      x += 1  ## (odd, even)
-      y += 1
-  elif (((xRegionRem == 1) or (xRegionRem == 2)) and (yRegionRem == 1)):
-    x += 1  ## (odd, even)
-    y += 1
-  elif ((xRegionRem == 3) and (yRegionRem == 1)):
-    leftFlag = isLeft(easting, northing, eastingClock[0], northingClock[0], eastingClock[1], northingClock[1])
-    if (leftFlag == 0):
-      x += 1  ## (even, odd)
-    else:
-      y += 1  ## (odd, even)
-  elif (((xRegionRem == 4) or (xRegionRem == 5)) and (yRegionRem == 1)):
-    x += 1  ## (even, odd)
-
-  #print 'B', xSeg, xSegNum, xRegionNum, xRegionRem, ySeg, ySegNum, yRegionRem, x, y, centerEasting, centerNorthing  ## Echo print
-
-  ## Update center and Hexagon bound
-  centerEasting = x * 3.0 * xSeg - xSeg 
-  centerNorthing = y * ySeg
-
-  #print 'C', centerEasting, centerNorthing, zoneNum, latiBand  ## Echo print
-
-  #eastingClock, northingClock = getBoundFromCenterHexagon(xSeg, ySeg, centerEasting, centerNorthing)
-  centerLati, centerLongi = utm.to_latlon(centerEasting, centerNorthing, zoneNum, latiBand)
-  return x, y, centerLongi, centerLati
-
-def getGeoIDCenterBoundLLHexagon(binSizeMeter, zoneNum, latiBand, x, y):
-  eastingClock = [0,1,2,3,4,5]
-  northingClock = [0,1,2,3,4,5]
-  llBound = [0,1,2,3,4,5,6,7,8,9,10,11]
-  xSeg = binSizeMeter / 4.0
-  ySeg = binSizeMeter / 2.0 * math.sin(math.pi / 3.0)
-  easting = x * 3.0 * xSeg - xSeg
-  northing = y * ySeg
-  centerLati, centerLongi = utm.to_latlon(easting, northing, zoneNum, latiBand)
-  eastingClock, northingClock = getBoundFromCenterHexagon(xSeg, ySeg, easting, northing)
-  numValInBound, llBound = getLLBoundFromUTMBound2(6, eastingClock, northingClock, zoneNum, latiBand)
-  return numValInBound, llBound, centerLongi, centerLati 
-
-##-------------------- GeoID -----
-def assembleGeoID(binType, binSizeMeter, zoneNum, latiBand, x, y):
-  sReserved = '0000000000'
-  sBinSize = '%04d' % (binSizeMeter)
-  sZoneNum = '%02d' % (zoneNum)
-  sX = '%011d' % (x)
-  sY = '%011d' % (y)
-  geoID = sReserved + str(binType) + sBinSize + sZoneNum + latiBand + sX + sY  ## 10, 1, 4, 2, 1, 11, 11 = 40
-  return geoID
-
-def disassembleGeoID(geoID):
-  binType = int(geoID[10:11])
-  binSizeMeter = int(geoID[11:15])
-  zoneNum = int(geoID[15:17])
-  latiBand = geoID[17:18]
-  latiBand = latiBand.upper()
-  x = int(geoID[18:29])
-  y = int(geoID[29:40])
-  return zoneNum, latiBand, x, y, binType, binSizeMeter
-
-##-------------------- Export functions -----
-def getGeoIDFromUTM(easting, northing, binSizeMeter, binType, zoneNum, latiBand):
-  centerLongi = 0.0
-  centerLati = 0.0
-  x = 0
-  y = 0
-  if (binType == 0):  ## Square
-    x, y, centerLongi, centerLati = getGeoIDXYCenterSquare(easting, northing, binSizeMeter, zoneNum, latiBand)
-  elif (binType == 1):  ## Hexagon
-    x, y, centerLongi, centerLati = getGeoIDXYCenterHexagon(easting, northing, binSizeMeter, zoneNum, latiBand)
-    if (x == 0):  ## Jan. 19, 2017; Need to get GeoID from previous zone to make sure GeoID used to check same bin
-      eastingMove = easting - binSizeMeter / 2.0
-      latMove, lonMov = utm.to_latlon(eastingMove, northing, zoneNum, latiBand)  ## Move LL
-      eastingUse, northingUse, zoneNum, latiBand = utm.from_latlon(latMove, lonMov)  ## Compute moved UTM
-      x, y, centerLongi, centerLati = getGeoIDXYCenterHexagon(eastingUse, northingUse, binSizeMeter, zoneNum, latiBand)
-  geoID = assembleGeoID(binType, binSizeMeter, zoneNum, latiBand, x, y)
-  #print "getGeoIDFromUTM()", easting, northing, geoID, binType, binSizeMeter, ';' , x, y, centerLongi, centerLati  ## Echo print
-  return geoID, centerLongi, centerLati
-
-def getGeoIDFromLL(longi, lati, binSizeMeter, binType, zoneNumIn = -1):
-  retVal = 0  ## Init.
-  geoID = ""
-  centerLongi = 0.0
-  centerLati = 0.0
-  zoneNum = 0
-  ## Check input parameters
-  if ((longi < -180.0) or (longi > 180.0)):
-    retVal |= 1
-  if ((lati < -80.0) or (lati > 84.0)):
-    retVal |= 2
-  if ((binSizeMeter < 1) or (binSizeMeter > 9999)):
-    retVal |= 4
-  if ((binType != 0) and (binType != 1)):
-    retVal |= 8
-  if (retVal != 0):
-    retVal *= -1
-  else:
-    zoneNumUse = zoneNumIn
-    if ((zoneNumUse <= 0) or (zoneNumUse > 60)):  ## Invalide zoneNum
-      #if (zoneNumUse == -1):
-      #  zoneNumUse = 10  ## US west boundary; Use this way to make plotting binning region smooth; causing to_latlon issue out of range in easting
-      #  easting, northing, zoneNum, latiBand = utm.from_latlon(lati, longi, zoneNumUse)  ## LL -> UTM
-      #else:
-        easting, northing, zoneNum, latiBand = utm.from_latlon(lati, longi)  ## LL -> UTM
-    else:
-      easting, northing, zoneNum, latiBand = utm.from_latlon(lati, longi, zoneNumUse)  ## LL -> UTM; Force zone
-    #print easting, northing, zoneNum, latiBand  ## Echo print
-    geoID, centerLongi, centerLati = getGeoIDFromUTM(easting, northing, binSizeMeter, binType, zoneNum, latiBand)
-  return retVal, geoID, centerLongi, centerLati, zoneNum
-
-def getLLFromGeoID(geoID):
-  retVal = 0  ## Init.
-  numValInBound = 0
-  llBound = [0,1,2,3,4,5,6,7,8,9,10,11]
-  centerLongi = 0.0
-  centerLati = 0.0
-  binSizeMeter = 0
-  binType = 0
-  zoneNum = 0
-  latiBand = ''
-  x = 0.0
-  y = 0.0
-
-  ## Check input parameters
-  if ((len(geoID) > 40) or (len(geoID) <= minLenGeoID)):
-    retVal |= 1
-  if (retVal != 0):
-    retVal *= -1
-  else:
-    zoneNum, latiBand, x, y, binType, binSizeMeter = disassembleGeoID(geoID)
-    #print geoID, ':', binType, binSizeMeter, zoneNum, latiBand, x, y         ## Echo print
-
-    ## Check input parameters
-    if ((binType != 0) and (binType != 1)):
-      retVal |= 2
-    if ((binSizeMeter <= 0) or (binSizeMeter > 9999)):
-      retVal |= 4
-    if ((zoneNum <= 0) or (zoneNum > 60)):
-      retVal |= 8
-    latiBandValid = 0
-    sLatiBandValid = 'CDEFGHJKLMNPQRSTUVWX'
-    if (sLatiBandValid.find(latiBand)!=-1):  ## Found
-      latiBandValid = 1
-    if (latiBandValid == 0):
-      retVal |= 16
-    if (retVal != 0):
-      retVal *= -1
-
-    if (retVal == 0):
-      if (binType == 0):
-        numValInBound, llBound, centerLongi, centerLati = getGeoIDCenterBoundLLSquare(binSizeMeter, x, y)
-      elif (binType == 1):
-        numValInBound, llBound, centerLongi, centerLati = getGeoIDCenterBoundLLHexagon(binSizeMeter, zoneNum, latiBand, x, y)
-  return retVal, numValInBound, llBound, centerLongi, centerLati, binSizeMeter, binType
-
-##-------------------- Test -----
-## Function test
-retVal = 0
-centerLongi = 0.0
-centerLati = 0.0
-zoneNum = 0
-numValInBound = 0
-llBound = [0,1,2,3,4,5,6,7,8,9,10,11]
-
-## Setup arguments
-## (longi, lati) = (51.2, 7.5) -> (easting, northing) = (395201.310381, 5673135.24118); 32U
-#longi = 51.2
-#lati = 7.5
-longi = -122.51593
-lati = 37.752214
-binSizeMeter = 100
-binType = 1
-geoID = '00000000001010032U0000000526900000131015'
-
-## Calling function
-retVal, geoID, centerLongi, centerLati, zoneNum = getGeoIDFromLL(longi, lati, binSizeMeter, binType)
-#print 'getGeoIDFromLL():', longi, lati, binSizeMeter, binType, ':', retVal, geoID, centerLongi, centerLati, zoneNum  ## Echo print
-
-retVal, numValInBound, llBound, centerLongi, centerLati, binSizeMeter, binType = getLLFromGeoID(geoID)
-#print 'getLLFromGeoID():', geoID, ':', retVal, numValInBound, llBound, centerLongi, centerLati, binSizeMeter, binType  ## Echo print
+## geoidutm.py
+##
+## Need to install numpy: pip install numpy
+##
+## Input argument: None
+## Test run: python geoidutm.py
+##
+## Fuctions:
+## getGeoIDFromLL(longi, lati, binSizeMeter, binType, zoneNumIn = -1)
+##   Input: Longitude, Latitude, Bin size in meters, binType
+##     Note: Bin size should be positive integer in meters (1 ~ 9999).
+##     Note: binType 0: square (center location as geoID),
+##                   1: Hexagon (center location as geoID)
+##   Output: GeoID[40], centerLongi, centerLati, zoneNum
+##     Note: GeoID: [Reserved][BinType][BinSize][ZoneNum][LatitudeBand]
+##       [Easting][Northing]
+##           #Bytes: 10,1,4,3,11,11 = 40 characters
+##   Return: negative bit 0: invalid longitude
+##           negative bit 1: invalid latitude
+##           negative bit 2: invalid bin size
+##           negative bit 3: invalid bin type
+##           0 (successful)
+## getLLFromGeoID(geoID)
+##   Input: geoID (string or packed integer)
+##   Output: numValInBound, llBound, centerLongitude, centerLatitude,
+##     binSizeMeter, binType
+##   Return: negative bit 0: invalid geoID length
+##           negative bit 1: invalid geoID binType
+##           negative bit 2: invalid geoID binSize
+##           negative bit 3: invalid geoID zoneNum
+##           negative bit 4: invalid geoID latitudeBand
+##           0 (successful)
+## getCenterLLFromGeoID(geoID)
+##   Input: geoID (string or packed integer)
+##   Output: centerLongitude, centerLatitude, binSizeMeter, binType
+##     Note: Same center as getLLFromGeoID() without the bin boundary.
+##   Return: same bits as getLLFromGeoID()
+## getGeoIDsFromLLs(longis, latis, binSizeMeter, binType, zoneNumIn = -1)
+##   Input: Longitude array, Latitude array, Bin size in meters, binType
+##   Output: retVal array, GeoID array, centerLongi array, centerLati array,
+##     zoneNum array
+##     Note: Batch version of getGeoIDFromLL(); element i has the same
+##           result as getGeoIDFromLL(longis[i], latis[i], ...).
+##     Note: Invalid elements have GeoID '' and center 0.0, zoneNum 0.
+##   Return: same bits as getGeoIDFromLL() per element, plus
+##           negative bit 4: bin center out of UTM range, or longitude
+##             180.0 without zoneNumIn (getGeoIDFromLL() raises
+##             utmproj.OutOfRangeError for it)
+## getLLsFromGeoIDs(geoIDs)
+##   Input: GeoID sequence or array
+##   Output: retVal array, numValInBound array, llBound array (N, 6, 2) or
+##     (N, 4, 2) if all squares, centerLongi array, centerLati array,
+##     binSizeMeter array, binType array, zoneNum array, latitudeBand array,
+##     x array, y array
+##     Note: Batch version of getLLFromGeoID(); llBound[i, k] is
+##           [longitude, latitude] of vertex k; unused vertices are NaN.
+##     Note: Each unique lattice vertex is projected once per call.
+##   Return: same bits as getLLFromGeoID() per element, plus
+##           negative bit 5: bin out of UTM range (getLLFromGeoID() raises
+##             utmproj.OutOfRangeError for it)
+## getCenterLLsFromGeoIDs(geoIDs)
+##   Input: GeoID sequence or array
+##   Output: retVal array, centerLongi array, centerLati array,
+##     binSizeMeter array, binType array, zoneNum array, latitudeBand array,
+##     x array, y array
+##     Note: Batch version of getCenterLLFromGeoID(); only bin centers are
+##           projected.
+##   Return: same bits as getLLsFromGeoIDs() per element
+## geoIDToInt(geoID)
+##   Input: geoID
+##   Output: geoInt (packed 64-bit integer GeoID; -1 if invalid)
+##     Note: geoInt keeps binType, binSize, zoneNum, latitudeBand, x and y
+##           of disassembleGeoID(); intToGeoID() gives the GeoID back.
+##     Note: Sorting geoInts gives the same order as sorting GeoIDs.
+##   Return: same bits as getLLFromGeoID(), plus
+##           negative bit 5: reserved not 0 or x, y out of packing range
+## getGeoIntsFromLLs(longis, latis, binSizeMeter, binType, zoneNumIn = -1)
+##   Input: same as getGeoIDsFromLLs()
+##   Output: retVal array, geoInt array (int64; -1 if invalid)
+##     Note: geoIDsToInts() of getGeoIDsFromLLs() GeoIDs without projecting
+##           bin centers or building GeoID strings.
+##   Return: same bits as getGeoIDsFromLLs() per element, plus
+##           negative bit 5: out of packing range
+## intToGeoID(geoInt)
+##   Input: geoInt
+##   Output: geoID ('' if invalid)
+##   Return: negative bit 0: invalid geoInt
+##           0 (successful)
+## geoIDsToInts(geoIDs), intsToGeoIDs(geoInts)
+##   Batch versions of geoIDToInt() and intToGeoID(); return retVal array
+##   and geoInt (int64) / GeoID array.
+##   Note: getLLFromGeoID(), getLLsFromGeoIDs() and other functions taking
+##         a GeoID also take geoInt.
+## getNeighborGeoIDs(geoID, k = 1)
+##   Input: geoID (string or packed integer), number of rings
+##   Output: neighbor GeoIDs (same kind as geoID), ring number of each
+##     Note: Bins of rings 1 ~ k around the bin (bin excluded), ring by ring,
+##           from the lattice indices (x, y) without projection.
+##           Square: ring = max(|dx|, |dy|) (8 bins in ring 1).
+##           Hexagon: centers (x, y) have odd x + y as in
+##           getGeoIDXYCenterHexagon(); ring 1 is (0, +-2), (+-1, +-1).
+##     Note: If a ring may leave the zone or latitude band of the bin (ring
+##           rectangle checked at its corners and central meridian), each
+##           neighbor is the GeoID of getGeoIDFromLL() at its center instead
+##           (2 projections per neighbor); duplicates are removed.
+##   Return: same bits as getLLFromGeoID(), plus
+##           negative bit 5: invalid k
+## getNeighborGeoIDsFromGeoIDs(geoIDs, k = 1)
+##   Input: GeoID sequence or array, number of rings
+##   Output: retVal array, neighbor array (N, M) (geoInt, -1 if none, for
+##     packed input; GeoID, '' if none, otherwise), ring array (N, M)
+##     (-1 if none)
+##     Note: Batch version of getNeighborGeoIDs(); row i has the bins of
+##           getNeighborGeoIDs(geoIDs[i], k).
+##   Return: same bits as getNeighborGeoIDs() per element
+## getParentGeoID(geoID, parentBinSize, parentBinType = -1)
+##   Input: geoID (string or packed integer), parent bin size, optional
+##          parent bin type (-1: same as geoID)
+##   Output: parent GeoID (same kind as geoID) in the zone and latitude band
+##           of geoID
+##     Note: Parent is the bin holding the bin center, from lattice indices
+##           (x, y) without projection. Exact containment for squares whose
+##           parent size is a multiple of the size (x * size // parentSize);
+##           approximate (by center) for hexagons and other sizes.
+##   Return: same bits as getLLFromGeoID(), plus
+##           negative bit 5: invalid parent bin size or type
+##           negative bit 6: parent out of packing range (packed geoID)
+## getParentGeoIDsFromGeoIDs(geoIDs, parentBinSize, parentBinType = -1)
+##   Batch version of getParentGeoID(); return retVal array and parent array
+##   (geoInt, -1 if invalid, for packed input; GeoID, '' if invalid,
+##   otherwise).
+## getChildGeoIDs(geoID, childBinSize, childBinType = -1)
+##   Input: geoID (string or packed integer), child bin size, optional child
+##          bin type (-1: same as geoID)
+##   Output: child GeoIDs (same kind as geoID); bins whose parent of
+##           getParentGeoID() is geoID, in GeoID order
+##   Return: same bits as getParentGeoID()
+## getBinsWithinRadius(longi, lati, radiusMeters, binSizeMeter, binType, zoneNumIn = -1)
+##   Input: Longitude, Latitude, radius in meters, Bin size in meters,
+##          binType, optional forced zoneNum (same as getGeoIDFromLL())
+##   Output: GeoID array (in GeoID order), distance array (meters; UTM
+##           distance between the point and the bin center)
+##     Note: Bins whose centers are within radiusMeters of the point. Lattice
+##           index ranges are computed row by row around the point easting
+##           and northing, so time is proportional to the number of bins.
+##     Note: If the disk crosses zones or latitude bands (disk boundary
+##           checked at 360 points), each touched zone is covered and every
+##           bin keeps the zone and band of its center (one projection per
+##           bin); otherwise no projection per bin.
+##   Return: same bits as getGeoIDFromLL(), plus
+##           negative bit 4: invalid radius
+##
+
+import math, sys
+import numpy as np
+import utmproj
+
+minLenGeoID = 25
+
+## Function
+##-------------------- For bin in in general -----
+def getLLBoundFromUTMBound(numVal, eastingClock, northingClock, zoneNum, latiBand):
+  lonClock = [0] * numVal
+  latClock = [0] * numVal
+  for p in xrange(0, numVal):
+    latClock[p], lonClock[p] = utmproj.to_latlon(eastingClock[p], northingClock[p], zoneNum, latiBand)
+  return lonClock, latClock
+
+def getLLBoundFromUTMBound2(numVal, eastingClock, northingClock, zoneNum, latiBand):
+  inxBound = 0
+  numValInBound = numVal * 2
+  llBound = [0] * numValInBound
+  for i in xrange(0, numVal):
+    llBound[inxBound+1], llBound[inxBound] = utmproj.to_latlon(eastingClock[i], northingClock[i], zoneNum, latiBand)
+    inxBound += 2
+  return numValInBound, llBound
+
+##-------------------- Square bin -----
+def getBoundFromCenterSquare(xOffset, yOffset, easting, northing):
+  eastingClock = [0] * 4
+  northingClock = [0] * 4
+  eastingClock[0] = easting - xOffset
+  eastingClock[1] = easting - xOffset
+  eastingClock[2] = easting + xOffset
+  eastingClock[3] = easting + xOffset
+  northingClock[0] = northing - yOffset
+  northingClock[1] = northing + yOffset
+  northingClock[2] = northing + yOffset
+  northingClock[3] = northing - yOffset
+  return eastingClock, northingClock
+
+def getGeoIDXYCenterSquare(easting, northing, binSizeMeter, zoneNum, latiBand):
+  halfBinSize = binSizeMeter / 2.0
+  xSeg = binSizeMeter
+  xOffset = halfBinSize
+  ySeg = binSizeMeter
+  yOffset = halfBinSize
+  x = int(easting / xSeg)
+  y = int(northing / ySeg)
+  centerEasting = x * xSeg + xOffset
+  centerNorthing = y * ySeg + yOffset
+  centerLati, centerLongi = utmproj.to_latlon(centerEasting, centerNorthing, zoneNum, latiBand)
+  return x, y, centerLongi, centerLati
+
+def getGeoIDCenterBoundLLSquare(binSizeMeter, zoneNum, latiBand, x, y):
+  eastingClock = [0,1,2,3]
+  northingClock = [0,1,2,3]
+  halfBinSize = binSizeMeter / 2.0
+  xSeg = binSizeMeter
+  xOffset = halfBinSize
+  ySeg = binSizeMeter
+  yOffset = halfBinSize
+  easting = x * xSeg + xOffset
+  northing = y * ySeg + yOffset
+  centerLati, centerLongi = utmproj.to_latlon(easting, northing, zoneNum, latiBand)
+  eastingClock, northingClock = getBoundFromCenterSquare(xOffset, yOffset, easting, northing)
+  numValInBound, llBound = getLLBoundFromUTMBound2(4, eastingClock, northingClock, zoneNum, latiBand)
+  return numValInBound, llBound, centerLongi, centerLati
+
+def getGeoIDCenterLLSquare(binSizeMeter, zoneNum, latiBand, x, y):
+  ## Center only; same as getGeoIDCenterBoundLLSquare()
+  easting = x * binSizeMeter + binSizeMeter / 2.0
+  northing = y * binSizeMeter + binSizeMeter / 2.0
+  centerLati, centerLongi = utmproj.to_latlon(easting, northing, zoneNum, latiBand)
+  return centerLongi, centerLati
+
+##-------------------- Hexagon bin -----
+def isLeft(x, y, aX, aY, bX, bY):
+  ## http://stackoverflow.com/questions/1560492/
+  ##   how-to-tell-whether-a-point-is-to-the-right-or-left-side-of-a-line
+  ## (x, y): poiny to check; (aX, aY): line point 1; (bX, bY): line point 2
+  ## val: 0: colinear; > 0: left; < 0: right
+  ##   line horizontal -> > 0: above the line
+  leftFlag = 0
+  val = (bX - aX) * (y - aY) - (bY - aY) * (x - aX)
+  if (val > 0):
+    leftFlag = 1
+  elif (val < 0):
+    leftFlag = 0
+  return leftFlag
+
+def getBoundFromCenterHexagon(xSeg, ySeg, centerEasting, centerNorthing):
+  eastingClock = [0,1,2,3,4,5]
+  northingClock = [0,1,2,3,4,5]
+  eastingClock[0] = centerEasting - 2.0 * xSeg
+  eastingClock[1] = centerEasting - xSeg
+  eastingClock[2] = centerEasting + xSeg
+  eastingClock[3] = centerEasting + 2.0 * xSeg
+  eastingClock[4] = centerEasting + xSeg
+  eastingClock[5] = centerEasting - xSeg
+  northingClock[0] = centerNorthing
+  northingClock[1] = centerNorthing + ySeg
+  northingClock[2] = centerNorthing + ySeg
+  northingClock[3] = centerNorthing
+  northingClock[4] = centerNorthing - ySeg
+  northingClock[5] = centerNorthing - ySeg
+  return eastingClock, northingClock
+
+def getGeoIDXYCenterHexagon(easting, northing, binSizeMeter, zoneNum, latiBand):
+  eastingClock = [0,1,2,3,4,5]
+  northingClock = [0,1,2,3,4,5]
+  xSeg = binSizeMeter / 4.0
+  xSegNum = math.floor(easting / xSeg)
+  xRegionNum = math.floor(xSegNum / 6)
+  xRegionRem = xSegNum % 6               ## 0 ~ 5
+
+  ySeg = binSizeMeter / 2.0 * math.sin(math.pi / 3.0)
+  ySegNum = math.floor(northing / ySeg)
+  yRegionRem = ySegNum % 2
+
+  x = math.floor(xSegNum/3)
+  y = ySegNum
+
+  ## Init. center and hexagon bound
+  if ((xRegionRem >= 0) and (xRegionRem < 3)):
+    centerEasting = xRegionNum * 1.5 * binSizeMeter + 0.5 * binSizeMeter
+  else:
+    centerEasting = xRegionNum * 1.5 * binSizeMeter + binSizeMeter + xSeg
+  centerNorthing = ySegNum * ySeg
+  eastingClock, northingClock = getBoundFromCenterHexagon(xSeg, ySeg, centerEasting, centerNorthing)
+
+  #print 'A', xSeg, xSegNum, xRegionNum, xRegionRem, ySeg, ySegNum, yRegionRem, x, y, centerEasting, centerNorthing  ## Echo print
+
+  ## Revise x, y
+  if ((xRegionRem == 0) and (yRegionRem == 0)):
+    leftFlag = isLeft(easting, northing, eastingClock[0], northingClock[0], eastingClock[1], northingClock[1])
+    if (leftFlag != 1):
+      x += 1  ## (x, y) = (odd, even)
+    else:
+      y += 1  ## (even, odd)
+  elif (((xRegionRem == 1) or (xRegionRem == 2)) and (yRegionRem == 0)):
+    x += 1  ## (odd, even)
+  elif ((xRegionRem == 3) and (yRegionRem == 0)):
+    leftFlag = isLeft(easting, northing, eastingClock[5], northingClock[5], eastingClock[0], northingClock[0])
+    if (leftFlag == 0):
+      x += 1  ## (even, odd)
+      y += 1
+  elif (((xRegionRem == 4) or (xRegionRem == 5)) and (yRegionRem == 0)):
+    x += 1  ## (even, odd)
+    y += 1
+  elif ((xRegionRem == 0) and (yRegionRem == 1)):
+    leftFlag = isLeft(easting, northing, eastingClock[5], northingClock[5], eastingClock[0], northingClock[0])
+    if (leftFlag != 1):
+      x += 1  ## (odd, even)
+      y += 1
+  elif (((xRegionRem == 1) or (xRegionRem == 2)) and (yRegionRem == 1)):
+    x += 1  ## (odd, even)
+    y += 1
+  elif ((xRegionRem == 3) and (yRegionRem == 1)):
+    leftFlag = isLeft(easting, northing, eastingClock[0], northingClock[0], eastingClock[1], northingClock[1])
+    if (leftFlag == 0):
+      x += 1  ## (even, odd)
+    else:
+      y += 1  ## (odd, even)
+  elif (((xRegionRem == 4) or (xRegionRem == 5)) and (yRegionRem == 1)):
+    x += 1  ## (even, odd)
+
+  #print 'B', xSeg, xSegNum, xRegionNum, xRegionRem, ySeg, ySegNum, yRegionRem, x, y, centerEasting, centerNorthing  ## Echo print
+
+  ## Update center and Hexagon bound
+  centerEasting = x * 3.0 * xSeg - xSeg 
+  centerNorthing = y * ySeg
+
+  #print 'C', centerEasting, centerNorthing, zoneNum, latiBand  ## Echo print
+
+  #eastingClock, northingClock = getBoundFromCenterHexagon(xSeg, ySeg, centerEasting, centerNorthing)
+  centerLati, centerLongi = utmproj.to_latlon(centerEasting, centerNorthing, zoneNum, latiBand)
+  return x, y, centerLongi, centerLati
+
+def getGeoIDCenterBoundLLHexagon(binSizeMeter, zoneNum, latiBand, x, y):
+  eastingClock = [0,1,2,3,4,5]
+  northingClock = [0,1,2,3,4,5]
+  llBound = [0,1,2,3,4,5,6,7,8,9,10,11]
+  xSeg = binSizeMeter / 4.0
+  ySeg = binSizeMeter / 2.0 * math.sin(math.pi / 3.0)
+  easting = x * 3.0 * xSeg - xSeg
+  northing = y * ySeg
+  centerLati, centerLongi = utmproj.to_latlon(easting, northing, zoneNum, latiBand)
+  eastingClock, northingClock = getBoundFromCenterHexagon(xSeg, ySeg, easting, northing)
+  numValInBound, llBound = getLLBoundFromUTMBound2(6, eastingClock, northingClock, zoneNum, latiBand)
+  return numValInBound, llBound, centerLongi, centerLati 
+
+def getGeoIDCenterLLHexagon(binSizeMeter, zoneNum, latiBand, x, y):
+  ## Center only; same as getGeoIDCenterBoundLLHexagon()
+  xSeg = binSizeMeter / 4.0
+  ySeg = binSizeMeter / 2.0 * math.sin(math.pi / 3.0)
+  easting = x * 3.0 * xSeg - xSeg
+  northing = y * ySeg
+  centerLati, centerLongi = utmproj.to_latlon(easting, northing, zoneNum, latiBand)
+  return centerLongi, centerLati
+
+##-------------------- GeoID -----
+def assembleGeoID(binType, binSizeMeter, zoneNum, latiBand, x, y):
+  sReserved = '0000000000'
+  sBinSize = '%04d' % (binSizeMeter)
+  sZoneNum = '%02d' % (zoneNum)
+  sX = '%011d' % (x)
+  sY = '%011d' % (y)
+  geoID = sReserved + str(binType) + sBinSize + sZoneNum + latiBand + sX + sY  ## 10, 1, 4, 2, 1, 11, 11 = 40
+  return geoID
+
+def disassembleGeoID(geoID):
+  binType = int(geoID[10:11])
+  binSizeMeter = int(geoID[11:15])
+  zoneNum = int(geoID[15:17])
+  latiBand = geoID[17:18]
+  latiBand = latiBand.upper()
+  x = int(geoID[18:29])
+  y = int(geoID[29:40])
+  return zoneNum, latiBand, x, y, binType, binSizeMeter
+
+##-------------------- Export functions -----
+def getGeoIDFromUTM(easting, northing, binSizeMeter, binType, zoneNum, latiBand):
+  centerLongi = 0.0
+  centerLati = 0.0
+  x = 0
+  y = 0
+  if (binType == 0):  ## Square
+    x, y, centerLongi, centerLati = getGeoIDXYCenterSquare(easting, northing, binSizeMeter, zoneNum, latiBand)
+  elif (binType == 1):  ## Hexagon
+    x, y, centerLongi, centerLati = getGeoIDXYCenterHexagon(easting, northing, binSizeMeter, zoneNum, latiBand)
+    if (x == 0):  ## Jan. 19, 2017; Need to get GeoID from previous zone to make sure GeoID used to check same bin
+      eastingMove = easting - binSizeMeter / 2.0
+      latMove, lonMov = utmproj.to_latlon(eastingMove, northing, zoneNum, latiBand)  ## Move LL
+      eastingUse, northingUse, zoneNum, latiBand = utmproj.from_latlon(latMove, lonMov)  ## Compute moved UTM
+      x, y, centerLongi, centerLati = getGeoIDXYCenterHexagon(eastingUse, northingUse, binSizeMeter, zoneNum, latiBand)
+  geoID = assembleGeoID(binType, binSizeMeter, zoneNum, latiBand, x, y)
+  #print "getGeoIDFromUTM()", easting, northing, geoID, binType, binSizeMeter, ';' , x, y, centerLongi, centerLati  ## Echo print
+  return geoID, centerLongi, centerLati
+
+def getGeoIDFromLL(longi, lati, binSizeMeter, binType, zoneNumIn = -1):
+  retVal = 0  ## Init.
+  geoID = ""
+  centerLongi = 0.0
+  centerLati = 0.0
+  zoneNum = 0
+  ## Check input parameters
+  if ((longi < -180.0) or (longi > 180.0)):
+    retVal |= 1
+  if ((lati < -80.0) or (lati > 84.0)):
+    retVal |= 2
+  if ((binSizeMeter < 1) or (binSizeMeter > 9999)):
+    retVal |= 4
+  if ((binType != 0) and (binType != 1)):
+    retVal |= 8
+  if (retVal != 0):
+    retVal *= -1
+  else:
+    zoneNumUse = zoneNumIn
+    if ((zoneNumUse <= 0) or (zoneNumUse > 60)):  ## Invalide zoneNum
+      #if (zoneNumUse == -1):
+      #  zoneNumUse = 10  ## US west boundary; Use this way to make plotting binning region smooth; causing to_latlon issue out of range in easting
+      #  easting, northing, zoneNum, latiBand = utmproj.from_latlon(lati, longi, zoneNumUse)  ## LL -> UTM
+      #else:
+        easting, northing, zoneNum, latiBand = utmproj.from_latlon(lati, longi)  ## LL -> UTM
+    else:
+      easting, northing, zoneNum, latiBand = utmproj.from_latlon(lati, longi, zoneNumUse)  ## LL -> UTM; Force zone
+    #print easting, northing, zoneNum, latiBand  ## Echo print
+    geoID, centerLongi, centerLati = getGeoIDFromUTM(easting, northing, binSizeMeter, binType, zoneNum, latiBand)
+  return retVal, geoID, centerLongi, centerLati, zoneNum
+
+def getGeoIDFields(geoID):
+  ## disassembleGeoID() / disassembleGeoInt() with the checks of getLLFromGeoID()
+  retVal = 0  ## Init.
+  binSizeMeter = 0
+  binType = 0
+  zoneNum = 0
+  latiBand = ''
+  x = 0.0
+  y = 0.0
+
+  ## Check input parameters
+  if (isGeoInt(geoID)):  ## Packed GeoID
+    retVal, zoneNum, latiBand, x, y, binType, binSizeMeter = disassembleGeoInt(geoID)
+  elif ((len(geoID) > 40) or (len(geoID) <= minLenGeoID)):
+    retVal |= 1
+  if (retVal != 0):
+    retVal = -abs(retVal)
+  else:
+    if (not isGeoInt(geoID)):
+      zoneNum, latiBand, x, y, binType, binSizeMeter = disassembleGeoID(geoID)
+    #print geoID, ':', binType, binSizeMeter, zoneNum, latiBand, x, y         ## Echo print
+
+    ## Check input parameters
+    if ((binType != 0) and (binType != 1)):
+      retVal |= 2
+    if ((binSizeMeter <= 0) or (binSizeMeter > 9999)):
+      retVal |= 4
+    if ((zoneNum <= 0) or (zoneNum > 60)):
+      retVal |= 8
+    latiBandValid = 0
+    sLatiBandValid = 'CDEFGHJKLMNPQRSTUVWX'
+    if (sLatiBandValid.find(latiBand)!=-1):  ## Found
+      latiBandValid = 1
+    if (latiBandValid == 0):
+      retVal |= 16
+    if (retVal != 0):
+      retVal *= -1
+  return retVal, zoneNum, latiBand, x, y, binType, binSizeMeter
+
+def getLLFromGeoID(geoID):
+  numValInBound = 0
+  llBound = [0,1,2,3,4,5,6,7,8,9,10,11]
+  centerLongi = 0.0
+  centerLati = 0.0
+
+  retVal, zoneNum, latiBand, x, y, binType, binSizeMeter = getGeoIDFields(geoID)
+  if (retVal == 0):
+    if (binType == 0):
+      numValInBound, llBound, centerLongi, centerLati = getGeoIDCenterBoundLLSquare(binSizeMeter, zoneNum, latiBand, x, y)
+    elif (binType == 1):
+      numValInBound, llBound, centerLongi, centerLati = getGeoIDCenterBoundLLHexagon(binSizeMeter, zoneNum, latiBand, x, y)
+  return retVal, numValInBound, llBound, centerLongi, centerLati, binSizeMeter, binType
+
+def getCenterLLFromGeoID(geoID):
+  ## Center only (one inverse projection instead of 5 or 7)
+  centerLongi = 0.0
+  centerLati = 0.0
+
+  retVal, zoneNum, latiBand, x, y, binType, binSizeMeter = getGeoIDFields(geoID)
+  if (retVal == 0):
+    if (binType == 0):
+      centerLongi, centerLati = getGeoIDCenterLLSquare(binSizeMeter, zoneNum, latiBand, x, y)
+    elif (binType == 1):
+      centerLongi, centerLati = getGeoIDCenterLLHexagon(binSizeMeter, zoneNum, latiBand, x, y)
+  return retVal, centerLongi, centerLati, binSizeMeter, binType
+
+##-------------------- Batch (NumPy arrays) -----
+def getGeoIDXYCenterSquares(eastings, northings, binSizeMeter):
+  ## Batch getGeoIDXYCenterSquare() without projection; returns x, y, center UTM
+  halfBinSize = binSizeMeter / 2.0
+  x = np.trunc(eastings / binSizeMeter).astype(np.int64)
+  y = np.trunc(northings / binSizeMeter).astype(np.int64)
+  centerEastings = x * binSizeMeter + halfBinSize
+  centerNorthings = y * binSizeMeter + halfBinSize
+  return x, y, centerEastings, centerNorthings
+
+def isLefts(x, y, aX, aY, bX, bY):
+  ## Batch isLeft(); True: left
+  return ((bX - aX) * (y - aY) - (bY - aY) * (x - aX)) > 0
+
+def getGeoIDXYCenterHexagons(eastings, northings, binSizeMeter):
+  ## Batch getGeoIDXYCenterHexagon() without projection; returns x, y, center UTM
+  xSeg = binSizeMeter / 4.0
+  xSegNum = np.floor(eastings / xSeg)
+  xRegionNum = np.floor(xSegNum / 6)
+  xRegionRem = xSegNum % 6               ## 0 ~ 5
+
+  ySeg = binSizeMeter / 2.0 * math.sin(math.pi / 3.0)
+  ySegNum = np.floor(northings / ySeg)
+  yRegionRem = ySegNum % 2
+
+  x = np.floor(xSegNum / 3).astype(np.int64)
+  y = ySegNum.astype(np.int64)
+
+  ## Init. center and hexagon bound (only vertex 0, 1, 5 are needed)
+  centerEastings = np.where(xRegionRem < 3, xRegionNum * 1.5 * binSizeMeter + 0.5 * binSizeMeter, xRegionNum * 1.5 * binSizeMeter + binSizeMeter + xSeg)
+  centerNorthings = ySegNum * ySeg
+  eastingClock0 = centerEastings - 2.0 * xSeg
+  eastingClock1 = centerEastings - xSeg
+  northingClock1 = centerNorthings + ySeg
+  northingClock5 = centerNorthings - ySeg
+  leftFlag01 = isLefts(eastings, northings, eastingClock0, centerNorthings, eastingClock1, northingClock1)
+  leftFlag50 = isLefts(eastings, northings, eastingClock1, northingClock5, eastingClock0, centerNorthings)
+
+  ## Revise x, y; same cases as getGeoIDXYCenterHexagon()
+  yEven = (yRegionRem == 0)
+  yOdd = (yRegionRem == 1)
+  rem0 = (xRegionRem == 0)
+  rem12 = (xRegionRem == 1) | (xRegionRem == 2)
+  rem3 = (xRegionRem == 3)
+  rem45 = (xRegionRem == 4) | (xRegionRem == 5)
+  xInc = ((rem0 & yEven & ~leftFlag01) | (rem12 & yEven) | (rem3 & yEven & ~leftFlag50) | (rem45 & yEven) |
+          (rem0 & yOdd & ~leftFlag50) | (rem12 & yOdd) | (rem3 & yOdd & ~leftFlag01) | (rem45 & yOdd))
+  yInc = ((rem0 & yEven & leftFlag01) | (rem3 & yEven & ~leftFlag50) | (rem45 & yEven) |
+          (rem0 & yOdd & ~leftFlag50) | (rem12 & yOdd) | (rem3 & yOdd & leftFlag01))
+  x += xInc
+  y += yInc
+
+  ## Update center
+  centerEastings = x * 3.0 * xSeg - xSeg
+  centerNorthings = y * ySeg
+  return x, y, centerEastings, centerNorthings
+
+def putGeoIDDigits(sBuf, inxStart, numDigit, vals):
+  ## Write zero padded decimal digits of vals into columns inxStart ~ inxStart + numDigit - 1
+  vals = np.array(vals, dtype=np.int64)
+  for k in xrange(numDigit - 1, -1, -1):
+    sBuf[:, inxStart + k] = 48 + vals % 10
+    vals //= 10
+  return
+
+def assembleGeoIDs(binType, binSizeMeter, zoneNums, latiBands, xs, ys):
+  ## Batch assembleGeoID(); binType and binSizeMeter can be scalars
+  numVal = len(xs)
+  binTypes = np.broadcast_to(binType, (numVal,))
+  binSizeMeters = np.broadcast_to(binSizeMeter, (numVal,))
+  latiBands = np.asarray(latiBands, dtype='S1')
+  sBuf = np.empty((numVal, 40), dtype=np.uint8)
+  sBuf[:, 0:10] = ord('0')  ## Reserved
+  putGeoIDDigits(sBuf, 10, 1, binTypes)
+  putGeoIDDigits(sBuf, 11, 4, binSizeMeters)
+  putGeoIDDigits(sBuf, 15, 2, zoneNums)
+  sBuf[:, 17] = latiBands.view(np.uint8)
+  putGeoIDDigits(sBuf, 18, 11, xs)
+  putGeoIDDigits(sBuf, 29, 11, ys)
+  geoIDs = sBuf.view('S40').reshape(numVal)
+  for i in np.flatnonzero((xs < 0) | (ys < 0)):  ## Sign needs '%011d'
+    geoIDs[i] = assembleGeoID(binTypes[i], binSizeMeters[i], zoneNums[i], latiBands[i], xs[i], ys[i])
+  return geoIDs
+
+def getGeoIDXYsFromLLs(longis, latis, binSizeMeter, binType, zoneNumIn = -1):
+  ## Checks and lattice part of getGeoIDsFromLLs(); no center projection
+  ## Return: retVals, validInx, eastings, northings, zoneNums, latiBands, x, y, centerEastings, centerNorthings (of validInx)
+  numVal = len(longis)
+  retVals = np.zeros(numVal, dtype=np.int32)  ## Init.
+
+  ## Check input parameters; NaN is invalid
+  with np.errstate(invalid='ignore'):
+    retVals[~((longis >= -180.0) & (longis <= 180.0))] |= 1
+    retVals[~((latis >= -80.0) & (latis <= 84.0))] |= 2
+  if ((binSizeMeter < 1) or (binSizeMeter > 9999)):
+    retVals |= 4
+  if ((binType != 0) and (binType != 1)):
+    retVals |= 8
+  validFlags = (retVals == 0)
+  if ((zoneNumIn <= 0) or (zoneNumIn > 60)):  ## Longitude 180.0 gives zone 61, which utm cannot convert back; out of UTM range
+    zone61Flags = validFlags & (longis == 180.0)
+    retVals[zone61Flags] = 16
+    validFlags &= ~zone61Flags
+  validInx = np.flatnonzero(validFlags)
+  retVals *= -1
+
+  eastings, northings, zoneNums, latiBands = utmproj.fromLatLons(latis[validInx], longis[validInx], zoneNumIn)  ## LL -> UTM
+  if (binType == 0):  ## Square
+    x, y, centerEastings, centerNorthings = getGeoIDXYCenterSquares(eastings, northings, binSizeMeter)
+  else:  ## Hexagon
+    x, y, centerEastings, centerNorthings = getGeoIDXYCenterHexagons(eastings, northings, binSizeMeter)
+  ## Center out of UTM range (e.g. far away from forced zone); utmproj.to_latlon() raises for it in getGeoIDFromLL()
+  outRangeFlags = ~((centerEastings >= 100000) & (centerEastings < 1000000) & (centerNorthings >= 0) & (centerNorthings <= 10000000))
+  retVals[validInx[outRangeFlags]] = -16
+  inRange = np.flatnonzero(~outRangeFlags)
+  return retVals, validInx[inRange], eastings[inRange], northings[inRange], zoneNums[inRange], latiBands[inRange], x[inRange], y[inRange], centerEastings[inRange], centerNorthings[inRange]
+
+def getGeoIDsFromLLs(longis, latis, binSizeMeter, binType, zoneNumIn = -1):
+  longis = np.asarray(longis, dtype=np.float64).ravel()
+  latis = np.asarray(latis, dtype=np.float64).ravel()
+  numVal = len(longis)
+  geoIDs = np.zeros(numVal, dtype='S40')
+  centerLongis = np.zeros(numVal)
+  centerLatis = np.zeros(numVal)
+  zoneNums = np.zeros(numVal, dtype=np.int64)
+
+  retVals, validInx, eastings, northings, zoneNumsUse, latiBands, x, y, centerEastings, centerNorthings = getGeoIDXYsFromLLs(longis, latis, binSizeMeter, binType, zoneNumIn)
+  if (len(validInx) > 0):
+    centerLatisUse, centerLongisUse = utmproj.toLatLons(centerEastings, centerNorthings, zoneNumsUse, latiBands)
+    geoIDsUse = assembleGeoIDs(binType, binSizeMeter, zoneNumsUse, latiBands, x, y)
+    if (binType == 1):  ## x == 0 needs GeoID from previous zone; same as getGeoIDFromUTM()
+      for i in np.flatnonzero(x == 0):
+        geoIDsUse[i], centerLongisUse[i], centerLatisUse[i] = getGeoIDFromUTM(eastings[i], northings[i], binSizeMeter, binType, int(zoneNumsUse[i]), latiBands[i])
+    geoIDs[validInx] = geoIDsUse
+    centerLongis[validInx] = centerLongisUse
+    centerLatis[validInx] = centerLatisUse
+    zoneNums[validInx] = zoneNumsUse
+  return retVals, geoIDs, centerLongis, centerLatis, zoneNums
+
+def getGeoIDDigits(sBuf, inxStart, numDigit):
+  ## Read decimal digits in columns inxStart ~ inxStart + numDigit - 1; also return non-digit flags
+  vals = np.zeros(len(sBuf), dtype=np.int64)
+  badFlags = np.zeros(len(sBuf), dtype=bool)
+  for k in xrange(0, numDigit):
+    digits = sBuf[:, inxStart + k].astype(np.int64) - 48
+    badFlags |= (digits < 0) | (digits > 9)
+    vals = vals * 10 + digits
+  return vals, badFlags
+
+def disassembleGeoIDs(geoIDs):
+  ## Batch disassembleGeoID(); retVals bit 0 (positive): invalid geoID length or unparsable field
+  sGeoIDs = np.asarray(geoIDs)
+  if (sGeoIDs.dtype.kind in 'iu'):  ## Packed GeoIDs
+    return disassembleGeoInts(sGeoIDs)
+  if (sGeoIDs.dtype.kind != 'S'):
+    sGeoIDs = sGeoIDs.astype('S')
+  sGeoIDs = sGeoIDs.ravel()
+  numVal = len(sGeoIDs)
+  retVals = np.zeros(numVal, dtype=np.int32)
+  lenGeoIDs = np.char.str_len(sGeoIDs)
+  if (sGeoIDs.dtype.itemsize < 40):
+    sGeoIDs = sGeoIDs.astype('S40')
+  sBuf = sGeoIDs.view(np.uint8).reshape(numVal, sGeoIDs.dtype.itemsize)
+
+  ## Fixed-width fields of 40-character GeoIDs in bulk
+  binTypes, badFlags = getGeoIDDigits(sBuf, 10, 1)
+  binSizeMeters, badT = getGeoIDDigits(sBuf, 11, 4)
+  badFlags |= badT
+  zoneNums, badT = getGeoIDDigits(sBuf, 15, 2)
+  badFlags |= badT
+  bandChars = sBuf[:, 17].copy()
+  bandChars[(bandChars >= 97) & (bandChars <= 122)] -= 32  ## Upper case
+  latiBands = bandChars.view('S1')
+  xs, badT = getGeoIDDigits(sBuf, 18, 11)
+  badFlags |= badT
+  ys, badT = getGeoIDDigits(sBuf, 29, 11)
+  badFlags |= badT
+
+  ## Check length; other lengths and non-digit fields (e.g. negative x, y) are parsed one by one
+  retVals[(lenGeoIDs > 40) | (lenGeoIDs <= minLenGeoID)] |= 1
+  for i in np.flatnonzero((retVals == 0) & ((lenGeoIDs != 40) | badFlags)):
+    try:
+      zoneNums[i], latiBands[i], xs[i], ys[i], binTypes[i], binSizeMeters[i] = disassembleGeoID(sGeoIDs[i][:lenGeoIDs[i]])
+    except ValueError:
+      retVals[i] |= 1
+  return retVals, zoneNums, latiBands, xs, ys, binTypes, binSizeMeters
+
+def chkGeoIDsFields(retVals, zoneNums, latiBands, binTypes, binSizeMeters):
+  ## Same checks as getLLFromGeoID(); bits (positive) added to retVals where bit 0 is not set
+  chkFlags = (retVals == 0)
+  retVals[chkFlags & (binTypes != 0) & (binTypes != 1)] |= 2
+  retVals[chkFlags & ((binSizeMeters <= 0) | (binSizeMeters > 9999))] |= 4
+  retVals[chkFlags & ((zoneNums <= 0) | (zoneNums > 60))] |= 8
+  bandValidFlags = np.in1d(latiBands, np.array(list('CDEFGHJKLMNPQRSTUVWX'), dtype='S1'))
+  retVals[chkFlags & ~bandValidFlags] |= 16
+  return retVals
+
+def getGeoIDLatticeLLs(ixs, iys, binTypes, binSizeMeters, zoneNums, latiBands):
+  ## Inverse projection of lattice points, once per unique point of each (binType, binSize, zone, band)
+  ##   Square: ix, iy in half bin size; Hexagon: ix in xSeg (binSize / 4), iy in ySeg
+  ## Return: longis, latis, outRangeFlags (UTM out of range; no projection)
+  numVal = len(ixs)
+  longis = np.zeros(numVal)
+  latis = np.zeros(numVal)
+  outRangeFlags = np.zeros(numVal, dtype=bool)
+  groupKeys = ((binTypes * 10000 + binSizeMeters) * 100 + zoneNums) * 256 + latiBands.view(np.uint8)
+  order = np.argsort(groupKeys, kind='mergesort')
+  groupKeysSorted = groupKeys[order]
+  for inx in np.split(order, np.flatnonzero(groupKeysSorted[1:] != groupKeysSorted[:-1]) + 1):
+    if (len(inx) == 0):
+      continue
+    i0 = inx[0]
+    binSizeMeter = int(binSizeMeters[i0])
+    if (binTypes[i0] == 0):
+      xSeg = ySeg = binSizeMeter / 2.0
+    else:
+      xSeg = binSizeMeter / 4.0
+      ySeg = binSizeMeter / 2.0 * math.sin(math.pi / 3.0)
+    eastings = ixs[inx] * xSeg
+    northings = iys[inx] * ySeg
+    outRangeFlags[inx] = ~((eastings >= 100000) & (eastings < 1000000) & (northings >= 0) & (northings <= 10000000))
+    inx = inx[~outRangeFlags[inx]]
+    if (len(inx) == 0):
+      continue
+    ptKeys, ptInv = np.unique((ixs[inx] << 32) + iys[inx], return_inverse=True)  ## ix, iy >= 0 and < 2^32 when in range
+    ptLatis, ptLongis = utmproj.to_latlon((ptKeys >> 32) * xSeg, (ptKeys & 0xFFFFFFFF) * ySeg, int(zoneNums[i0]), latiBands[i0])
+    longis[inx] = ptLongis[ptInv]
+    latis[inx] = ptLatis[ptInv]
+  return longis, latis, outRangeFlags
+
+def getLLsFromGeoIDs(geoIDs):
+  ## Return: retVals, numValInBounds, llBounds (N, numVertex, 2; [:, :, 0] longitude), centerLongis, centerLatis,
+  ##   binSizeMeters, binTypes, zoneNums, latiBands, xs, ys
+  retVals, zoneNums, latiBands, xs, ys, binTypes, binSizeMeters = disassembleGeoIDs(geoIDs)
+  retVals = chkGeoIDsFields(retVals, zoneNums, latiBands, binTypes, binSizeMeters)
+  numVal = len(retVals)
+  numValInBounds = np.zeros(numVal, dtype=np.int32)
+  centerLongis = np.zeros(numVal)
+  centerLatis = np.zeros(numVal)
+
+  ## Lattice points (center + vertices, clockwise from getBoundFromCenterSquare() / getBoundFromCenterHexagon())
+  validInx = np.flatnonzero(retVals == 0)
+  squareFlags = (binTypes[validInx] == 0)
+  numVertex = 4
+  if (not np.all(squareFlags)):
+    numVertex = 6
+  llBounds = np.empty((numVal, numVertex, 2))
+  llBounds.fill(np.nan)
+  ixs = np.empty((len(validInx), numVertex + 1), dtype=np.int64)
+  iys = np.empty((len(validInx), numVertex + 1), dtype=np.int64)
+  xsUse = xs[validInx, np.newaxis]
+  ysUse = ys[validInx, np.newaxis]
+  ixs[:] = np.where(squareFlags[:, np.newaxis], 2 * xsUse + 1, 3 * xsUse - 1)
+  iys[:] = np.where(squareFlags[:, np.newaxis], 2 * ysUse + 1, ysUse)
+  if (numVertex == 4):
+    ixs[:, 1:] += [-1, -1, 1, 1]
+    iys[:, 1:] += [-1, 1, 1, -1]
+  else:
+    ixs[:, 1:] += np.where(squareFlags[:, np.newaxis], [-1, -1, 1, 1, 0, 0], [-2, -1, 1, 2, 1, -1])
+    iys[:, 1:] += np.where(squareFlags[:, np.newaxis], [-1, 1, 1, -1, 0, 0], [0, 1, 1, 0, -1, -1])
+  numPt = numVertex + 1
+  longis, latis, outRangeFlags = getGeoIDLatticeLLs(ixs.ravel(), iys.ravel(), np.repeat(binTypes[validInx], numPt), np.repeat(binSizeMeters[validInx], numPt), np.repeat(zoneNums[validInx], numPt), np.repeat(latiBands[validInx], numPt))
+  longis = longis.reshape(-1, numPt)
+  latis = latis.reshape(-1, numPt)
+  numVertexUse = np.where(squareFlags, 4, 6)
+  outRangeFlags = np.any(outRangeFlags.reshape(-1, numPt) & (np.arange(numPt) <= numVertexUse[:, np.newaxis]), axis=1)
+  centerLongis[validInx] = longis[:, 0]
+  centerLatis[validInx] = latis[:, 0]
+  llBounds[validInx, :, 0] = longis[:, 1:]
+  llBounds[validInx, :, 1] = latis[:, 1:]
+  llBounds[validInx[squareFlags], 4:, :] = np.nan
+  numValInBounds[validInx] = numVertexUse * 2
+
+  ## Bin out of UTM range; utmproj.to_latlon() raises for it in getLLFromGeoID()
+  outInx = validInx[outRangeFlags]
+  retVals[outInx] |= 32
+  numValInBounds[outInx] = 0
+  centerLongis[outInx] = 0.0
+  centerLatis[outInx] = 0.0
+  llBounds[outInx] = np.nan
+  retVals *= -1
+  return retVals, numValInBounds, llBounds, centerLongis, centerLatis, binSizeMeters, binTypes, zoneNums, latiBands, xs, ys
+
+def getCenterLLsFromGeoIDs(geoIDs):
+  ## Center only; Return: retVals, centerLongis, centerLatis, binSizeMeters, binTypes, zoneNums, latiBands, xs, ys
+  retVals, zoneNums, latiBands, xs, ys, binTypes, binSizeMeters = disassembleGeoIDs(geoIDs)
+  retVals = chkGeoIDsFields(retVals, zoneNums, latiBands, binTypes, binSizeMeters)
+  centerLongis = np.zeros(len(retVals))
+  centerLatis = np.zeros(len(retVals))
+  validInx = np.flatnonzero(retVals == 0)
+  squareFlags = (binTypes[validInx] == 0)
+  ixs = np.where(squareFlags, 2 * xs[validInx] + 1, 3 * xs[validInx] - 1)
+  iys = np.where(squareFlags, 2 * ys[validInx] + 1, ys[validInx])
+  longis, latis, outRangeFlags = getGeoIDLatticeLLs(ixs, iys, binTypes[validInx], binSizeMeters[validInx], zoneNums[validInx], latiBands[validInx])
+  centerLongis[validInx] = np.where(outRangeFlags, 0.0, longis)
+  centerLatis[validInx] = np.where(outRangeFlags, 0.0, latis)
+  retVals[validInx[outRangeFlags]] |= 32  ## Bin out of UTM range
+  retVals *= -1
+  return retVals, centerLongis, centerLatis, binSizeMeters, binTypes, zoneNums, latiBands, xs, ys
+
+##-------------------- Packed GeoID (64-bit integer) -----
+## geoInt = offset(binType, binSize) + ((zoneInx * 20 + bandInx) * numX + x) * numY + y
+##   numX, numY: lattice size covering easting 0 ~ 1,000,000 and northing 0 ~ 10,000,000 for the bin
+##   Sorting geoInts gives the same order as sorting the GeoID strings.
+sLatiBands = 'CDEFGHJKLMNPQRSTUVWX'
+geoIntTypes = (int, long, np.integer)
+geoIntTable = []  ## [offsets, numXs, numYs]; index binType * 9999 + binSizeMeter - 1; built at first use
+
+def getGeoIntTable():
+  if (len(geoIntTable) == 0):
+    numBlock = 2 * 9999
+    offsets = np.zeros(numBlock + 1, dtype=np.int64)
+    numXs = np.zeros(numBlock, dtype=np.int64)
+    numYs = np.zeros(numBlock, dtype=np.int64)
+    offset = 0
+    for binType in xrange(0, 2):
+      for binSizeMeter in xrange(1, 10000):
+        inx = binType * 9999 + binSizeMeter - 1
+        if (binType == 0):
+          numXs[inx] = 1000000 // binSizeMeter + 1
+          numYs[inx] = 10000000 // binSizeMeter + 1
+        else:
+          numXs[inx] = 4000000 // (3 * binSizeMeter) + 2
+          numYs[inx] = int(10000000 / (binSizeMeter / 2.0 * math.sin(math.pi / 3.0))) + 2
+        offsets[inx] = offset
+        offset += 60 * 20 * int(numXs[inx]) * int(numYs[inx])
+    offsets[numBlock] = offset  ## Total; < 2^57
+    geoIntTable.extend([offsets, numXs, numYs])
+  return geoIntTable
+
+def isGeoInt(geoID):
+  return (isinstance(geoID, geoIntTypes) and (not isinstance(geoID, bool)))
+
+def assembleGeoInt(binType, binSizeMeter, zoneNum, latiBand, x, y):
+  ## Fields should be valid (checked as getLLFromGeoID()); return -1 if x or y is out of packing range
+  offsets, numXs, numYs = getGeoIntTable()
+  inx = binType * 9999 + binSizeMeter - 1
+  numX = int(numXs[inx])
+  numY = int(numYs[inx])
+  if ((x < 0) or (x >= numX) or (y < 0) or (y >= numY)):
+    return -1
+  return int(offsets[inx]) + (((zoneNum - 1) * 20 + sLatiBands.find(latiBand)) * numX + int(x)) * numY + int(y)
+
+def disassembleGeoInt(geoInt):
+  ## Same output as disassembleGeoID() with retVal first; retVal -1: invalid packed GeoID
+  offsets, numXs, numYs = getGeoIntTable()
+  if ((geoInt < 0) or (geoInt >= offsets[-1])):
+    return -1, 0, '', 0, 0, 0, 0
+  geoInt = int(geoInt)
+  inx = int(np.searchsorted(offsets, geoInt, side='right')) - 1
+  binType = inx // 9999
+  binSizeMeter = inx % 9999 + 1
+  rem = geoInt - int(offsets[inx])
+  rem, y = divmod(rem, int(numYs[inx]))
+  rem, x = divmod(rem, int(numXs[inx]))
+  zoneInx, bandInx = divmod(rem, 20)
+  return 0, zoneInx + 1, sLatiBands[bandInx], x, y, binType, binSizeMeter
+
+def disassembleGeoInts(geoInts):
+  ## Batch disassembleGeoInt(); same output as disassembleGeoIDs(); retVals bit 0 (positive): invalid packed GeoID
+  geoInts = np.asarray(geoInts, dtype=np.int64).ravel()
+  offsets, numXs, numYs = getGeoIntTable()
+  retVals = np.zeros(len(geoInts), dtype=np.int32)
+  invalidFlags = (geoInts < 0) | (geoInts >= offsets[-1])
+  retVals[invalidFlags] |= 1
+  geoIntsUse = np.where(invalidFlags, 0, geoInts)
+  inx = np.searchsorted(offsets, geoIntsUse, side='right') - 1
+  binTypes = inx // 9999
+  binSizeMeters = inx % 9999 + 1
+  rem = geoIntsUse - offsets[inx]
+  ys = rem % numYs[inx]
+  rem //= numYs[inx]
+  xs = rem % numXs[inx]
+  rem //= numXs[inx]
+  latiBands = np.array(list(sLatiBands), dtype='S1')[rem % 20]
+  zoneNums = rem // 20 + 1
+  return retVals, zoneNums, latiBands, xs, ys, binTypes, binSizeMeters
+
+def geoIDToInt(geoID):
+  ## Return: retVal (bits as getLLFromGeoID(), plus negative bit 5: reserved
+  ##   not 0 or x, y out of packing range), geoInt (-1 if invalid)
+  retVal = 0
+  geoInt = -1
+  if (isGeoInt(geoID)):  ## Already packed
+    retVal, zoneNum, latiBand, x, y, binType, binSizeMeter = disassembleGeoInt(geoID)
+    if (retVal == 0):
+      geoInt = int(geoID)
+    return retVal, geoInt
+  if ((len(geoID) > 40) or (len(geoID) <= minLenGeoID)):
+    retVal |= 1
+  else:
+    try:
+      zoneNum, latiBand, x, y, binType, binSizeMeter = disassembleGeoID(geoID)
+    except ValueError:  ## Unparsable field
+      return -1, geoInt
+    if ((binType != 0) and (binType != 1)):
+      retVal |= 2
+    if ((binSizeMeter <= 0) or (binSizeMeter > 9999)):
+      retVal |= 4
+    if ((zoneNum <= 0) or (zoneNum > 60)):
+      retVal |= 8
+    if ((len(latiBand) != 1) or (sLatiBands.find(latiBand) == -1)):
+      retVal |= 16
+    if ((retVal == 0) and (geoID[0:10] != '0000000000')):
+      retVal |= 32
+    if (retVal == 0):
+      geoInt = assembleGeoInt(binType, binSizeMeter, zoneNum, latiBand, x, y)
+      if (geoInt < 0):
+        retVal |= 32
+  return -retVal, geoInt
+
+def intToGeoID(geoInt):
+  ## Return: retVal (negative bit 0: invalid packed GeoID), geoID ('' if invalid)
+  retVal, zoneNum, latiBand, x, y, binType, binSizeMeter = disassembleGeoInt(geoInt)
+  geoID = ''
+  if (retVal == 0):
+    geoID = assembleGeoID(binType, binSizeMeter, zoneNum, latiBand, x, y)
+  return retVal, geoID
+
+def geoIDsToInts(geoIDs):
+  ## Batch geoIDToInt(); return retVals, geoInts (int64; -1 if invalid)
+  sGeoIDs = np.asarray(geoIDs)
+  if (sGeoIDs.dtype.kind in 'iu'):  ## Already packed
+    retVals = disassembleGeoInts(sGeoIDs)[0]
+    geoInts = np.where(retVals == 0, sGeoIDs.ravel(), -1).astype(np.int64)
+    return -retVals, geoInts
+  if (sGeoIDs.dtype.kind != 'S'):
+    sGeoIDs = sGeoIDs.astype('S')
+  sGeoIDs = sGeoIDs.ravel()
+  retVals, zoneNums, latiBands, xs, ys, binTypes, binSizeMeters = disassembleGeoIDs(sGeoIDs)
+  retVals = chkGeoIDsFields(retVals, zoneNums, latiBands, binTypes, binSizeMeters)
+  retVals[(retVals == 0) & ~np.char.startswith(sGeoIDs, '0000000000')] |= 32
+  geoInts = np.zeros(len(retVals), dtype=np.int64)
+  geoInts.fill(-1)
+  validInx = np.flatnonzero(retVals == 0)
+  if (len(validInx) > 0):
+    offsets, numXs, numYs = getGeoIntTable()
+    inx = binTypes[validInx] * 9999 + binSizeMeters[validInx] - 1
+    xsUse = xs[validInx]
+    ysUse = ys[validInx]
+    inRangeFlags = (xsUse >= 0) & (xsUse < numXs[inx]) & (ysUse >= 0) & (ysUse < numYs[inx])
+    retVals[validInx[~inRangeFlags]] |= 32
+    validInx = validInx[inRangeFlags]
+    inx = inx[inRangeFlags]
+    bandInxs = np.searchsorted(np.array(list(sLatiBands), dtype='S1'), latiBands[validInx])
+    geoInts[validInx] = offsets[inx] + (((zoneNums[validInx] - 1) * 20 + bandInxs) * numXs[inx] + xsUse[inRangeFlags]) * numYs[inx] + ysUse[inRangeFlags]
+  return -retVals, geoInts
+
+def getGeoIntsFromLLs(longis, latis, binSizeMeter, binType, zoneNumIn = -1):
+  ## Packed GeoIDs of getGeoIDsFromLLs() without center projection and GeoID strings
+  ## Return: retVals (bits as getGeoIDsFromLLs(), plus negative bit 5: out of packing range), geoInts (int64; -1 if invalid)
+  longis = np.asarray(longis, dtype=np.float64).ravel()
+  latis = np.asarray(latis, dtype=np.float64).ravel()
+  geoInts = np.zeros(len(longis), dtype=np.int64)
+  geoInts.fill(-1)
+  retVals, validInx, eastings, northings, zoneNums, latiBands, xs, ys, centerEastings, centerNorthings = getGeoIDXYsFromLLs(longis, latis, binSizeMeter, binType, zoneNumIn)
+  if (len(validInx) > 0):
+    offsets, numXs, numYs = getGeoIntTable()
+    inx = binType * 9999 + binSizeMeter - 1
+    bandInxs = np.searchsorted(np.array(list(sLatiBands), dtype='S1'), latiBands)
+    inRangeFlags = (xs >= 0) & (xs < numXs[inx]) & (ys >= 0) & (ys < numYs[inx])
+    geoInts[validInx] = np.where(inRangeFlags, offsets[inx] + (((zoneNums - 1) * 20 + bandInxs) * numXs[inx] + xs) * numYs[inx] + ys, -1)
+    if (binType == 1):  ## x == 0 needs GeoID from previous zone; same as getGeoIDFromUTM()
+      for i in np.flatnonzero(xs == 0):
+        geoID, centerLongi, centerLati = getGeoIDFromUTM(eastings[i], northings[i], binSizeMeter, binType, int(zoneNums[i]), latiBands[i])
+        retValT, geoInts[validInx[i]] = geoIDToInt(geoID)
+    retVals[validInx[geoInts[validInx] < 0]] = -32
+  return retVals, geoInts
+
+def intsToGeoIDs(geoInts):
+  ## Batch intToGeoID(); return retVals, geoIDs ('' if invalid)
+  retVals, zoneNums, latiBands, xs, ys, binTypes, binSizeMeters = disassembleGeoInts(geoInts)
+  geoIDs = assembleGeoIDs(binTypes, binSizeMeters, zoneNums, latiBands, xs, ys)
+  geoIDs[retVals != 0] = ''
+  return -retVals, geoIDs
+
+##-------------------- Neighbor -----
+neighborOffsetTable = {}  ## (binType, k): [dxs, dys, rings] (arrays and lists); built at first use
+
+def getNeighborOffsets(binType, k):
+  ## Lattice offsets of rings 1 ~ k; ring by ring, then north to south, then west to east
+  key = (binType, k)
+  if (key not in neighborOffsetTable):
+    if (binType == 0):  ## Square
+      dxs, dys = np.meshgrid(np.arange(-k, k + 1), np.arange(-k, k + 1))
+      rings = np.maximum(np.abs(dxs), np.abs(dys))
+      keepFlags = (rings > 0)
+    else:  ## Hexagon; (dx + dy) even keeps odd x + y
+      dxs, dys = np.meshgrid(np.arange(-k, k + 1), np.arange(-2 * k, 2 * k + 1))
+      rings = np.abs(dxs) + np.maximum(0, (np.abs(dys) - np.abs(dxs)) // 2)
+      keepFlags = (rings > 0) & (rings <= k) & ((dxs + dys) % 2 == 0)
+    dxs = dxs[keepFlags]
+    dys = dys[keepFlags]
+    rings = rings[keepFlags]
+    order = np.lexsort((dxs, -dys, rings))
+    dxs = dxs[order]
+    dys = dys[order]
+    rings = rings[order]
+    neighborOffsetTable[key] = [dxs, dys, rings, dxs.tolist(), dys.tolist(), rings.tolist()]
+  return neighborOffsetTable[key]
+
+def getLatticeCenterUTM(binType, binSizeMeter, x, y):
+  ## Bin center of lattice indices; same as getGeoIDCenterLLSquare() and getGeoIDCenterLLHexagon() (scalars or arrays)
+  if (binType == 0):
+    return x * binSizeMeter + binSizeMeter / 2.0, y * binSizeMeter + binSizeMeter / 2.0
+  xSeg = binSizeMeter / 4.0
+  ySeg = binSizeMeter / 2.0 * math.sin(math.pi / 3.0)
+  return x * 3.0 * xSeg - xSeg, y * ySeg
+
+def getRingCheckUTMs(binType, binSizeMeter, x, y, k):
+  ## Corners of the rectangle of ring bin centers, plus its top and bottom at the central meridian
+  ##   (latitude is extreme there; longitude at the corners); scalars or arrays
+  if (binType == 0):
+    eastingMin, northingMin = getLatticeCenterUTM(binType, binSizeMeter, x - k, y - k)
+    eastingMax, northingMax = getLatticeCenterUTM(binType, binSizeMeter, x + k, y + k)
+  else:
+    eastingMin, northingMin = getLatticeCenterUTM(binType, binSizeMeter, x - k, y - 2 * k)
+    eastingMax, northingMax = getLatticeCenterUTM(binType, binSizeMeter, x + k, y + 2 * k)
+  if (isinstance(eastingMin, np.ndarray)):
+    eastingMid = np.clip(500000.0, eastingMin, eastingMax)
+  else:
+    eastingMid = min(max(500000.0, eastingMin), eastingMax)
+  eastings = [eastingMin, eastingMin, eastingMax, eastingMax, eastingMid, eastingMid]
+  northings = [northingMin, northingMax, northingMin, northingMax, northingMin, northingMax]
+  return eastings, northings
+
+def getRingSafeFlag(binType, binSizeMeter, zoneNum, latiBand, x, y, k):
+  ## 1 if all bin centers of rings 1 ~ k are in zoneNum and latiBand (lattice offsets give their GeoIDs)
+  eastings, northings = getRingCheckUTMs(binType, binSizeMeter, x, y, k)
+  if ((eastings[0] < 100000) or (eastings[2] >= 1000000) or (northings[0] < 0) or (northings[1] > 10000000)):
+    return 0
+  for p in xrange(0, 6):
+    lati, longi = utmproj.to_latlon(eastings[p], northings[p], zoneNum, latiBand)
+    if ((lati < -80.0) or (lati > 84.0) or (utmproj.latlon_to_zone_number(lati, longi) != zoneNum) or (utmproj.latitude_to_zone_letter(lati) != latiBand)):
+      return 0
+  return 1
+
+def getRingSafeFlags(binType, binSizeMeters, zoneNums, latiBands, xs, ys, k):
+  ## Batch getRingSafeFlag(); one binType
+  eastings, northings = getRingCheckUTMs(binType, binSizeMeters, xs, ys, k)
+  eastings = np.column_stack(eastings)
+  northings = np.column_stack(northings)
+  safeFlags = (eastings[:, 0] >= 100000) & (eastings[:, 2] < 1000000) & (northings[:, 0] >= 0) & (northings[:, 1] <= 10000000)
+  zoneNumsT = np.repeat(zoneNums, 6).reshape(-1, 6)
+  latiBandsT = np.repeat(latiBands, 6).reshape(-1, 6)
+  latis, longis = utmproj.toLatLons(eastings, northings, zoneNumsT, latiBandsT)
+  inRangeFlags = (latis >= -80.0) & (latis <= 84.0)
+  latis = np.where(inRangeFlags, latis, 0.0)
+  safeFlags &= np.all(inRangeFlags & (utmproj.getZoneNumsFromLLs(latis, longis) == zoneNumsT) & (utmproj.getLatiBandsFromLatis(latis) == latiBandsT), axis=1)
+  return safeFlags
+
+def getNeighborGeoIDsProj(binType, binSizeMeter, zoneNum, latiBand, x, y, dxs, dys, rings):
+  ## Neighbors across zone or latitude band: GeoID of getGeoIDFromLL() at each neighbor center
+  neighborGeoIDs = []
+  neighborRings = []
+  geoIDSet = set([assembleGeoID(binType, binSizeMeter, zoneNum, latiBand, x, y)])
+  for dx, dy, ring in zip(dxs, dys, rings):
+    easting, northing = getLatticeCenterUTM(binType, binSizeMeter, x + dx, y + dy)
+    lati, longi = utmproj.to_latlon(easting, northing, zoneNum, latiBand, strict=False)
+    retVal, geoID, centerLongi, centerLati, zoneNumT = getGeoIDFromLL(longi, lati, binSizeMeter, binType)
+    if ((retVal == 0) and (geoID not in geoIDSet)):
+      geoIDSet.add(geoID)
+      neighborGeoIDs.append(geoID)
+      neighborRings.append(ring)
+  return neighborGeoIDs, neighborRings
+
+def getNeighborGeoIDs(geoID, k = 1):
+  neighborGeoIDs = []
+  rings = []
+  retVal, zoneNum, latiBand, x, y, binType, binSizeMeter = getGeoIDFields(geoID)
+  if ((retVal == 0) and ((not isinstance(k, (int, long, np.integer))) or (k < 0))):
+    retVal = -32
+  if (retVal == 0):
+    dxArr, dyArr, ringArr, dxs, dys, ringsAll = getNeighborOffsets(binType, int(k))
+    if (getRingSafeFlag(binType, binSizeMeter, zoneNum, latiBand, x, y, k) == 1):
+      rings = list(ringsAll)
+      if (isGeoInt(geoID)):  ## Packed; neighbors are offsets of the packed index (assembleGeoInt())
+        offsets, numXs, numYs = getGeoIntTable()
+        numX = int(numXs[binType * 9999 + binSizeMeter - 1])
+        numY = int(numYs[binType * 9999 + binSizeMeter - 1])
+        neighborGeoIDs = [(int(geoID) + dx * numY + dy) if ((0 <= x + dx < numX) and (0 <= y + dy < numY)) else -1 for dx, dy in zip(dxs, dys)]
+      else:  ## Same prefix as assembleGeoID()
+        sPre = '0000000000' + str(binType) + ('%04d' % (binSizeMeter)) + ('%02d' % (zoneNum)) + latiBand
+        neighborGeoIDs = [sPre + ('%011d%011d' % (x + dx, y + dy)) for dx, dy in zip(dxs, dys)]
+    else:
+      neighborGeoIDs, rings = getNeighborGeoIDsProj(binType, binSizeMeter, zoneNum, latiBand, x, y, dxs, dys, ringsAll)
+      if (isGeoInt(geoID)):
+        neighborGeoIDs = [geoIDToInt(neighborGeoID)[1] for neighborGeoID in neighborGeoIDs]
+  return retVal, neighborGeoIDs, rings
+
+def getNeighborGeoIDsFromGeoIDs(geoIDs, k = 1):
+  ## Return: retVals, neighbors (N, M), rings (N, M)
+  packedFlag = (np.asarray(geoIDs).dtype.kind in 'iu')
+  retVals, zoneNums, latiBands, xs, ys, binTypes, binSizeMeters = disassembleGeoIDs(geoIDs)
+  retVals = chkGeoIDsFields(retVals, zoneNums, latiBands, binTypes, binSizeMeters)
+  if ((not isinstance(k, (int, long, np.integer))) or (k < 0)):
+    retVals |= 32
+    k = 0
+  numVal = len(retVals)
+  numNeighbor = max(len(getNeighborOffsets(binType, int(k))[0]) for binType in xrange(0, 2))
+  neighborInts = np.zeros((numVal, numNeighbor), dtype=np.int64)
+  neighborInts.fill(-1)
+  rings = np.zeros((numVal, numNeighbor), dtype=np.int64)
+  rings.fill(-1)
+  offsets, numXs, numYs = getGeoIntTable()
+  for binType in xrange(0, 2):
+    validInx = np.flatnonzero((retVals == 0) & (binTypes == binType))
+    if (len(validInx) == 0):
+      continue
+    dxs, dys, ringsAll = getNeighborOffsets(binType, int(k))[0:3]
+    numOffset = len(dxs)
+    safeFlags = getRingSafeFlags(binType, binSizeMeters[validInx], zoneNums[validInx], latiBands[validInx], xs[validInx], ys[validInx], k)
+
+    ## Inside zone and latitude band: packed index of lattice offsets
+    inx = validInx[safeFlags]
+    tableInx = (binType * 9999 + binSizeMeters[inx] - 1)[:, np.newaxis]
+    bandInxs = np.searchsorted(np.array(list(sLatiBands), dtype='S1'), latiBands[inx])[:, np.newaxis]
+    nxs = xs[inx][:, np.newaxis] + dxs
+    nys = ys[inx][:, np.newaxis] + dys
+    inRangeFlags = (nxs >= 0) & (nxs < numXs[tableInx]) & (nys >= 0) & (nys < numYs[tableInx])
+    neighborInts[inx, 0:numOffset] = np.where(inRangeFlags, offsets[tableInx] + (((zoneNums[inx][:, np.newaxis] - 1) * 20 + bandInxs) * numXs[tableInx] + nxs) * numYs[tableInx] + nys, -1)
+    rings[inx, 0:numOffset] = np.where(inRangeFlags, ringsAll, -1)
+
+    ## Across zone or latitude band: projection
+    for i in validInx[~safeFlags]:
+      neighborGeoIDs, neighborRings = getNeighborGeoIDsProj(binType, int(binSizeMeters[i]), int(zoneNums[i]), latiBands[i], int(xs[i]), int(ys[i]), dxs.tolist(), dys.tolist(), ringsAll.tolist())
+      if (len(neighborGeoIDs) > 0):
+        neighborInts[i, 0:len(neighborGeoIDs)] = geoIDsToInts(neighborGeoIDs)[1]
+        rings[i, 0:len(neighborGeoIDs)] = neighborRings
+  rings[neighborInts < 0] = -1
+  if (packedFlag):
+    return -retVals, neighborInts, rings
+  neighborIDs = intsToGeoIDs(neighborInts.ravel())[1].reshape(numVal, numNeighbor)
+  return -retVals, neighborIDs, rings
+
+##-------------------- Hierarchy -----
+def assembleGeoInts(binTypes, binSizeMeters, zoneNums, latiBands, xs, ys):
+  ## Batch assembleGeoInt(); -1 if x or y is out of packing range
+  offsets, numXs, numYs = getGeoIntTable()
+  inx = binTypes * 9999 + binSizeMeters - 1
+  bandInxs = np.searchsorted(np.array(list(sLatiBands), dtype='S1'), latiBands)
+  inRangeFlags = (xs >= 0) & (xs < numXs[inx]) & (ys >= 0) & (ys < numYs[inx])
+  return np.where(inRangeFlags, offsets[inx] + (((zoneNums - 1) * 20 + bandInxs) * numXs[inx] + xs) * numYs[inx] + ys, -1)
+
+def getParentXYs(binType, binSizeMeters, xs, ys, parentBinSize, parentBinType):
+  ## Parent lattice indices of bins of one binType (arrays)
+  if ((binType == 0) and (parentBinType == 0)):
+    exactFlags = (parentBinSize % binSizeMeters == 0)
+    if (np.all(exactFlags)):  ## Nested squares; integer only
+      return xs * binSizeMeters // parentBinSize, ys * binSizeMeters // parentBinSize
+  eastings, northings = getLatticeCenterUTM(binType, binSizeMeters, xs, ys)
+  if (parentBinType == 0):
+    pxs, pys = getGeoIDXYCenterSquares(eastings, northings, parentBinSize)[0:2]
+    if (binType == 0):
+      pxs = np.where(exactFlags, xs * binSizeMeters // parentBinSize, pxs)
+      pys = np.where(exactFlags, ys * binSizeMeters // parentBinSize, pys)
+    return pxs, pys
+  return getGeoIDXYCenterHexagons(eastings, northings, parentBinSize)[0:2]
+
+def getParentGeoIDsFromGeoIDs(geoIDs, parentBinSize, parentBinType = -1):
+  ## Return: retVals, parents
+  packedFlag = (np.asarray(geoIDs).dtype.kind in 'iu')
+  retVals, zoneNums, latiBands, xs, ys, binTypes, binSizeMeters = disassembleGeoIDs(geoIDs)
+  retVals = chkGeoIDsFields(retVals, zoneNums, latiBands, binTypes, binSizeMeters)
+  numVal = len(retVals)
+  parentBinTypes = binTypes.copy()
+  if (parentBinType >= 0):
+    parentBinTypes.fill(parentBinType)
+  if ((parentBinSize < 1) or (parentBinSize > 9999) or (parentBinType > 1)):
+    retVals |= 32
+  pxs = np.zeros(numVal, dtype=np.int64)
+  pys = np.zeros(numVal, dtype=np.int64)
+  for binType in xrange(0, 2):
+    for parentBinTypeUse in xrange(0, 2):
+      inx = np.flatnonzero((retVals == 0) & (binTypes == binType) & (parentBinTypes == parentBinTypeUse))
+      if (len(inx) > 0):
+        pxs[inx], pys[inx] = getParentXYs(binType, binSizeMeters[inx], xs[inx], ys[inx], parentBinSize, parentBinTypeUse)
+  validFlags = (retVals == 0)
+  if (packedFlag):
+    parents = np.full(numVal, -1, dtype=np.int64)
+    parents[validFlags] = assembleGeoInts(parentBinTypes[validFlags], parentBinSize, zoneNums[validFlags], latiBands[validFlags], pxs[validFlags], pys[validFlags])
+    retVals[validFlags & (parents < 0)] |= 64
+    parents[retVals != 0] = -1
+  else:
+    parents = assembleGeoIDs(parentBinTypes, parentBinSize, zoneNums, latiBands, pxs, pys)
+    parents[~validFlags] = ''
+  return -retVals, parents
+
+def getParentGeoID(geoID, parentBinSize, parentBinType = -1):
+  retVals, parents = getParentGeoIDsFromGeoIDs(np.array([geoID]), parentBinSize, parentBinType)
+  if (isGeoInt(geoID)):
+    return int(retVals[0]), int(parents[0])
+  return int(retVals[0]), str(parents[0])
+
+def getChildGeoIDs(geoID, childBinSize, childBinType = -1):
+  childGeoIDs = []
+  retVal, zoneNum, latiBand, x, y, binType, binSizeMeter = getGeoIDFields(geoID)
+  if ((retVal == 0) and ((childBinSize < 1) or (childBinSize > 9999) or (childBinType > 1))):
+    retVal = -32
+  if (retVal == 0):
+    if (childBinType < 0):
+      childBinType = binType
+
+    ## Child lattice indices around the parent bound; keep those whose parent is geoID
+    if (binType == 0):
+      eastingMin, northingMin = x * binSizeMeter, y * binSizeMeter
+      eastingMax, northingMax = eastingMin + binSizeMeter, northingMin + binSizeMeter
+    else:
+      centerEasting, centerNorthing = getLatticeCenterUTM(binType, binSizeMeter, x, y)
+      eastingMin, eastingMax = centerEasting - binSizeMeter / 2.0, centerEasting + binSizeMeter / 2.0
+      northingMin, northingMax = centerNorthing - binSizeMeter / 2.0, centerNorthing + binSizeMeter / 2.0
+    if (childBinType == 0):
+      cxs = np.arange(int(math.floor(eastingMin / childBinSize)) - 1, int(math.ceil(eastingMax / childBinSize)) + 1)
+      cys = np.arange(int(math.floor(northingMin / childBinSize)) - 1, int(math.ceil(northingMax / childBinSize)) + 1)
+    else:
+      xSeg = childBinSize / 4.0
+      ySeg = childBinSize / 2.0 * math.sin(math.pi / 3.0)
+      cxs = np.arange(int(math.floor((eastingMin / xSeg + 1) / 3.0)) - 1, int(math.ceil((eastingMax / xSeg + 1) / 3.0)) + 2)
+      cys = np.arange(int(math.floor(northingMin / ySeg)) - 1, int(math.ceil(northingMax / ySeg)) + 2)
+    cxs, cys = np.meshgrid(cxs, cys, indexing='ij')
+    cxs = cxs.ravel()
+    cys = cys.ravel()
+    if (childBinType == 1):  ## Hexagon centers have odd x + y
+      keepFlags = ((cxs + cys) % 2 == 1)
+      cxs = cxs[keepFlags]
+      cys = cys[keepFlags]
+    keepFlags = (cxs >= 0) & (cys >= 0)
+    cxs = cxs[keepFlags]
+    cys = cys[keepFlags]
+    pxs, pys = getParentXYs(childBinType, np.broadcast_to(childBinSize, cxs.shape), cxs, cys, binSizeMeter, binType)
+    keepFlags = (pxs == x) & (pys == y)
+    cxs = cxs[keepFlags]
+    cys = cys[keepFlags]
+    if (isGeoInt(geoID)):
+      childGeoIDs = assembleGeoInts(np.broadcast_to(childBinType, cxs.shape), childBinSize, np.broadcast_to(zoneNum, cxs.shape), np.broadcast_to(latiBand, cxs.shape), cxs, cys)
+      childGeoIDs = [int(childGeoID) for childGeoID in childGeoIDs if (childGeoID >= 0)]
+    else:
+      childGeoIDs = assembleGeoIDs(childBinType, childBinSize, np.broadcast_to(zoneNum, cxs.shape), np.broadcast_to(latiBand, cxs.shape), cxs, cys).tolist()
+  return retVal, childGeoIDs
+
+##-------------------- Radius -----
+def getLatticeXYsInDisk(binType, binSizeMeter, easting, northing, radiusMeters):
+  ## Lattice indices (x, y) of bins whose centers are within radiusMeters of (easting, northing); row by row
+  if (binType == 0):
+    ySeg = float(binSizeMeter)
+    ys = np.arange(int(math.floor((northing - radiusMeters) / ySeg - 0.5)) - 1, int(math.ceil((northing + radiusMeters) / ySeg - 0.5)) + 2)
+  else:
+    ySeg = binSizeMeter / 2.0 * math.sin(math.pi / 3.0)
+    ys = np.arange(int(math.floor((northing - radiusMeters) / ySeg)) - 1, int(math.ceil((northing + radiusMeters) / ySeg)) + 2)
+  centerNorthings = getLatticeCenterUTM(binType, binSizeMeter, 0, ys)[1]
+  halfWidths = np.sqrt(np.maximum(radiusMeters * radiusMeters - (centerNorthings - northing) ** 2, 0.0))
+
+  ## x range per row; one more each side, checked by distance below
+  if (binType == 0):
+    xMins = np.floor((easting - halfWidths) / binSizeMeter - 0.5).astype(np.int64) - 1
+    xMaxs = np.ceil((easting + halfWidths) / binSizeMeter - 0.5).astype(np.int64) + 1
+    step = 1
+  else:
+    xSeg = binSizeMeter / 4.0
+    xMins = np.floor(((easting - halfWidths) / xSeg + 1) / 3.0).astype(np.int64) - 1
+    xMaxs = np.ceil(((easting + halfWidths) / xSeg + 1) / 3.0).astype(np.int64) + 1
+    xMins += ((xMins + ys) % 2 == 0)  ## Hexagon centers have odd x + y
+    step = 2
+  rowFlags = (np.abs(centerNorthings - northing) <= radiusMeters + ySeg)
+  nums = np.where(rowFlags, np.maximum((xMaxs - xMins) // step + 1, 0), 0)
+  rowInxs = np.repeat(np.arange(len(ys)), nums)
+  inRowInxs = np.arange(len(rowInxs)) - np.repeat(np.cumsum(nums) - nums, nums)
+  xs = xMins[rowInxs] + step * inRowInxs
+  ys = ys[rowInxs]
+  centerEastings, centerNorthings = getLatticeCenterUTM(binType, binSizeMeter, xs, ys)
+  dists = np.hypot(centerEastings - easting, centerNorthings - northing)
+  inFlags = (dists <= radiusMeters)
+  return xs[inFlags], ys[inFlags], dists[inFlags], centerEastings[inFlags], centerNorthings[inFlags]
+
+def getBinsWithinRadius(longi, lati, radiusMeters, binSizeMeter, binType, zoneNumIn = -1):
+  ## Return: retVal, geoIDs, dists
+  geoIDs = np.zeros(0, dtype='S40')
+  dists = np.zeros(0)
+  retVal = 0  ## Init.
+  if (not ((longi >= -180.0) and (longi <= 180.0))):
+    retVal |= 1
+  if (not ((lati >= -80.0) and (lati <= 84.0))):
+    retVal |= 2
+  if ((binSizeMeter < 1) or (binSizeMeter > 9999)):
+    retVal |= 4
+  if ((binType != 0) and (binType != 1)):
+    retVal |= 8
+  if (not ((radiusMeters >= 0) and (radiusMeters < 1000000))):
+    retVal |= 16
+  if (retVal != 0):
+    return -retVal, geoIDs, dists
+
+  forceZoneFlag = 0
+  if ((zoneNumIn >= 1) and (zoneNumIn <= 60)):
+    forceZoneFlag = 1
+    easting, northing, zoneNum, latiBand = utmproj.from_latlon(lati, longi, zoneNumIn)
+  else:
+    easting, northing, zoneNum, latiBand = utmproj.from_latlon(lati, longi)
+  if (latiBand < 'N'):  ## Northern hemisphere northing (negative in the south)
+    northing -= 10000000
+
+  ## Zones and latitude bands touched by the disk boundary
+  thetas = np.linspace(0.0, 2.0 * math.pi, 360, endpoint=False)
+  bndLatis, bndLongis = utmproj.toLatLons(easting + radiusMeters * np.cos(thetas), northing + radiusMeters * np.sin(thetas), np.repeat(zoneNum, 360), np.repeat('N', 360))
+  bndLatis = np.clip(bndLatis, -80.0, 84.0)
+  latiBands = set(utmproj.getLatiBandsFromLatis(bndLatis).tolist() + [latiBand])
+  zoneNums = set([zoneNum])
+  if (forceZoneFlag == 0):
+    zoneNums.update(utmproj.getZoneNumsFromLLs(bndLatis, bndLongis).tolist())
+
+  ## Each zone and hemisphere has its own lattice (southern northing starts 10,000 km north)
+  geoIDsList = []
+  distsList = []
+  for zoneNumUse in sorted(zoneNums):
+    eastingUse = easting
+    northingUse = northing
+    if (zoneNumUse != zoneNum):
+      eastingUse, northingUse = utmproj.from_latlon(lati, longi, zoneNumUse)[0:2]
+      if (lati < 0):
+        northingUse -= 10000000
+    for southFlag in sorted(set(band < 'N' for band in latiBands)):
+      latiBandUse = 'N'
+      if (southFlag):
+        latiBandUse = 'M'
+      xs, ys, distsUse, centerEastings, centerNorthings = getLatticeXYsInDisk(binType, binSizeMeter, eastingUse, northingUse + 10000000 * southFlag, radiusMeters)
+      if ((len(zoneNums) == 1) and (len(latiBands) == 1)):  ## One zone and band; no projection
+        bands = np.repeat(latiBand, len(xs))
+      else:  ## Zone and band of each bin center
+        centerLatis, centerLongis = utmproj.toLatLons(centerEastings, centerNorthings, np.repeat(zoneNumUse, len(xs)), np.repeat(latiBandUse, len(xs)))
+        keepFlags = (centerLatis >= -80.0) & (centerLatis <= 84.0) & ((centerLatis < 0) == southFlag)
+        if (forceZoneFlag == 0):
+          keepFlags &= (utmproj.getZoneNumsFromLLs(centerLatis, centerLongis) == zoneNumUse)
+        bands = utmproj.getLatiBandsFromLatis(np.where(keepFlags, centerLatis, 0.0))[keepFlags]
+        xs = xs[keepFlags]
+        ys = ys[keepFlags]
+        distsUse = distsUse[keepFlags]
+      geoIDsList.append(assembleGeoIDs(binType, binSizeMeter, np.repeat(zoneNumUse, len(xs)), bands, xs, ys))
+      distsList.append(distsUse)
+  geoIDs = np.concatenate(geoIDsList)
+  dists = np.concatenate(distsList)
+  order = np.argsort(geoIDs, kind='mergesort')
+  return 0, geoIDs[order], dists[order]
+
+##-------------------- Test -----
+if __name__ == '__main__':
+  ## Function test
+  retVal = 0
+  centerLongi = 0.0
+  centerLati = 0.0
+  zoneNum = 0
+  numValInBound = 0
+  llBound = [0,1,2,3,4,5,6,7,8,9,10,11]
+
+  ## Setup arguments
+  ## (longi, lati) = (51.2, 7.5) -> (easting, northing) = (395201.310381, 5673135.24118); 32U
+  #longi = 51.2
+  #lati = 7.5
+  longi = -122.51593
+  lati = 37.752214
+  binSizeMeter = 100
+  binType = 1
+  geoID = '00000000001010032U0000000526900000131015'
+
+  ## Calling function
+  retVal, geoID, centerLongi, centerLati, zoneNum = getGeoIDFromLL(longi, lati, binSizeMeter, binType)
+  #print 'getGeoIDFromLL():', longi, lati, binSizeMeter, binType, ':', retVal, geoID, centerLongi, centerLati, zoneNum  ## Echo print
+
+  retVal, numValInBound, llBound, centerLongi, centerLati, binSizeMeter, binType = getLLFromGeoID(geoID)
+  #print 'getLLFromGeoID():', geoID, ':', retVal, numValInBound, llBound, centerLongi, centerLati, binSizeMeter, binType  ## Echo print
@@ -1,651 +1,1555 @@
-## getBinsInRegions.py
-##
-## Need to install utm: pip install utm
-##
-## Input argument: None
-## Test run: python getBinsInRegions.py
-##
-## Fuctions:
-## getBinsInARegion(numValInBound, llBound, binSizeMeter, binType, pathName, zoneNum = -1, **kwargs)
-##   Input: numValInBound, llBound, binSizeMeter, binType, pathName, optional
-##          zoneNum, optional key value pairs for properties
-##   Return: negative bit 0: invalid numValInBound
-##           negative bit 1: invalid llBound
-##           negative bit 2: invalid bin size
-##           negative bit 3: invalid bin type
-##           negative bit 4: invalid pathName
-##           negative bit 5: path cannot be created
-##           negative bit 6: file cannot be created
-##           0: successful
-##   Note: Generate a geoJSON file: GeoBin.json.
-##   Note: Typically, zoneNum should be set to -1 in order to detect zone
-##         number automatically from latitude and longitude.
-##   Note: If kwargs is not provided, default GeoJSON properties will be used.
-## getBinGeoJSONFromGeoID(geoID, **kwargs)
-##   Input: geoID, optional key value pairs for properties
-##   Output: data (GeoJSON in plain string format)
-##   Return: negative bit 0: invalid geoID length
-##           negative bit 1: invalid geoID binType
-##           negative bit 2: invalid geoID binSize
-##           negative bit 3: invalid geoID zoneNum
-##           negative bit 4: invalid geoID zoneLetter
-##           0: successful
-##   Note: If kwargs is not provided, default GeoJSON properties will be used.
-##
-
-import utm, math, sys, os, errno
-from geoidutm import getGeoIDFromLL, getGeoIDFromUTM, getLLFromGeoID, getBoundFromCenterSquare, getBoundFromCenterHexagon, getLLBoundFromUTMBound
-from ptinregion import utmPtInRegion, llPtInRegion
-#import json
-
-## Global variables (default values)
-strokeColorDef = "#000000"
-strokeWeightDef = 1
-strokeOpacityDef = 1
-fillColorDef = "#FFFFFF"
-fillOpacityDef = 0.3
-
-## Function
-def dist2LL(lon1, lat1, lon2, lat2):
-    ## Haversine formula for distance between 2 LLs
-    radius = 6371 # km
-    dlat = math.radians(lat2-lat1)
-    dlon = math.radians(lon2-lon1)
-    a = math.sin(dlat/2) * math.sin(dlat/2) + math.cos(math.radians(lat1)) \
-        * math.cos(math.radians(lat2)) * math.sin(dlon/2) * math.sin(dlon/2)
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    dist = radius * c
-    return dist
-
-def getRecFromBound(numValInBound, bound):
-  ## Get rectangular boundary from a polygon; X0, Y0, X1, Y1, ...
-  recBound = [0,1,2,3,4,5,6,7]
-  minX = minY = maxX = maxY = 0.0
-  for i in xrange(0, numValInBound, 2):
-    if (i == 0):
-      minX = maxX = bound[i]
-      minY = maxY = bound[i+1]
-    else:
-      if (minX > bound[i]):
-        minX = bound[i]
-      if (minY > bound[i+1]):
-        minY = bound[i+1]
-      if (maxX < bound[i]):
-        maxX = bound[i]
-      if (maxY < bound[i+1]):
-        maxY = bound[i+1]
-  recBound[0] = recBound[2] = minX
-  recBound[1] = recBound[7] = minY
-  recBound[3] = recBound[5] = maxY
-  recBound[4] = recBound[6] = maxX
-  return recBound
-
-def convertLLToUTMOneBound(numValInBound, llBound, zoneNumForce = -1):
-  utmBound = [0] * numValInBound
-  zoneNum = 0
-  zoneNumUse = zoneNumForce
-  for i in xrange(0, numValInBound, 2):
-    if ((zoneNumUse <= 0) or (zoneNumUse > 60)):
-      utmBound[i], utmBound[i+1], zoneNum, latiBand = utm.from_latlon(llBound[i+1], llBound[i])
-    else:
-      utmBound[i], utmBound[i+1], zoneNum, latiBand = utm.from_latlon(llBound[i+1], llBound[i], zoneNumUse)
-    zoneNumUse = zoneNum
-  return utmBound
-
-def convertUTMToLLOneBound(numValInBound, utmBound, zoneNum, latiBand):
-  llBoundFromUTM = [0] * numValInBound
-  for i in xrange(0, numValInBound, 2):
-    llBoundFromUTM[i+1], llBoundFromUTM[i] = utm.to_latlon(utmBound[i], utmBound[i+1], zoneNum, latiBand)
-  return llBoundFromUTM
-
-def getDistLLRecBound(llRecBound):
-  distH1 = dist2LL(llRecBound[0], llRecBound[1], llRecBound[6], llRecBound[7])
-  distH2 = dist2LL(llRecBound[2], llRecBound[3], llRecBound[4], llRecBound[5])
-  distH = distH1
-  if (distH < distH2):
-    distH = distH2
-  distH *= 1000.0;  ## Meters
-  distV1 = dist2LL(llRecBound[0], llRecBound[1], llRecBound[2], llRecBound[3])
-  distV2 = dist2LL(llRecBound[4], llRecBound[5], llRecBound[6], llRecBound[7])
-  distV = distV1
-  if (distV < distV2):
-    distV = distV2
-  distV *= 1000.0;  ## Meters
-  return distH, distV
-
-def getDistUTMRecBound(utmRecBound):
-  distH = utmRecBound[6] - utmRecBound[0]
-  distV = utmRecBound[3] - utmRecBound[1]
-  return distH, distV
-
-def writeDataJsonGeo(geojson_file, firstFlag, geoID, centerLongi, centerLati, numBinBound, lonClock, latClock):
-  binCenterFlag = 0
-  if (firstFlag == 1):
-    geojson_file.write("  },\n  \"features\": [\n")  ## Data for the previous one
-    #geojson_file.write("  \"features\": [\n")  ## Data for the previous one; uncomment if no default properties
-  else:
-    geojson_file.write("    },\n")  ## Data for the previous one
-
-  ## Center; do not output; Jan. 23, 2017
-  if (binCenterFlag == 1):
-    geojson_file.write("    {\n      \"type\": \"Feature\",\n")
-    geojson_file.write("      \"geometry\": {\n")
-    geojson_file.write("        \"type\": \"Point\",\n        \"coordinates\": [{0}, {1}]\n".format(centerLongi, centerLati))
-    geojson_file.write("      },\n")
-    geojson_file.write("      \"properties\": {\n")
-    geojson_file.write("        \"geoid\": \"{0}\"\n".format(geoID))
-    geojson_file.write("      }\n")
-    geojson_file.write("    },\n")  ## Comment out if only output center or boundary
-
-  ## Boundary
-  geojson_file.write("    {\n      \"type\": \"Feature\",\n")
-  geojson_file.write("      \"geometry\": {\n")
-  geojson_file.write("        \"type\": \"Polygon\",\n")
-  geojson_file.write("        \"coordinates\": [[\n")
-  for i in xrange(0, numBinBound):
-    if (i != 0):
-      geojson_file.write(",\n")  ## Jan. 23, 2017
-    geojson_file.write("          [{0}, {1}]".format(lonClock[i], latClock[i]))
-  geojson_file.write("\n        ]]\n      },\n")
-  geojson_file.write("      \"properties\": {\n")
-  geojson_file.write("        \"geoid\": \"{0}\"\n".format(geoID))
-  geojson_file.write("      }\n")
-  return
-
-def writeFooterJsonGeo(geojson_file, recCnt):
-  if (recCnt == 0):
-    geojson_file.write("  }\n")
-  else:
-    geojson_file.write("    }\n")  ## Data for the previous one
-    geojson_file.write("  ]\n")
-  geojson_file.write("}\n")
-  return
-
-def writeHeaderJsonGeo(geojson_file, **kwargs):
-  firstFlag = 1
-  gotStColor = 0
-  gotStWeight = 0
-  gotStOpa = 0
-  gotFiColor = 0
-  gotFiOpa = 0
-  geojson_file.write("{\n  \"type\":\"FeatureCollection\",\n")
-  geojson_file.write("  \"defaultProperties\": {\n")
-  for key, value in kwargs.iteritems():
-    if (firstFlag != 1):
-      geojson_file.write(",\n")
-    if (type(kwargs[key]) == str):  ## Check value type of a key
-      geojson_file.write("    \"{0}\": \"{1}\"".format(key, value))
-    else:
-      geojson_file.write("    \"{0}\": {1}".format(key, value))
-    firstFlag = 0
-    if (key.lower() == "strokeColor".lower()):
-      gotStColor = 1
-    elif (key.lower() == "strokeWeight".lower()):
-      gotStWeight = 1
-    elif (key.lower() == "strokeOpacity".lower()):
-      gotStOpa = 1
-    elif (key.lower() == "fillColor".lower()):
-      gotFiColor = 1
-    elif (key.lower() == "fillOpacity".lower()):
-      gotFiOpa = 1
-  ## Output default properties if keys are not input
-  if (gotStColor == 0):    ## JS style
-    if (firstFlag != 1):
-      geojson_file.write(",\n")
-    geojson_file.write("    \"strokeColor\": \"{0}\"".format(strokeColorDef))
-    firstFlag = 0
-  if (gotStWeight == 0):
-    if (firstFlag != 1):
-      geojson_file.write(",\n")
-    geojson_file.write("    \"strokeWeight\": {0}".format(strokeWeightDef))
-    firstFlag = 0
-  if (gotStOpa == 0):
-    if (firstFlag != 1):
-      geojson_file.write(",\n")
-    geojson_file.write("    \"strokeOpacity\": {0}".format(strokeOpacityDef))
-    firstFlag = 0
-  if (gotFiColor == 0):
-    if (firstFlag != 1):
-      geojson_file.write(",\n")
-    geojson_file.write("    \"fillColor\": \"{0}\"".format(fillColorDef))
-    firstFlag = 0
-  if (gotFiOpa == 0):
-    if (firstFlag != 1):
-      geojson_file.write(",\n")
-    geojson_file.write("    \"fillOpacity\": {0}".format(fillOpacityDef))
-    firstFlag = 0
-  geojson_file.write("\n")
-  return
-
-def mkdirWChk(pathName):
-  retVal = 0
-  try:  ## Try to create folder first to prevent a common race condition
-    os.makedirs(pathName)
-  except OSError:
-    if not os.path.isdir(pathName):  ## os.path.exists() does not distinguish file and path
-      print "Cannot create path:" + pathName
-      retVal |= 32
-  return retVal
-
-def openFileWChk(pathName, fnameIn):
-  retVal = 0
-  fname = os.path.join(pathName, fnameIn)  ## os.sep
-  try:
-    out_file = open(fname, "w")
-  except IOError:
-    print "Cannot open file for write:" + fname
-    retVal |= 64
-  return retVal, out_file
-
-def openFileWMkdir(pathName, fnameIn):
-  retVal = 0
-  retVal = mkdirWChk(pathName)
-  if (retVal == 0):
-    retVal, out_file = openFileWChk(pathName, fnameIn)
-  return retVal, out_file
-
-def mifHeaderID(mif_file):
-  mif_file.write("Version 450\nCharset \"WindowsLatin1\"\nDelimiter \",\"\nCoordSys Earth Projection 1, 0\n")
-  mif_file.write("Columns 1\n  ID Char(60)\nData\n\n")
-  return
-
-def createBoundFile(pathName, bounFnamePre, numValInBound, llBound):
-  retVal = mkdirWChk(pathName)
-  midFname = bounFnamePre + ".mid"
-  mifFname = bounFnamePre + ".mif"
-  if (retVal == 0):
-    retVal, boundMid_file = openFileWChk(pathName, midFname)
-  if (retVal == 0):
-    retVal, boundMif_file = openFileWChk(pathName, mifFname)
-  if (retVal == 0):
-    boundMid_file.write("0\n")
-    mifHeaderID(boundMif_file)
-    numPt = int(math.floor(numValInBound / 2.0) + 1)
-    boundMif_file.write("Region 1\n  {0}\n".format(numPt))
-    for i in xrange(0, numValInBound, 2):
-      boundMif_file.write("{0} {1}\n".format(llBound[i], llBound[i+1]))
-    boundMif_file.write("{0} {1}\n".format(llBound[0], llBound[1]))
-    boundMif_file.write("  Pen (3,2,255)\n    Brush (1,0,255)\n")  ## Blue color outline
-    #boundMif_file.write("  Pen (3,2,65280)\n    Brush (1,0,16777215)\n")  ## Green color outline
-  boundMid_file.close()
-  boundMif_file.close()
-  return retVal
-
-def writeDataBinCenterGeo(outMid_file, outMif_file, geoID, centerLongi, centerLati):
-  outMid_file.write("{0}\n".format(geoID))
-  outMif_file.write("Point {0} {1}\n    Symbol(32,0,4)\n".format(centerLongi, centerLati))  ## SYMBOL (shape, color, size)
-  return
-
-def writeDataBinBoundGeo(outMid_file, outMif_file, geoID, numBinBound, lonClock, latClock):
-  outMid_file.write("{0}\n".format(geoID))
-  outMif_file.write("Region 1\n  {0}\n".format(numBinBound+1))
-  for i in xrange(0, numBinBound):
-    outMif_file.write("{0} {1}\n".format(lonClock[i], latClock[i]))
-  outMif_file.write("{0} {1}\n".format(lonClock[0], latClock[0]))
-  outMif_file.write("  Pen (3,2,16711680)\n    Brush (1,0,16777215)\n")  ## Red color outline
-  return
-
-def openMidMifFileWMkdirGeo(pathName):
-  retVal = mkdirWChk(pathName)
-  if (retVal == 0):
-    retVal, geoBinCenterMid_file = openFileWChk(pathName, "GeoBinCenter.mid")
-  if (retVal == 0):
-    retVal, geoBinCenterMif_file = openFileWChk(pathName, "GeoBinCenter.mif")
-  if (retVal == 0):
-    retVal, geoBinBoundMid_file = openFileWChk(pathName, "GeoBinBound.mid")
-  if (retVal == 0):
-    retVal, geoBinBoundMif_file = openFileWChk(pathName, "GeoBinBound.mif")
-  if (retVal == 0):
-    mifHeaderID(geoBinCenterMif_file) 
-    mifHeaderID(geoBinBoundMif_file)
-  return retVal, geoBinCenterMid_file, geoBinCenterMif_file, geoBinBoundMid_file, geoBinBoundMif_file
-
-def getBinsOneLLBoundChkPara(numValInBound, llBound, binSizeMeter, binType, pathName):
-  retVal = 0  ## Init.
-  if (numValInBound < 6):
-      retVal |= 1
-  if (len(llBound) < numValInBound):
-      retVal |= 2
-  if ((retVal & 2) != 2):
-    numValInBoundUse = numValInBound
-    if (len(llBound) < numValInBoundUse):
-      numValInBoundUse = len(llBound)
-    if ((numValInBoundUse % 2) == 1):  ## Odd
-      numValInBoundUse -= 1
-    for i in xrange(0, numValInBoundUse, 2):
-      if ((llBound[i] < -180.0) or (llBound[i] > 180.0)):  ## Longitude range
-        retVal |= 2
-      if ((llBound[i+1] < -90.0) or (llBound[i+1] > 90.0)):  ## Latitude range
-        retVal |= 2
-  if ((binSizeMeter < 1) or (binSizeMeter > 9999)):
-    retVal |= 4
-  if ((binType != 0) and (binType != 1)):
-    retVal |= 8
-  if (len(pathName) <= 0):
-    retVal |= 16
-  return retVal
-
-def writeDataJsonGeoObj(geoID, numValInBound, llBound, **kwargs):
-  data = {}
-  numBinInBound = int(numValInBound / 2)
-  data["type"] = "Feature"
-  data["geometry"] = {}  ## List
-  data["geometry"]["type"] = "Polygon"
-  #data["geometry"]["coordinates"] = [[[0] * 2] * numBinInBound]  ## Array; If used, end up same data
-  data["geometry"]["coordinates"] = [[[0 for x in xrange(2)] for y in xrange(numBinInBound)]]  ## Array
-  cnt = 0
-  for i in xrange(0, numValInBound, 2):
-    data["geometry"]["coordinates"][0][cnt][0] = llBound[i]
-    data["geometry"]["coordinates"][0][cnt][1] = llBound[i+1]
-    cnt += 1
-  data["properties"] = {}
-  data["properties"]["geoid"] = geoID
-
-  for key, value in kwargs.iteritems():
-    recordFlag = 1  ## Do not record if value of a key is same as default
-    if ((key.lower() == "strokeColor".lower()) and (value.lower() == strokeColorDef.lower())):
-      recordFlag = 0
-    elif ((key.lower() == "strokeWeight".lower()) and (value == strokeWeightDef)):
-      recordFlag = 0
-    elif ((key.lower() == "strokeOpacity".lower()) and (value == strokeOpacityDef)):
-      recordFlag = 0
-    elif ((key.lower() == "fillColorDef".lower()) and (value.lower() == fillColorDef.lower())):
-      recordFlag = 0
-    elif ((key.lower() == "fillOpacity".lower()) and (value == fillOpacityDef)):
-      recordFlag = 0
-    if (recordFlag == 1):
-      data["properties"][key] = value
-  return data
-
-def writeDataJsonGeoStr(geoID, numValInBound, llBound, **kwargs):
-  firstFlag = 1
-  data = "{\"type\":\"Feature\",\"geometry\":{\"type\":\"Polygon\",\"coordinates\":[["
-  for i in xrange(0, numValInBound, 2):
-    if (firstFlag != 1):
-      data = data + ","
-    data = data + "[{0},{1}]".format(llBound[i], llBound[i+1])
-    firstFlag = 0
-  data = data + "]]},\"properties\":{"
-  for key, value in kwargs.iteritems():
-    recordFlag = 1  ## Do not record if value of a key is same as default
-    if ((key.lower() == "strokeColor".lower()) and (value.lower() == strokeColorDef.lower())):
-      recordFlag = 0
-    elif ((key.lower() == "strokeWeight".lower()) and (value == strokeWeightDef)):
-      recordFlag = 0
-    elif ((key.lower() == "strokeOpacity".lower()) and (value == strokeOpacityDef)):
-      recordFlag = 0
-    elif ((key.lower() == "fillColorDef".lower()) and (value.lower() == fillColorDef.lower())):
-      recordFlag = 0
-    elif ((key.lower() == "fillOpacity".lower()) and (value == fillOpacityDef)):
-      recordFlag = 0
-    if (recordFlag == 1):
-      if (type(kwargs[key]) == str):
-        data = data + "\"{0}\":\"{1}\",".format(key, value)
-      else:
-        data = data + "\"{0}\":{1},".format(key, value)
-  data = data + "\"geoid\":\"{0}\"".format(geoID)
-  data = data + "}}"
-  return data
-
-def crossUTMZoneDetect(longiMin, longiMax):
-  crossZoneFlag = 0
-  zoneNumMin = int(math.floor((longiMin + 180.0) / 6) + 1)
-  zoneNumMax = int(math.floor((longiMax + 180.0) / 6) + 1)
-  if (zoneNumMin != zoneNumMax):
-    crossZoneFlag = 1
-  #print longiMin, longiMax, zoneNumMin, zoneNumMax, crossZoneFlag  ## Echo print
-  return crossZoneFlag, zoneNumMin, zoneNumMax
-
-def getDistHVFromBound(numValInRecBound, llRecBound, zoneNumForce):
-  utmBound = convertLLToUTMOneBound(numValInRecBound, llRecBound, zoneNumForce)  ## Convert llRecBound to UTM using the force UTM zone. ## Assume one UTM zone
-  utmRecBound = getRecFromBound(numValInRecBound, utmBound)  ## Jan. 25, 2017
-  distH, distV = getDistLLRecBound(llRecBound)  ## Get H and V distance from LL rectangular bound
-  distHFromUTM, distVFromUTM = getDistUTMRecBound(utmRecBound)  ## Jan. 25, 2017
-  #print "dist:", distH, distV, distHFromUTM, distVFromUTM  ## Echo print
-  if (distHFromUTM > distH):
-    distH = distHFromUTM
-  if (distVFromUTM > distV):
-    distV = distVFromUTM
-  return distH, distV
-
-def getBinsOneLLBoundSameZone(forceZoneFlag, crossZoneFlag, minNorthIn, distVIn, numValInBound, llBound, numValInRecBound, llRecBound, binSizeMeter, binType, zoneNumForce, geojson_file, geoBinBoundMid_file, geoBinBoundMif_file, geoBinCenterMid_file, geoBinCenterMif_file):
-  ## Input minNorthIn, distVIn to use lower northing and bigger distance when not force zone and crossZone
-  retValTemp, geoID, centerLongi, centerLati, zoneNumTemp = getGeoIDFromLL(llRecBound[0], llRecBound[1], binSizeMeter, binType)
-  minEast, minNorth, zoneNumTemp, latiBand = utm.from_latlon(centerLati, centerLongi, zoneNumForce)  ## Get minUTM bin center and get latiBand
-  #print minEast, minNorth, zoneNumTemp, latiBand, centerLati, centerLongi, zoneNumForce, geoID, zoneNumTemp  ## Echo print
-
-  firstFlag = 1  ## Init.
-  recCnt = 0
-
-  ## Setup stepSizeH, stepSizeV, numStepH, numStepV, offsetH, offsetV, xSeg, ySeg
-  distH, distV = getDistHVFromBound(numValInRecBound, llRecBound, zoneNumForce)
-  #print minNorthIn, distVIn, minNorth, distV  ## Echo print
-
-  if ((forceZoneFlag == 0) and (crossZoneFlag == 1)):
-    if ((minNorthIn >= 0.0) and (distVIn >= 0)):
-      if (minNorthIn < minNorth):
-        minNorth = minNorthIn
-      if (distV < distVIn):
-        distV = distVIn
-
-  offsetV = 0.0
-  if (binType == 0):
-    stepSizeH = binSizeMeter
-    stepSizeV = binSizeMeter
-    offsetH = binSizeMeter / 2.0
-    offsetV = binSizeMeter / 2.0
-  else:
-    stepSizeH = binSizeMeter / 4.0 * 3.0 * 2.0  ## Avoid duplicate geoID
-    stepSizeV = binSizeMeter / 2.0 * math.sin(math.pi / 3.0)
-    ySeg = stepSizeV
-    xSeg = binSizeMeter / 4.0
-    offsetH = xSeg * 3.0
-  numStepH = int(math.floor(distH / stepSizeH)) + 2  ## Jan. 25, 2017; 1->2; cross zone should not duplicate
-  numStepV = int(math.floor(distV / stepSizeV)) + 6  ## Jan. 25, 2017; 1->6
-
-  if (binType == 1):
-    xSegNum = int(math.floor(minEast/offsetH))  ## Move north location if even even or odd odd
-    ySegNum = int(math.floor(minNorth / ySeg))
-    xSegNumMod2 = xSegNum % 2
-    ySegNumMod2 = ySegNum % 2
-    if (ySegNumMod2 == 1):
-      minNorth -= stepSizeV  ## North always starts with even y
-    if (xSegNumMod2 == 1):
-      minEast -= offsetH   ## East always starts with odd x
-    #print minEast, minNorth, offsetH, ySeg, xSegNum, ySegNum  ## Echo print
-
-  startChkH = 0
-  endChkH = numStepH
-  if ((forceZoneFlag == 0) and (crossZoneFlag == 1)):  ## Jan. 25, 2017; Need to check some bin boundary to reduce overlapping bin plot when bins in different zones
-    startChkH = 10
-    endChkH = numStepH - 10  ## Start and end Horizontal 
-    if (endChkH < 0):
-      endChkH = 0
-
-  #print llRecBound, binType, distH, distV, stepSizeH, stepSizeV, numStepH, numStepV, offsetH, offsetV, xSeg, ySeg  ## Echo print
-
-  ## Step H bin by bin (avoid duplicate geoID), then V
-  ##   Check whether a boundary point inside polygon; If inside polygon, record result
-  curNorth = minNorth - stepSizeV  ## Init. northing
-  for j in xrange(0, numStepV):
-    curNorth += stepSizeV          ## Current northing
-    curEast = minEast - stepSizeH  ## Init. easting
-    if (binType == 1):
-      ySegNum = math.floor(curNorth / ySeg)
-      if ((ySegNum % 2) == 1):     ## Adjust starting easting (horizontal shift)
-        curEast += offsetH
-    for i in xrange(0, numStepH):
-      curEast += stepSizeH         ## Current easting
-      if (binType == 0):           ## Bin boundary in UTM
-        numBinBound = 4
-        eastingClock, northingClock = getBoundFromCenterSquare(offsetH, offsetV, curEast, curNorth)
-      else:
-        numBinBound = 6
-        eastingClock, northingClock = getBoundFromCenterHexagon(xSeg, ySeg, curEast, curNorth)
-      lonClock, latClock = getLLBoundFromUTMBound(numBinBound, eastingClock, northingClock, zoneNumForce, latiBand)  ## Bin boundary in LL; Jan. 25, 2017
-
-      inRegionFlag = 0
-      for k in xrange(0, numBinBound):  ## Inside region check; Any bin vertex in region?
-         #retValTemp, inRegionFlag = utmPtInRegion(eastingClock[k], northingClock[k], numValInBound, utmBound)  ## Region may distort
-         retValTemp, inRegionFlag = llPtInRegion(lonClock[k], latClock[k], numValInBound, llBound)  ## Jan. 25, 2017; Should use LL to check bin inside
-         if (inRegionFlag == 1):
-           break
-      #print j, i, inRegionFlag, numBinBound, eastingClock, northingClock  ## Echo print
-
-      if (inRegionFlag == 1):      ## Record geoID, center, and boundary, and output
-
-        if ((i > endChkH) or (i < startChkH)):  ## Check whether bin shall use next zone coordinates
-          if (binType == 0):
-            eastT, northT, zoneNumT, latiBandT = utm.from_latlon(latClock[2], lonClock[2])
-          else:
-            eastT, northT, zoneNumT, latiBandT = utm.from_latlon(latClock[3], lonClock[3])
-          if (zoneNumT != zoneNumForce):  ## zoneNum changed
-            continue
-
-        if ((forceZoneFlag == 1) and (crossZoneFlag == 1)):  ## Use unique GeoID and center
-          latiFromUTM, longiFromUTM = utm.to_latlon(curEast, curNorth, zoneNumForce, latiBand)
-          retValTemp, geoID, centerLongi, centerLati, zoneNumTemp = getGeoIDFromLL(longiFromUTM, latiFromUTM, binSizeMeter, binType)
-        else:
-          curEastUse = curEast
-          curNorthUse = curNorth
-          if (minNorthIn > 0):  ## zone number changed; May not need since curEast = curEastUse and curNorth = curNorthUse; Test/Debug
-            if (binType == 1):
-              curEastUse = eastingClock[0] + 2.0 * xSeg
-              curNorthUse = northingClock[0]
-
-          geoID, centerLongi, centerLati = getGeoIDFromUTM(curEastUse, curNorthUse, binSizeMeter, binType, zoneNumForce, latiBand)
-          #geoID, centerLongi, centerLati = getGeoIDFromUTM(curEast, curNorth, binSizeMeter, binType, zoneNumForce, latiBand)
-
-        #print "getBinsOneLLBoundSameZone():", j, i, minEast, minNorth, curEast, curNorth, curEastUse, curNorthUse, xSeg, ySeg, numBinBound, eastingClock, northingClock, zoneNumForce, latiBand, geoID, centerLongi, centerLati  ## Echo print
-
-        ## Output
-        writeDataJsonGeo(geojson_file, firstFlag, geoID, centerLongi, centerLati, numBinBound, lonClock, latClock)
-        writeDataBinCenterGeo(geoBinCenterMid_file, geoBinCenterMif_file, geoID, centerLongi, centerLati)
-        writeDataBinBoundGeo(geoBinBoundMid_file, geoBinBoundMif_file, geoID, numBinBound, lonClock, latClock)
-        firstFlag = 0
-        recCnt += 1
-
-        #print j, i, curEast, curNorth, geoID, centerLongi, centerLati  ## Echo print
-        #print numBinBound, lonClock, latClock  ## Echo print
-      #if (i >= 10):  ## Test/Debug
-      #  break
-    #if (j >= 2):  ## Test/Debug
-    #  break
-
-  return recCnt, minNorth, distV
-
-##-------------------- Export functions -----
-def getBinGeoJSONFromGeoID(geoID, **kwargs):
-  retStrFlag = 1
-  retVal = 0  ## Init.
-  #data = {}  ## Uncomment this if retStrFlag == 0
-  data = ""   ## Uncomment this if retStrFlag == 1
-  centerLongi = 0.0
-  centerLati = 0.0
-  binSizeMeter = 0
-  binType = 0
-  numValInBound = 0
-  llBound = [0,1,2,3,4,5,6,7,8,9,10,11]
-
-  retVal, numValInBound, llBound, centerLongi, centerLati, binSizeMeter, binType = getLLFromGeoID(geoID)
-  if (retVal == 0):
-    if (retStrFlag == 1):
-      data = writeDataJsonGeoStr(geoID, numValInBound, llBound, **kwargs)
-    else:
-      data = writeDataJsonGeoObj(geoID, numValInBound, llBound, **kwargs)
-    #print llBound, data  ## Echo print
-  return retVal, data
-
-def getBinsOneLLBound(numValInBound, llBound, binSizeMeter, binType, pathName, zoneNum = -1, **kwargs):  ## kwargs is a dictionary: for k,v in kwargs.iteritems():
-  ## Verify json format: $ python -m json.tool GeoBin.json
-  ## http://www.saltycrane.com/blog/2008/01/how-to-use-args-and-kwargs-in-python/: for key in kwargs: print "another keyword arg: %s: %s" % (key, kwargs[key])
-  retVal = getBinsOneLLBoundChkPara(numValInBound, llBound, binSizeMeter, binType, pathName)  ## Check input parameters
-  if (retVal == 0):  ## May cross zone
-
-    ## Prepare output files; Write file header
-    retVal, geojson_file = openFileWMkdir(pathName, "GeoBin.json")
-    if (retVal == 0):
-      writeHeaderJsonGeo(geojson_file, **kwargs)
-    if (retVal == 0):
-      createBoundFile(pathName, "GeoBound", numValInBound, llBound)  ## Uncomment if need GeoBound mid/mif
-    retValT, geoBinCenterMid_file, geoBinCenterMif_file, geoBinBoundMid_file, geoBinBoundMif_file = openMidMifFileWMkdirGeo(pathName)    ## Uncomment if need GeoBinBound mid/mif
-    if ((retVal == 0) and (retValT != 0)):
-      retVal = retValT
-
-    if (retVal == 0):
-      forceZoneFlag = 0  ## 1 for force zone if zoneNum < 1; 0 for auto-detect dynamically
-
-      ## Get rectangular boundary from llBound; use minLL as force UTM zone and get minLL bin center.
-      llRecBound = getRecFromBound(numValInBound, llBound)
-      numValInRecBound = 8
-      #print numValInRecBound, llRecBound  ## Echo print
-
-      llRecBoundUse = [0] * 8
-      for i in xrange(0, numValInRecBound):  ## Init.
-        llRecBoundUse[i] = llRecBound[i]
-
-      ## Write a function and call one zone by one zone
-      crossZoneFlag, zoneNumMin, zoneNumMax = crossUTMZoneDetect(llRecBound[0], llRecBound[6])  ## Cross zone detection
-      if ((zoneNum >= 1) and (zoneNum <= 60)):  ## Input zoneNum valid
-        forceZoneFlag = 1
-        zoneNumMin = zoneNum
-        zoneNumMax = zoneNum
-      if (forceZoneFlag == 1):
-        zoneNumMax = zoneNumMin
-
-      recCnt = 0
-      minNorth = -1.0
-      distV = -1.0
-      for zoneNumUse in xrange(zoneNumMin, zoneNumMax + 1):
-        if (zoneNumMin != zoneNumMax):  ## Need to replace some parts in llRecBoundUse
-          if (zoneNumUse != zoneNumMax):
-            llRecBoundUse[4] = llRecBoundUse[6] = -180.0 + zoneNumUse * 6.0
-          else:
-            llRecBoundUse[4] = llRecBoundUse[6] = llRecBound[4]
-          if (zoneNumUse != zoneNumMin):
-            llRecBoundUse[0] = llRecBoundUse[2] = -180.0 + (zoneNumUse - 1) * 6.0
-          else:
-            llRecBoundUse[0] = llRecBoundUse[2] = llRecBound[0]
-        minNorthIn = minNorth
-        distVIn = distV
-        recCnt, minNorth, distV = getBinsOneLLBoundSameZone(forceZoneFlag, crossZoneFlag, minNorthIn, distVIn, numValInBound, llBound, numValInRecBound, llRecBoundUse, binSizeMeter, binType, zoneNumUse, geojson_file, geoBinBoundMid_file, geoBinBoundMif_file, geoBinCenterMid_file, geoBinCenterMif_file)
-      
-      writeFooterJsonGeo(geojson_file, recCnt)
-      geoBinCenterMid_file.close()
-      geoBinCenterMif_file.close()
-      geoBinBoundMid_file.close()
-      geoBinBoundMif_file.close()
-      geojson_file.close()
-  if (retVal > 0):
-    retVal *= -1
-  return retVal
-
-##-------------------- Test -----
-## Function test
-retVal = 0
-numValInBound = 8
-llBound = [-122.51593,37.75312,-122.4993,37.78031,-122.432803,37.795259,-122.44142,37.752214]  ## in region; small region
-#llBound = [-122.51593,37.75312,-122.4993,37.78031,-118.432803,37.795259,-118.44142,37.752214]  ## in region; for test cross zone region
-binSizeMeter = 100
-binType = 1  ## Hexagon
-#binType = 0  ## Square
-pathName = 'C:\\Users\\wyang.TTSWIRELESS\\Desktop\\MyProjects\\Python\\MyProjects\\GeoID'  ## Path to store GeoBin.json
-geoID = '00000000001010010S0000000725200000096535'
-
-## Calling function
-args = {"strokeColor": "#FF0000", "binSize": 100}
-#retVal = getBinsOneLLBound(numValInBound, llBound, binSizeMeter, binType, pathName, -1, **args)  ## Example for using **args
-#retVal = getBinsOneLLBound(numValInBound, llBound, binSizeMeter, binType, pathName)
-print 'getBinsOneLLBound():', retVal, ':', numValInBound, llBound, binSizeMeter, binType, pathName  ## Echo print
-
-#data = {}  ## Return JSON object; Uncomment this if retStrFlag == 0 
-data = ""   ## Return string; Uncomment this if retStrFlag == 1
-retVal, data = getBinGeoJSONFromGeoID(geoID, **args)  ## Return string object by default; can return JSON object
-print 'getBinGeoJSONFromGeoID():', retVal, data, ':', geoID  ## Echo print
-#print  data["geometry"]["coordinates"][0][1][0], data["geometry"]["coordinates"][0][1][1]  ## Echo print for returning JSON Object
-
-## Load JSON file test
-#with open('..\\GeoBinSample.json') as infile:
-  #jsonData = json.load(infile)
-  #print jsonData
-  #print jsonData['features'][0]['geometry']['coordinates']
+## getBinsInRegions.py
+##
+## Need to install numpy: pip install numpy
+##
+## Input argument: None
+## Test run: python getBinsInRegions.py
+##
+## Fuctions:
+## getBinsOneLLBound(numValInBound, llBound, binSizeMeter, binType, pathName, zoneNum = -1, coverMode = 0, numWorker = 1, outFormats = outFormatsDef, **kwargs)
+##   Input: numValInBound, llBound, binSizeMeter, binType, pathName, optional
+##          zoneNum, optional coverMode, optional number of worker processes,
+##          optional output formats, optional key value pairs for properties
+##   Return: negative bit 0: invalid numValInBound
+##           negative bit 1: invalid llBound
+##           negative bit 2: invalid bin size
+##           negative bit 3: invalid bin type
+##           negative bit 4: invalid pathName
+##           negative bit 5: path cannot be created
+##           negative bit 6: file cannot be created
+##           negative bit 7: unknown output format
+##           negative bit 8: invalid coverMode (not 0, 1 or 2)
+##           0: successful
+##   Note: Generate a geoJSON file: GeoBin.json.
+##   Note: outFormats: any subset (name or sequence of names) of
+##           "geojson": GeoBin.json
+##           "geojsonseq": GeoBin.geojsonl (newline-delimited GeoJSON; one
+##             feature per line with kwargs as properties)
+##           "midmifcenter": GeoBinCenter.mid/mif
+##           "midmifbound": GeoBinBound.mid/mif
+##           "geobound": GeoBound.mid/mif (input region)
+##           "columnar": GeoBinCols.json manifest (bin size, type, zones,
+##             properties, array files) and raw little-endian arrays:
+##             packed GeoIDs (int64; -1 if out of packing range), center
+##             longitudes and latitudes (float64), vertices (float64;
+##             numBin x 4 or 6 x [longitude, latitude]); see loadBinsColumnar()
+##         Default: all but "geojsonseq" and "columnar". Bins are formatted
+##         in batches of outBatchSize and written at once into large file
+##         buffers.
+##   Note: Typically, zoneNum should be set to -1 in order to detect zone
+##         number automatically from latitude and longitude.
+##   Note: If kwargs is not provided, default GeoJSON properties will be used.
+##   Note: llBound can be a list or a PreparedRegion (ptinregion.py); a list
+##         is prepared once per call.
+##   Note: coverMode 0: lattice; every bin of the bounding rectangle is
+##           projected and checked with llPtInRegion() (default). A vertex
+##           shared by neighboring bins is projected and checked once.
+##         coverMode 1: scanline; the region is projected into the zone once
+##           and bins are found from edge crossings per lattice row; only
+##           bins near the boundary are checked with llPtInRegion(). Same
+##           bins and output as coverMode 0, much faster for long, thin
+##           regions.
+##         coverMode 2: scanline with interior/boundary classification;
+##           same bins as coverMode 1. Bins with no region edge near their
+##           box (from the edge intervals of the row) are interior
+##           (coverFraction 1.0); the others are clipped against the
+##           nearby region edges in UTM for the area fraction in region,
+##           so clipping cost grows with the perimeter, not the area.
+##           GeoJSON features get properties cover ("interior" or
+##           "boundary") and coverFraction; "columnar" adds interiorFlags
+##           and coverFractions arrays (see loadBinsColumnarCover()).
+##   Note: numWorker > 1 (or < 1 for one per CPU): each zone lattice is split
+##         into northing strips (even number of hexagon rows, so every strip
+##         starts on an even y row) binned on a multiprocessing pool; strips
+##         are merged in order, so output is identical to numWorker 1.
+##         Strips hold at most maxCellInStrip lattice cells and at most 2
+##         per worker are in flight, so memory does not grow with the region.
+##         On Windows, call it under if __name__ == '__main__'.
+## getBinsOneLLBoundWStats(numValInBound, llBound, binSizeMeter, binType, pathName, zoneNum = -1, coverMode = 0, numWorker = 1, outFormats = outFormatsDef, stats = None, **kwargs)
+##   Input: same as getBinsOneLLBound(), plus optional stats (BinStats of
+##          binstats.py, e.g. with a callback; None: a new one)
+##   Output: stats (counts per zone and totals; bytes written per file)
+##   Return: same bits as getBinsOneLLBound()
+##   Note: Same output files as getBinsOneLLBound(). Without stats, the hot
+##         paths only test for None (no counting).
+## loadBinsColumnar(pathName)
+##   Input: pathName of a "columnar" output of getBinsOneLLBound()
+##   Output: manifest (dictionary), geoInts, centerLongis, centerLatis,
+##           vertices (read only numpy.memmap; no copy)
+##   Return: negative bit 0: manifest cannot be read
+##           negative bit 1: array file missing or of wrong size
+##           0: successful
+## loadBinsColumnarCover(pathName)
+##   Input: pathName of a "columnar" output of coverMode 2
+##   Output: interiorFlags (int8; 1: interior, 0: boundary), coverFractions
+##           (float64); same order as loadBinsColumnar()
+##   Return: same bits as loadBinsColumnar() (bit 1 also if not coverMode 2)
+## iterBinsInRegion(numValInBound, llBound, binSizeMeter, binType, zoneNum = -1, coverMode = 0, numWorker = 1)
+##   Input: numValInBound, llBound, binSizeMeter, binType, optional zoneNum,
+##          optional coverMode, optional numWorker (same as getBinsOneLLBound())
+##   Output: generator of BinRecord (geoID, centerLongi, centerLati,
+##           numBinBound, lonClock, latClock); coverMode 2: BinCoverRecord
+##           (same fields plus interiorFlag, coverFraction)
+##     Note: Same bins, order and zone handling as getBinsOneLLBound(),
+##           which writes its files from this generator; no file output.
+##     Note: Bins are found lazily; memory does not grow with the number
+##           of bins.
+##     Note: Raise ValueError on invalid input (getBinsOneLLBound() bits 0 ~ 3 and 8).
+## iterBinsInRegions(regions, binSizeMeter, binType, zoneNum = -1)
+##   Input: regions (list of (regionId, numValInBound, llBound)), binSizeMeter,
+##          binType, optional zoneNum (same as getBinsOneLLBound())
+##   Output: generator of (regionId, BinRecord); a bin in several regions is
+##           reported once per region
+##     Note: Regions on the same lattice (zone, latiBand and lattice offset)
+##           are covered in one pass: every bin vertex is projected once and
+##           checked only against regions whose UTM rectangle holds the bin.
+##     Note: Same bins per region as iterBinsInRegion(); regions crossing
+##           zones (zoneNum not set) keep their own zone by zone pass.
+##     Note: Raise ValueError on invalid input of any region.
+## getBinsLLBounds(regions, binSizeMeter, binType, pathName, zoneNum = -1, outFormats = ("geojson",), **kwargs)
+##   Input: regions (list of (regionId, numValInBound, llBound)), binSizeMeter,
+##          binType, pathName, optional zoneNum, optional output formats
+##          (same as getBinsOneLLBound() except "geobound"), optional key
+##          value pairs for properties
+##   Return: same bits as getBinsOneLLBound()
+##   Note: Generate the outFormats files (one feature per region and bin,
+##         GeoJSON with property regionId) and GeoBinRegion.csv
+##         (regionId,geoID), written in batches.
+## getBinGeoJSONFromGeoID(geoID, **kwargs)
+##   Input: geoID (string or packed integer), optional key value pairs for properties
+##   Output: data (GeoJSON in plain string format)
+##   Return: negative bit 0: invalid geoID length
+##           negative bit 1: invalid geoID binType
+##           negative bit 2: invalid geoID binSize
+##           negative bit 3: invalid geoID zoneNum
+##           negative bit 4: invalid geoID zoneLetter
+##           0: successful
+##   Note: If kwargs is not provided, default GeoJSON properties will be used.
+##
+
+import math, sys, os, errno, itertools, json
+from collections import namedtuple, deque
+import numpy as np
+import utmproj, binstats
+from geoidutm import getGeoIDFromLL, getGeoIDFromUTM, getLLFromGeoID, getBoundFromCenterSquare, getBoundFromCenterHexagon, isGeoInt, intToGeoID, geoIDsToInts
+from ptinregion import utmPtInRegion, llPtInRegion, PreparedRegion
+from regionscan import ZoneScanRegion, llsToZoneUTM
+#import json
+
+## Bin record of iterBinsInRegion(); lonClock, latClock: bin vertices (clockwise)
+BinRecord = namedtuple("BinRecord", ["geoID", "centerLongi", "centerLati", "numBinBound", "lonClock", "latClock"])
+## Bin record of coverMode 2; interiorFlag 1: bin inside region, 0: boundary bin; coverFraction: area fraction in region
+BinCoverRecord = namedtuple("BinCoverRecord", BinRecord._fields + ("interiorFlag", "coverFraction"))
+
+## Global variables (default values)
+strokeColorDef = "#000000"
+strokeWeightDef = 1
+strokeOpacityDef = 1
+fillColorDef = "#FFFFFF"
+fillOpacityDef = 0.3
+
+## Function
+def dist2LL(lon1, lat1, lon2, lat2):
+    ## Haversine formula for distance between 2 LLs
+    radius = 6371 # km
+    dlat = math.radians(lat2-lat1)
+    dlon = math.radians(lon2-lon1)
+    a = math.sin(dlat/2) * math.sin(dlat/2) + math.cos(math.radians(lat1)) \
+        * math.cos(math.radians(lat2)) * math.sin(dlon/2) * math.sin(dlon/2)
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    dist = radius * c
+    return dist
+
+def getRecFromBound(numValInBound, bound):
+  ## Get rectangular boundary from a polygon; X0, Y0, X1, Y1, ...
+  recBound = [0,1,2,3,4,5,6,7]
+  minX = minY = maxX = maxY = 0.0
+  for i in xrange(0, numValInBound, 2):
+    if (i == 0):
+      minX = maxX = bound[i]
+      minY = maxY = bound[i+1]
+    else:
+      if (minX > bound[i]):
+        minX = bound[i]
+      if (minY > bound[i+1]):
+        minY = bound[i+1]
+      if (maxX < bound[i]):
+        maxX = bound[i]
+      if (maxY < bound[i+1]):
+        maxY = bound[i+1]
+  recBound[0] = recBound[2] = minX
+  recBound[1] = recBound[7] = minY
+  recBound[3] = recBound[5] = maxY
+  recBound[4] = recBound[6] = maxX
+  return recBound
+
+def convertLLToUTMOneBound(numValInBound, llBound, zoneNumForce = -1):
+  utmBound = [0] * numValInBound
+  zoneNum = 0
+  zoneNumUse = zoneNumForce
+  for i in xrange(0, numValInBound, 2):
+    if ((zoneNumUse <= 0) or (zoneNumUse > 60)):
+      utmBound[i], utmBound[i+1], zoneNum, latiBand = utmproj.from_latlon(llBound[i+1], llBound[i])
+    else:
+      utmBound[i], utmBound[i+1], zoneNum, latiBand = utmproj.from_latlon(llBound[i+1], llBound[i], zoneNumUse)
+    zoneNumUse = zoneNum
+  return utmBound
+
+def convertUTMToLLOneBound(numValInBound, utmBound, zoneNum, latiBand):
+  llBoundFromUTM = [0] * numValInBound
+  for i in xrange(0, numValInBound, 2):
+    llBoundFromUTM[i+1], llBoundFromUTM[i] = utmproj.to_latlon(utmBound[i], utmBound[i+1], zoneNum, latiBand)
+  return llBoundFromUTM
+
+def getDistLLRecBound(llRecBound):
+  distH1 = dist2LL(llRecBound[0], llRecBound[1], llRecBound[6], llRecBound[7])
+  distH2 = dist2LL(llRecBound[2], llRecBound[3], llRecBound[4], llRecBound[5])
+  distH = distH1
+  if (distH < distH2):
+    distH = distH2
+  distH *= 1000.0;  ## Meters
+  distV1 = dist2LL(llRecBound[0], llRecBound[1], llRecBound[2], llRecBound[3])
+  distV2 = dist2LL(llRecBound[4], llRecBound[5], llRecBound[6], llRecBound[7])
+  distV = distV1
+  if (distV < distV2):
+    distV = distV2
+  distV *= 1000.0;  ## Meters
+  return distH, distV
+
+def getDistUTMRecBound(utmRecBound):
+  distH = utmRecBound[6] - utmRecBound[0]
+  distV = utmRecBound[3] - utmRecBound[1]
+  return distH, distV
+
+def getDataJsonGeoStr(firstFlag, geoID, centerLongi, centerLati, numBinBound, lonClock, latClock, **kwargs):  ## kwargs: properties before geoid
+  ## Text of one bin of GeoBin.json; the previous bin is closed here
+  binCenterFlag = 0
+  data = []
+  if (firstFlag == 1):
+    data.append("  },\n  \"features\": [\n")  ## Data for the previous one
+    #data.append("  \"features\": [\n")  ## Data for the previous one; uncomment if no default properties
+  else:
+    data.append("    },\n")  ## Data for the previous one
+
+  ## Center; do not output; Jan. 23, 2017
+  if (binCenterFlag == 1):
+    data.append("    {\n      \"type\": \"Feature\",\n")
+    data.append("      \"geometry\": {\n")
+    data.append("        \"type\": \"Point\",\n        \"coordinates\": [{0}, {1}]\n".format(centerLongi, centerLati))
+    data.append("      },\n")
+    data.append("      \"properties\": {\n")
+    data.append("        \"geoid\": \"{0}\"\n".format(geoID))
+    data.append("      }\n")
+    data.append("    },\n")  ## Comment out if only output center or boundary
+
+  ## Boundary
+  data.append("    {\n      \"type\": \"Feature\",\n")
+  data.append("      \"geometry\": {\n")
+  data.append("        \"type\": \"Polygon\",\n")
+  data.append("        \"coordinates\": [[\n")
+  data.append(",\n".join(["          [{0}, {1}]".format(lonClock[i], latClock[i]) for i in xrange(0, numBinBound)]))  ## Jan. 23, 2017
+  data.append("\n        ]]\n      },\n")
+  data.append("      \"properties\": {\n")
+  for key, value in kwargs.iteritems():
+    if (type(value) == str):
+      data.append("        \"{0}\": \"{1}\",\n".format(key, value))
+    else:
+      data.append("        \"{0}\": {1},\n".format(key, value))
+  data.append("        \"geoid\": \"{0}\"\n".format(geoID))
+  data.append("      }\n")
+  return "".join(data)
+
+def writeDataJsonGeo(geojson_file, firstFlag, geoID, centerLongi, centerLati, numBinBound, lonClock, latClock, **kwargs):  ## kwargs: properties before geoid
+  geojson_file.write(getDataJsonGeoStr(firstFlag, geoID, centerLongi, centerLati, numBinBound, lonClock, latClock, **kwargs))
+  return
+
+def writeFooterJsonGeo(geojson_file, recCnt):
+  if (recCnt == 0):
+    geojson_file.write("  }\n")
+  else:
+    geojson_file.write("    }\n")  ## Data for the previous one
+    geojson_file.write("  ]\n")
+  geojson_file.write("}\n")
+  return
+
+def writeHeaderJsonGeo(geojson_file, **kwargs):
+  firstFlag = 1
+  gotStColor = 0
+  gotStWeight = 0
+  gotStOpa = 0
+  gotFiColor = 0
+  gotFiOpa = 0
+  geojson_file.write("{\n  \"type\":\"FeatureCollection\",\n")
+  geojson_file.write("  \"defaultProperties\": {\n")
+  for key, value in kwargs.iteritems():
+    if (firstFlag != 1):
+      geojson_file.write(",\n")
+    if (type(kwargs[key]) == str):  ## Check value type of a key
+      geojson_file.write("    \"{0}\": \"{1}\"".format(key, value))
+    else:
+      geojson_file.write("    \"{0}\": {1}".format(key, value))
+    firstFlag = 0
+    if (key.lower() == "strokeColor".lower()):
+      gotStColor = 1
+    elif (key.lower() == "strokeWeight".lower()):
+      gotStWeight = 1
+    elif (key.lower() == "strokeOpacity".lower()):
+      gotStOpa = 1
+    elif (key.lower() == "fillColor".lower()):
+      gotFiColor = 1
+    elif (key.lower() == "fillOpacity".lower()):
+      gotFiOpa = 1
+  ## Output default properties if keys are not input
+  if (gotStColor == 0):    ## JS style
+    if (firstFlag != 1):
+      geojson_file.write(",\n")
+    geojson_file.write("    \"strokeColor\": \"{0}\"".format(strokeColorDef))
+    firstFlag = 0
+  if (gotStWeight == 0):
+    if (firstFlag != 1):
+      geojson_file.write(",\n")
+    geojson_file.write("    \"strokeWeight\": {0}".format(strokeWeightDef))
+    firstFlag = 0
+  if (gotStOpa == 0):
+    if (firstFlag != 1):
+      geojson_file.write(",\n")
+    geojson_file.write("    \"strokeOpacity\": {0}".format(strokeOpacityDef))
+    firstFlag = 0
+  if (gotFiColor == 0):
+    if (firstFlag != 1):
+      geojson_file.write(",\n")
+    geojson_file.write("    \"fillColor\": \"{0}\"".format(fillColorDef))
+    firstFlag = 0
+  if (gotFiOpa == 0):
+    if (firstFlag != 1):
+      geojson_file.write(",\n")
+    geojson_file.write("    \"fillOpacity\": {0}".format(fillOpacityDef))
+    firstFlag = 0
+  geojson_file.write("\n")
+  return
+
+def mkdirWChk(pathName):
+  retVal = 0
+  try:  ## Try to create folder first to prevent a common race condition
+    os.makedirs(pathName)
+  except OSError:
+    if not os.path.isdir(pathName):  ## os.path.exists() does not distinguish file and path
+      print "Cannot create path:" + pathName
+      retVal |= 32
+  return retVal
+
+def openFileWChk(pathName, fnameIn, bufSize = -1, mode = "w"):  ## bufSize: -1 system default; mode "wb" for binary files
+  retVal = 0
+  out_file = None
+  fname = os.path.join(pathName, fnameIn)  ## os.sep
+  try:
+    out_file = open(fname, mode, bufSize)
+  except IOError:
+    print "Cannot open file for write:" + fname
+    retVal |= 64
+  return retVal, out_file
+
+def openFileWMkdir(pathName, fnameIn, bufSize = -1):
+  retVal = 0
+  out_file = None
+  retVal = mkdirWChk(pathName)
+  if (retVal == 0):
+    retVal, out_file = openFileWChk(pathName, fnameIn, bufSize)
+  return retVal, out_file
+
+def mifHeaderID(mif_file):
+  mif_file.write("Version 450\nCharset \"WindowsLatin1\"\nDelimiter \",\"\nCoordSys Earth Projection 1, 0\n")
+  mif_file.write("Columns 1\n  ID Char(60)\nData\n\n")
+  return
+
+def createBoundFile(pathName, bounFnamePre, numValInBound, llBound):
+  retVal = mkdirWChk(pathName)
+  midFname = bounFnamePre + ".mid"
+  mifFname = bounFnamePre + ".mif"
+  boundMid_file = boundMif_file = None
+  if (retVal == 0):
+    retVal, boundMid_file = openFileWChk(pathName, midFname)
+  if (retVal == 0):
+    retVal, boundMif_file = openFileWChk(pathName, mifFname)
+  if (retVal == 0):
+    boundMid_file.write("0\n")
+    mifHeaderID(boundMif_file)
+    numPt = int(math.floor(numValInBound / 2.0) + 1)
+    boundMif_file.write("Region 1\n  {0}\n".format(numPt))
+    for i in xrange(0, numValInBound, 2):
+      boundMif_file.write("{0} {1}\n".format(llBound[i], llBound[i+1]))
+    boundMif_file.write("{0} {1}\n".format(llBound[0], llBound[1]))
+    boundMif_file.write("  Pen (3,2,255)\n    Brush (1,0,255)\n")  ## Blue color outline
+    #boundMif_file.write("  Pen (3,2,65280)\n    Brush (1,0,16777215)\n")  ## Green color outline
+  for out_file in (boundMid_file, boundMif_file):
+    if (out_file is not None):
+      out_file.close()
+  return retVal
+
+def getDataBinCenterMifStr(centerLongi, centerLati):
+  return "Point {0} {1}\n    Symbol(32,0,4)\n".format(centerLongi, centerLati)  ## SYMBOL (shape, color, size)
+
+def getDataBinBoundMifStr(numBinBound, lonClock, latClock):
+  data = ["Region 1\n  {0}\n".format(numBinBound+1)]
+  for i in xrange(0, numBinBound):
+    data.append("{0} {1}\n".format(lonClock[i], latClock[i]))
+  data.append("{0} {1}\n".format(lonClock[0], latClock[0]))
+  data.append("  Pen (3,2,16711680)\n    Brush (1,0,16777215)\n")  ## Red color outline
+  return "".join(data)
+
+def writeDataBinCenterGeo(outMid_file, outMif_file, geoID, centerLongi, centerLati):
+  outMid_file.write("{0}\n".format(geoID))
+  outMif_file.write(getDataBinCenterMifStr(centerLongi, centerLati))
+  return
+
+def writeDataBinBoundGeo(outMid_file, outMif_file, geoID, numBinBound, lonClock, latClock):
+  outMid_file.write("{0}\n".format(geoID))
+  outMif_file.write(getDataBinBoundMifStr(numBinBound, lonClock, latClock))
+  return
+
+def openMidMifFileWMkdirGeo(pathName):
+  retVal = mkdirWChk(pathName)
+  if (retVal == 0):
+    retVal, geoBinCenterMid_file = openFileWChk(pathName, "GeoBinCenter.mid")
+  if (retVal == 0):
+    retVal, geoBinCenterMif_file = openFileWChk(pathName, "GeoBinCenter.mif")
+  if (retVal == 0):
+    retVal, geoBinBoundMid_file = openFileWChk(pathName, "GeoBinBound.mid")
+  if (retVal == 0):
+    retVal, geoBinBoundMif_file = openFileWChk(pathName, "GeoBinBound.mif")
+  if (retVal == 0):
+    mifHeaderID(geoBinCenterMif_file) 
+    mifHeaderID(geoBinBoundMif_file)
+  return retVal, geoBinCenterMid_file, geoBinCenterMif_file, geoBinBoundMid_file, geoBinBoundMif_file
+
+def getBinsInRegionChkPara(numValInBound, llBound, binSizeMeter, binType, coverMode = 0):
+  retVal = 0  ## Init.
+  if (numValInBound < 6):
+      retVal |= 1
+  if (len(llBound) < numValInBound):
+      retVal |= 2
+  if ((retVal & 2) != 2):
+    numValInBoundUse = numValInBound
+    if (len(llBound) < numValInBoundUse):
+      numValInBoundUse = len(llBound)
+    if ((numValInBoundUse % 2) == 1):  ## Odd
+      numValInBoundUse -= 1
+    for i in xrange(0, numValInBoundUse, 2):
+      if ((llBound[i] < -180.0) or (llBound[i] > 180.0)):  ## Longitude range
+        retVal |= 2
+      if ((llBound[i+1] < -90.0) or (llBound[i+1] > 90.0)):  ## Latitude range
+        retVal |= 2
+  if ((binSizeMeter < 1) or (binSizeMeter > 9999)):
+    retVal |= 4
+  if ((binType != 0) and (binType != 1)):
+    retVal |= 8
+  if (coverMode not in (0, 1, 2)):
+    retVal |= 256
+  return retVal
+
+def getBinsOneLLBoundChkPara(numValInBound, llBound, binSizeMeter, binType, pathName, coverMode = 0):
+  retVal = getBinsInRegionChkPara(numValInBound, llBound, binSizeMeter, binType, coverMode)
+  if (len(pathName) <= 0):
+    retVal |= 16
+  return retVal
+
+def writeDataJsonGeoObj(geoID, numValInBound, llBound, **kwargs):
+  data = {}
+  numBinInBound = int(numValInBound / 2)
+  data["type"] = "Feature"
+  data["geometry"] = {}  ## List
+  data["geometry"]["type"] = "Polygon"
+  #data["geometry"]["coordinates"] = [[[0] * 2] * numBinInBound]  ## Array; If used, end up same data
+  data["geometry"]["coordinates"] = [[[0 for x in xrange(2)] for y in xrange(numBinInBound)]]  ## Array
+  cnt = 0
+  for i in xrange(0, numValInBound, 2):
+    data["geometry"]["coordinates"][0][cnt][0] = llBound[i]
+    data["geometry"]["coordinates"][0][cnt][1] = llBound[i+1]
+    cnt += 1
+  data["properties"] = {}
+  data["properties"]["geoid"] = geoID
+
+  for key, value in kwargs.iteritems():
+    recordFlag = 1  ## Do not record if value of a key is same as default
+    if ((key.lower() == "strokeColor".lower()) and (value.lower() == strokeColorDef.lower())):
+      recordFlag = 0
+    elif ((key.lower() == "strokeWeight".lower()) and (value == strokeWeightDef)):
+      recordFlag = 0
+    elif ((key.lower() == "strokeOpacity".lower()) and (value == strokeOpacityDef)):
+      recordFlag = 0
+    elif ((key.lower() == "fillColorDef".lower()) and (value.lower() == fillColorDef.lower())):
+      recordFlag = 0
+    elif ((key.lower() == "fillOpacity".lower()) and (value == fillOpacityDef)):
+      recordFlag = 0
+    if (recordFlag == 1):
+      data["properties"][key] = value
+  return data
+
+def getPropsJsonGeoStr(**kwargs):
+  ## Properties of writeDataJsonGeoStr() before geoid; default values are not recorded
+  data = []
+  for key, value in kwargs.iteritems():
+    recordFlag = 1  ## Do not record if value of a key is same as default
+    if ((key.lower() == "strokeColor".lower()) and (value.lower() == strokeColorDef.lower())):
+      recordFlag = 0
+    elif ((key.lower() == "strokeWeight".lower()) and (value == strokeWeightDef)):
+      recordFlag = 0
+    elif ((key.lower() == "strokeOpacity".lower()) and (value == strokeOpacityDef)):
+      recordFlag = 0
+    elif ((key.lower() == "fillColorDef".lower()) and (value.lower() == fillColorDef.lower())):
+      recordFlag = 0
+    elif ((key.lower() == "fillOpacity".lower()) and (value == fillOpacityDef)):
+      recordFlag = 0
+    if (recordFlag == 1):
+      if (type(kwargs[key]) == str):
+        data.append("\"{0}\":\"{1}\",".format(key, value))
+      else:
+        data.append("\"{0}\":{1},".format(key, value))
+  return "".join(data)
+
+def getDataJsonGeoFeatureStr(geoID, numValInBound, llBound, propsStr):
+  ## One-line GeoJSON feature; propsStr from getPropsJsonGeoStr()
+  coords = ",".join(["[{0},{1}]".format(llBound[i], llBound[i+1]) for i in xrange(0, numValInBound, 2)])
+  return "".join(["{\"type\":\"Feature\",\"geometry\":{\"type\":\"Polygon\",\"coordinates\":[[", coords,
+                  "]]},\"properties\":{", propsStr, "\"geoid\":\"{0}\"".format(geoID), "}}"])
+
+def writeDataJsonGeoStr(geoID, numValInBound, llBound, **kwargs):
+  return getDataJsonGeoFeatureStr(geoID, numValInBound, llBound, getPropsJsonGeoStr(**kwargs))
+
+##-------------------- Output sinks -----
+## One sink per output format of getBinsOneLLBound(); writeBins() formats a
+## batch of BinRecord and writes it at once into a large file buffer.
+## propsList (getBinsLLBounds()): GeoJSON properties per bin, e.g. regionId.
+outFormatsDef = ("geojson", "midmifcenter", "midmifbound", "geobound")
+outBatchSize = 4096  ## Bins formatted per write
+outBufSize = 1 << 20  ## File buffer in bytes
+
+def getCoverProps(binRec):
+  ## GeoJSON properties of a BinCoverRecord (coverMode 2); none for BinRecord
+  if (len(binRec) == len(BinRecord._fields)):
+    return {}
+  return {"cover": "interior" if (binRec.interiorFlag == 1) else "boundary", "coverFraction": round(binRec.coverFraction, 6)}
+
+class GeoJSONSink(object):  ## GeoBin.json
+  fnames = ("GeoBin.json",)
+
+  def __init__(self, pathName, numValInBound, llBound, **kwargs):
+    self.pathName = pathName
+    self.kwargs = kwargs
+    self.geojson_file = None
+    self.recCnt = 0
+
+  def open(self):
+    retVal, self.geojson_file = openFileWMkdir(self.pathName, "GeoBin.json", outBufSize)
+    if (retVal == 0):
+      writeHeaderJsonGeo(self.geojson_file, **self.kwargs)
+    return retVal
+
+  def writeBins(self, binRecs, propsList = None):
+    data = []
+    for i, binRec in enumerate(binRecs):
+      props = getCoverProps(binRec)
+      if (propsList is not None):
+        props.update(propsList[i])
+      data.append(getDataJsonGeoStr(int(self.recCnt == 0), binRec.geoID, binRec.centerLongi, binRec.centerLati, binRec.numBinBound, binRec.lonClock, binRec.latClock, **props))
+      self.recCnt += 1
+    self.geojson_file.write("".join(data))
+
+  def close(self):
+    if (self.geojson_file is not None):
+      writeFooterJsonGeo(self.geojson_file, self.recCnt)
+      self.geojson_file.close()
+      self.geojson_file = None
+
+class GeoJSONSeqSink(object):  ## GeoBin.geojsonl; one feature per line (newline-delimited GeoJSON)
+  fnames = ("GeoBin.geojsonl",)
+
+  def __init__(self, pathName, numValInBound, llBound, **kwargs):
+    self.pathName = pathName
+    self.kwargs = kwargs
+    self.geojson_file = None
+
+  def open(self):
+    retVal, self.geojson_file = openFileWMkdir(self.pathName, "GeoBin.geojsonl", outBufSize)
+    return retVal
+
+  def writeBins(self, binRecs, propsList = None):
+    data = []
+    for inx, binRec in enumerate(binRecs):
+      llBound = [val for i in xrange(0, binRec.numBinBound) for val in (binRec.lonClock[i], binRec.latClock[i])]
+      props = self.kwargs
+      if ((len(binRec) != len(BinRecord._fields)) or (propsList is not None)):  ## BinCoverRecord or per bin properties
+        props = dict(self.kwargs, **getCoverProps(binRec))
+        if (propsList is not None):
+          props.update(propsList[inx])
+      data.append(writeDataJsonGeoStr(binRec.geoID, 2 * binRec.numBinBound, llBound, **props))
+      data.append("\n")
+    self.geojson_file.write("".join(data))
+
+  def close(self):
+    if (self.geojson_file is not None):
+      self.geojson_file.close()
+      self.geojson_file = None
+
+class MidMifCenterSink(object):  ## GeoBinCenter.mid/mif
+  fnamePre = "GeoBinCenter"
+  fnames = ("GeoBinCenter.mid", "GeoBinCenter.mif")
+
+  def __init__(self, pathName, numValInBound, llBound, **kwargs):
+    self.pathName = pathName
+    self.mid_file = None
+    self.mif_file = None
+
+  def open(self):
+    retVal, self.mid_file = openFileWMkdir(self.pathName, self.fnamePre + ".mid", outBufSize)
+    if (retVal == 0):
+      retVal, self.mif_file = openFileWChk(self.pathName, self.fnamePre + ".mif", outBufSize)
+    if (retVal == 0):
+      mifHeaderID(self.mif_file)
+    return retVal
+
+  def getMifStr(self, binRec):
+    return getDataBinCenterMifStr(binRec.centerLongi, binRec.centerLati)
+
+  def writeBins(self, binRecs, propsList = None):
+    self.mid_file.write("".join(["{0}\n".format(binRec.geoID) for binRec in binRecs]))
+    self.mif_file.write("".join([self.getMifStr(binRec) for binRec in binRecs]))
+
+  def close(self):
+    for out_file in (self.mid_file, self.mif_file):
+      if (out_file is not None):
+        out_file.close()
+    self.mid_file = None
+    self.mif_file = None
+
+class MidMifBoundSink(MidMifCenterSink):  ## GeoBinBound.mid/mif
+  fnamePre = "GeoBinBound"
+  fnames = ("GeoBinBound.mid", "GeoBinBound.mif")
+
+  def getMifStr(self, binRec):
+    return getDataBinBoundMifStr(binRec.numBinBound, binRec.lonClock, binRec.latClock)
+
+class GeoBoundSink(object):  ## GeoBound.mid/mif; input region only
+  fnames = ("GeoBound.mid", "GeoBound.mif")
+
+  def __init__(self, pathName, numValInBound, llBound, **kwargs):
+    self.pathName = pathName
+    self.numValInBound = numValInBound
+    self.llBound = llBound
+
+  def open(self):
+    return createBoundFile(self.pathName, "GeoBound", self.numValInBound, self.llBound)
+
+  def writeBins(self, binRecs, propsList = None):
+    pass
+
+  def close(self):
+    pass
+
+colsManifestFname = "GeoBinCols.json"
+colsArrays = (("geoInts", "GeoBinColsGeoInt.bin", "<i8"), ("centerLongis", "GeoBinColsCenterLongi.bin", "<f8"),
+              ("centerLatis", "GeoBinColsCenterLati.bin", "<f8"), ("vertices", "GeoBinColsVertex.bin", "<f8"))
+colsCoverArrays = (("interiorFlags", "GeoBinColsInterior.bin", "<i1"), ("coverFractions", "GeoBinColsCoverFraction.bin", "<f8"))  ## coverMode 2
+
+class ColumnarSink(object):  ## GeoBinCols.json manifest and raw little-endian arrays; see loadBinsColumnar()
+  fnames = tuple(fname for name, fname, dtype in colsArrays + colsCoverArrays) + (colsManifestFname,)
+
+  def __init__(self, pathName, numValInBound, llBound, **kwargs):
+    self.pathName = pathName
+    self.kwargs = kwargs
+    self.col_files = []
+    self.cover_files = []
+    self.numBin = 0
+    self.binSizeMeter = 0
+    self.binType = -1
+    self.numVertex = 0
+    self.zoneNums = set()
+
+  def open(self):
+    retVal = mkdirWChk(self.pathName)
+    for name, fname, dtype in colsArrays:
+      if (retVal == 0):
+        retVal, col_file = openFileWChk(self.pathName, fname, outBufSize, "wb")
+        if (retVal == 0):
+          self.col_files.append(col_file)
+    return retVal
+
+  def writeBins(self, binRecs, propsList = None):
+    if (self.numBin == 0):  ## Same bin size and type for all bins of a run
+      self.binType = int(binRecs[0].geoID[10:11])
+      self.binSizeMeter = int(binRecs[0].geoID[11:15])
+      self.numVertex = binRecs[0].numBinBound
+      if (len(binRecs[0]) != len(BinRecord._fields)):  ## BinCoverRecord
+        for name, fname, dtype in colsCoverArrays:
+          retVal, col_file = openFileWChk(self.pathName, fname, outBufSize, "wb")
+          if (retVal == 0):
+            self.cover_files.append(col_file)
+    geoIDs = [binRec.geoID for binRec in binRecs]
+    self.zoneNums.update(int(geoID[15:17]) for geoID in geoIDs)
+    geoInts = geoIDsToInts(geoIDs)[1]  ## -1 if out of packing range
+    vertices = np.array([[binRec.lonClock[0:self.numVertex], binRec.latClock[0:self.numVertex]] for binRec in binRecs], dtype='<f8').transpose(0, 2, 1)
+    cols = (geoInts.astype('<i8'), np.array([binRec.centerLongi for binRec in binRecs], dtype='<f8'),
+            np.array([binRec.centerLati for binRec in binRecs], dtype='<f8'), np.ascontiguousarray(vertices))
+    for col_file, vals in zip(self.col_files, cols):
+      col_file.write(vals.tostring())
+    if (len(self.cover_files) > 0):
+      cols = (np.array([binRec.interiorFlag for binRec in binRecs], dtype='<i1'), np.array([binRec.coverFraction for binRec in binRecs], dtype='<f8'))
+      for col_file, vals in zip(self.cover_files, cols):
+        col_file.write(vals.tostring())
+    self.numBin += len(binRecs)
+
+  def close(self):
+    for col_file in self.col_files + self.cover_files:
+      col_file.close()
+    if (len(self.col_files) == len(colsArrays)):
+      shapes = {"geoInts": [self.numBin], "centerLongis": [self.numBin], "centerLatis": [self.numBin], "vertices": [self.numBin, self.numVertex, 2],
+                "interiorFlags": [self.numBin], "coverFractions": [self.numBin]}
+      arrays = colsArrays
+      if (len(self.cover_files) == len(colsCoverArrays)):
+        arrays = colsArrays + colsCoverArrays
+      manifest = {"format": "geobincols", "version": 1, "numBin": self.numBin, "binSizeMeter": self.binSizeMeter, "binType": self.binType,
+                  "numVertex": self.numVertex, "zoneNums": sorted(self.zoneNums), "properties": self.kwargs,
+                  "arrays": dict((name, {"file": fname, "dtype": dtype, "shape": shapes[name]}) for name, fname, dtype in arrays)}
+      retVal, manifest_file = openFileWChk(self.pathName, colsManifestFname)
+      if (retVal == 0):
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+        manifest_file.write("\n")
+        manifest_file.close()
+    self.col_files = []
+    self.cover_files = []
+
+outSinkClasses = {"geojson": GeoJSONSink, "geojsonseq": GeoJSONSeqSink, "midmifcenter": MidMifCenterSink,
+                  "midmifbound": MidMifBoundSink, "geobound": GeoBoundSink, "columnar": ColumnarSink}
+
+def getOutSinks(outFormats, pathName, numValInBound, llBound, **kwargs):
+  ## Sinks of outFormats (a name or a sequence of names); retVal bit 7 if a name is unknown
+  retVal = 0
+  sinks = []
+  if (isinstance(outFormats, basestring)):
+    outFormats = (outFormats,)
+  outFormatsUse = []
+  for outFormat in outFormats:
+    if (outFormat not in outSinkClasses):
+      print "Unknown output format:" + str(outFormat)
+      retVal |= 128
+    elif (outFormat not in outFormatsUse):
+      outFormatsUse.append(outFormat)
+  if (retVal == 0):
+    sinks = [outSinkClasses[outFormat](pathName, numValInBound, llBound, **kwargs) for outFormat in outFormatsUse]
+  return retVal, sinks
+
+def readColumnarManifest(pathName):
+  ## Manifest of a "columnar" output; retVal bit 0 if it cannot be read
+  manifest = {}
+  retVal = 0
+  try:
+    with open(os.path.join(pathName, colsManifestFname), "r") as manifest_file:
+      manifest = json.load(manifest_file)
+    if (manifest.get("format") != "geobincols"):
+      retVal |= 1
+  except (IOError, ValueError):
+    print "Cannot read manifest:" + os.path.join(pathName, colsManifestFname)
+    retVal |= 1
+  return retVal, manifest
+
+def mapColumnarArrays(pathName, manifest, arrays):
+  ## Read only numpy.memmap of arrays ((name, fname, dtype) of colsArrays); retVal bit 1 if a file is missing or of wrong size
+  cols = {}
+  retVal = 0
+  for name, fname, dtype in arrays:
+    array = manifest["arrays"].get(name)
+    if (array is None):
+      print "Array not in manifest:" + name
+      retVal |= 2
+      continue
+    fname = os.path.join(pathName, array["file"])
+    shape = tuple(array["shape"])
+    dtype = np.dtype(str(array["dtype"]))
+    if ((not os.path.isfile(fname)) or (os.path.getsize(fname) != int(np.prod(shape)) * dtype.itemsize)):
+      print "Invalid array file:" + fname
+      retVal |= 2
+    elif (shape[0] == 0):  ## Empty file cannot be mapped
+      cols[name] = np.zeros(shape, dtype=dtype)
+    else:
+      cols[name] = np.memmap(fname, dtype=dtype, mode="r", shape=shape)
+  return retVal, cols
+
+def loadBinsColumnar(pathName):
+  ## Memory map a "columnar" output of getBinsOneLLBound(); arrays are read only views of the files (no copy)
+  retVal, manifest = readColumnarManifest(pathName)
+  if (retVal == 0):
+    retVal, cols = mapColumnarArrays(pathName, manifest, colsArrays)
+  if (retVal != 0):
+    return -retVal, manifest, None, None, None, None
+  return 0, manifest, cols["geoInts"], cols["centerLongis"], cols["centerLatis"], cols["vertices"]
+
+def loadBinsColumnarCover(pathName):
+  ## interiorFlags and coverFractions of a coverMode 2 "columnar" output; same order as loadBinsColumnar()
+  retVal, manifest = readColumnarManifest(pathName)
+  if (retVal == 0):
+    retVal, cols = mapColumnarArrays(pathName, manifest, colsCoverArrays)
+  if (retVal != 0):
+    return -retVal, None, None
+  return 0, cols["interiorFlags"], cols["coverFractions"]
+
+def crossUTMZoneDetect(longiMin, longiMax):
+  crossZoneFlag = 0
+  zoneNumMin = int(math.floor((longiMin + 180.0) / 6) + 1)
+  zoneNumMax = int(math.floor((longiMax + 180.0) / 6) + 1)
+  if (zoneNumMin != zoneNumMax):
+    crossZoneFlag = 1
+  #print longiMin, longiMax, zoneNumMin, zoneNumMax, crossZoneFlag  ## Echo print
+  return crossZoneFlag, zoneNumMin, zoneNumMax
+
+def getDistHVFromBound(numValInRecBound, llRecBound, zoneNumForce):
+  utmBound = convertLLToUTMOneBound(numValInRecBound, llRecBound, zoneNumForce)  ## Convert llRecBound to UTM using the force UTM zone. ## Assume one UTM zone
+  utmRecBound = getRecFromBound(numValInRecBound, utmBound)  ## Jan. 25, 2017
+  distH, distV = getDistLLRecBound(llRecBound)  ## Get H and V distance from LL rectangular bound
+  distHFromUTM, distVFromUTM = getDistUTMRecBound(utmRecBound)  ## Jan. 25, 2017
+  #print "dist:", distH, distV, distHFromUTM, distVFromUTM  ## Echo print
+  if (distHFromUTM > distH):
+    distH = distHFromUTM
+  if (distVFromUTM > distV):
+    distV = distVFromUTM
+  return distH, distV
+
+def getBinsOneLLBoundSameZoneSetup(forceZoneFlag, crossZoneFlag, minNorthIn, distVIn, numValInRecBound, llRecBound, binSizeMeter, binType, zoneNumForce):
+  ## Lattice of bins in one zone covering llRecBound; returned as a dictionary
+  ## Input minNorthIn, distVIn to use lower northing and bigger distance when not force zone and crossZone
+  retValTemp, geoID, centerLongi, centerLati, zoneNumTemp = getGeoIDFromLL(llRecBound[0], llRecBound[1], binSizeMeter, binType)
+  minEast, minNorth, zoneNumTemp, latiBand = utmproj.from_latlon(centerLati, centerLongi, zoneNumForce)  ## Get minUTM bin center and get latiBand
+  #print minEast, minNorth, zoneNumTemp, latiBand, centerLati, centerLongi, zoneNumForce, geoID, zoneNumTemp  ## Echo print
+
+  ## Setup stepSizeH, stepSizeV, numStepH, numStepV, offsetH, offsetV, xSeg, ySeg
+  distH, distV = getDistHVFromBound(numValInRecBound, llRecBound, zoneNumForce)
+  #print minNorthIn, distVIn, minNorth, distV  ## Echo print
+
+  if ((forceZoneFlag == 0) and (crossZoneFlag == 1)):
+    if ((minNorthIn >= 0.0) and (distVIn >= 0)):
+      if (minNorthIn < minNorth):
+        minNorth = minNorthIn
+      if (distV < distVIn):
+        distV = distVIn
+
+  offsetV = 0.0
+  xSeg = 0.0
+  ySeg = 0.0
+  if (binType == 0):
+    stepSizeH = binSizeMeter
+    stepSizeV = binSizeMeter
+    offsetH = binSizeMeter / 2.0
+    offsetV = binSizeMeter / 2.0
+  else:
+    stepSizeH = binSizeMeter / 4.0 * 3.0 * 2.0  ## Avoid duplicate geoID
+    stepSizeV = binSizeMeter / 2.0 * math.sin(math.pi / 3.0)
+    ySeg = stepSizeV
+    xSeg = binSizeMeter / 4.0
+    offsetH = xSeg * 3.0
+  numStepH = int(math.floor(distH / stepSizeH)) + 2  ## Jan. 25, 2017; 1->2; cross zone should not duplicate
+  numStepV = int(math.floor(distV / stepSizeV)) + 6  ## Jan. 25, 2017; 1->6
+
+  if (binType == 1):
+    xSegNum = int(math.floor(minEast/offsetH))  ## Move north location if even even or odd odd
+    ySegNum = int(math.floor(minNorth / ySeg))
+    xSegNumMod2 = xSegNum % 2
+    ySegNumMod2 = ySegNum % 2
+    if (ySegNumMod2 == 1):
+      minNorth -= stepSizeV  ## North always starts with even y
+    if (xSegNumMod2 == 1):
+      minEast -= offsetH   ## East always starts with odd x
+    #print minEast, minNorth, offsetH, ySeg, xSegNum, ySegNum  ## Echo print
+
+  startChkH = 0
+  endChkH = numStepH
+  if ((forceZoneFlag == 0) and (crossZoneFlag == 1)):  ## Jan. 25, 2017; Need to check some bin boundary to reduce overlapping bin plot when bins in different zones
+    startChkH = 10
+    endChkH = numStepH - 10  ## Start and end Horizontal 
+    if (endChkH < 0):
+      endChkH = 0
+
+  #print llRecBound, binType, distH, distV, stepSizeH, stepSizeV, numStepH, numStepV, offsetH, offsetV, xSeg, ySeg  ## Echo print
+  lattice = {"minEast": minEast, "minNorth": minNorth, "distV": distV, "latiBand": latiBand,
+             "stepSizeH": stepSizeH, "stepSizeV": stepSizeV, "numStepH": numStepH, "numStepV": numStepV,
+             "offsetH": offsetH, "offsetV": offsetV, "xSeg": xSeg, "ySeg": ySeg,
+             "startChkH": startChkH, "endChkH": endChkH}
+  return lattice
+
+def getRowStartEast(lattice, binType, curNorth):
+  ## Easting before the first bin of a row; hexagon odd rows shift by offsetH
+  curEast = lattice["minEast"] - lattice["stepSizeH"]  ## Init. easting
+  if (binType == 1):
+    ySegNum = math.floor(curNorth / lattice["ySeg"])
+    if ((ySegNum % 2) == 1):     ## Adjust starting easting (horizontal shift)
+      curEast += lattice["offsetH"]
+  return curEast
+
+def getBinBoundUTM(lattice, binType, curEast, curNorth):
+  if (binType == 0):           ## Bin boundary in UTM
+    numBinBound = 4
+    eastingClock, northingClock = getBoundFromCenterSquare(lattice["offsetH"], lattice["offsetV"], curEast, curNorth)
+  else:
+    numBinBound = 6
+    eastingClock, northingClock = getBoundFromCenterHexagon(lattice["xSeg"], lattice["ySeg"], curEast, curNorth)
+  return numBinBound, eastingClock, northingClock
+
+class LatticeVertexCache(object):
+  ## Rolling cache of projected bin vertices of the last numRow lattice rows (current row first)
+  ##   Key is the exact UTM vertex (easting, northing); neighboring bins compute shared vertices
+  ##   to the same floats, so each vertex is projected (and checked) once with unchanged output
+
+  def __init__(self, zoneNum, latiBand, numRow):
+    self.zoneNum = zoneNum
+    self.latiBand = latiBand
+    self.rowCaches = deque(maxlen=numRow)
+
+  def nextRow(self):
+    self.rowCaches.appendleft({})
+
+  def getVertices(self, numBinBound, eastingClock, northingClock):
+    ## Vertex entries [longi, lati, inRegionFlag (-1: not checked)] of a bin
+    rowCache = self.rowCaches[0]
+    vertices = [None] * numBinBound
+    for k in xrange(0, numBinBound):
+      key = (eastingClock[k], northingClock[k])
+      vertex = None
+      for cache in self.rowCaches:
+        vertex = cache.get(key)
+        if (vertex is not None):
+          break
+      if (vertex is None):
+        lati, longi = utmproj.to_latlon(eastingClock[k], northingClock[k], self.zoneNum, self.latiBand)
+        vertex = [longi, lati, -1]
+        rowCache[key] = vertex
+      vertices[k] = vertex
+    return vertices
+
+def getVerticesInRegion(vertices, numValInBound, llBound, ks, stats = None):
+  ## Any vertex of ks in region? Flag checked once per vertex; counted in stats (BinStats) if not None
+  for k in ks:
+    vertex = vertices[k]
+    if (vertex[2] < 0):
+      retValTemp, vertex[2] = llPtInRegion(vertex[0], vertex[1], numValInBound, llBound)
+      if (stats is not None):
+        stats.cur["ptInRegionCalls"] += 1
+        if (isinstance(llBound, PreparedRegion)):
+          stats.cur["edgesTested"] += llBound.getNumEdgeTested(vertex[0], vertex[1])
+        else:
+          stats.cur["edgesTested"] += numValInBound // 2
+    if (vertex[2] == 1):
+      return 1
+  return 0
+
+def getVerticesLL(vertices):
+  return [vertex[0] for vertex in vertices], [vertex[1] for vertex in vertices]
+
+def getLatticeVertexCache(lattice, binType, zoneNumForce):
+  ## Square vertex is shared by 2 rows; hexagon vertex by 3 rows
+  if (binType == 0):
+    return LatticeVertexCache(zoneNumForce, lattice["latiBand"], 2)
+  return LatticeVertexCache(zoneNumForce, lattice["latiBand"], 3)
+
+def getLatticeScanRegion(lattice, numValInBound, llBound, binType, zoneNumForce):
+  if (binType == 0):
+    return ZoneScanRegion(numValInBound, llBound, zoneNumForce, lattice["latiBand"], lattice["stepSizeV"])
+  return ZoneScanRegion(numValInBound, llBound, zoneNumForce, lattice["latiBand"], lattice["ySeg"])
+
+def walkBinsOneLLBoundSameZone(lattice, numValInBound, llBound, binType, zoneNumForce, inxVStart = 0, inxVEnd = -1):
+  ## Lattice cover: test every bin of the rectangle; yields bins with any vertex in region
+  ## Step H bin by bin (avoid duplicate geoID), then V
+  ##   Check whether a boundary point inside polygon; If inside polygon, record result
+  ## Only rows [inxVStart, inxVEnd) (-1: numStepV); northing still accumulated from row 0
+  ## Vertices shared with neighboring bins are projected and checked once (LatticeVertexCache)
+  if (inxVEnd < 0):
+    inxVEnd = lattice["numStepV"]
+  stats = binstats.activeStats  ## None unless counting
+  vertexCache = getLatticeVertexCache(lattice, binType, zoneNumForce)
+  curNorth = lattice["minNorth"] - lattice["stepSizeV"]  ## Init. northing
+  for j in xrange(0, inxVEnd):
+    curNorth += lattice["stepSizeV"]          ## Current northing
+    if (j < inxVStart):
+      continue
+    if (stats is not None):
+      stats.cur["cellsVisited"] += lattice["numStepH"]
+    vertexCache.nextRow()
+    curEast = getRowStartEast(lattice, binType, curNorth)
+    for i in xrange(0, lattice["numStepH"]):
+      curEast += lattice["stepSizeH"]         ## Current easting
+      numBinBound, eastingClock, northingClock = getBinBoundUTM(lattice, binType, curEast, curNorth)
+      vertices = vertexCache.getVertices(numBinBound, eastingClock, northingClock)  ## Bin boundary in LL; Jan. 25, 2017
+
+      ## Inside region check; Any bin vertex in region? Jan. 25, 2017; Should use LL to check bin inside
+      inRegionFlag = getVerticesInRegion(vertices, numValInBound, llBound, xrange(0, numBinBound), stats)
+      #print j, i, inRegionFlag, numBinBound, eastingClock, northingClock  ## Echo print
+
+      if (inRegionFlag == 1):
+        lonClock, latClock = getVerticesLL(vertices)
+        yield i, curEast, curNorth, numBinBound, eastingClock, northingClock, lonClock, latClock
+
+def scanBinsOneLLBoundSameZone(lattice, numValInBound, llBound, binType, zoneNumForce, inxVStart = 0, inxVEnd = -1, scanRegion = None, coverFlag = 0):
+  ## Scanline cover: same bins and order as walkBinsOneLLBoundSameZone()
+  ##   Region projected into the zone once; vertex rows classified by edge crossings;
+  ##   only vertices near the boundary use llPtInRegion()
+  ## coverFlag 1: also yield interiorFlag, coverFraction; bins with no edge near their box are interior,
+  ##   the others are clipped against the nearby edges (ZoneScanRegion.getCoverFraction())
+  stepSizeH = lattice["stepSizeH"]
+  numStepH = lattice["numStepH"]
+  if (inxVEnd < 0):
+    inxVEnd = lattice["numStepV"]
+  if (scanRegion is None):
+    scanRegion = getLatticeScanRegion(lattice, numValInBound, llBound, binType, zoneNumForce)
+  stats = binstats.activeStats  ## None unless counting
+  vertexCache = getLatticeVertexCache(lattice, binType, zoneNumForce)
+  stepSizeHs = np.empty(numStepH + 1)
+  stepSizeHs[1:] = stepSizeH
+
+  curNorth = lattice["minNorth"] - lattice["stepSizeV"]  ## Init. northing
+  for j in xrange(0, inxVEnd):
+    curNorth += lattice["stepSizeV"]          ## Current northing
+    if (j < inxVStart):
+      continue
+    if (stats is not None):
+      stats.cur["cellsVisited"] += numStepH
+    vertexCache.nextRow()
+    stepSizeHs[0] = getRowStartEast(lattice, binType, curNorth)
+    curEasts = np.add.accumulate(stepSizeHs)[1:]  ## Same sums as curEast += stepSizeH
+
+    ## Vertex eastings and northings in the order of getBinBoundUTM()
+    if (binType == 0):
+      offsetH = lattice["offsetH"]
+      offsetV = lattice["offsetV"]
+      eastWs = curEasts - offsetH
+      eastEs = curEasts + offsetH
+      northS = curNorth - offsetV
+      northN = curNorth + offsetV
+      vertices = ((eastWs, northS), (eastWs, northN), (eastEs, northN), (eastEs, northS))
+    else:
+      xSeg = lattice["xSeg"]
+      ySeg = lattice["ySeg"]
+      eastWs = curEasts - xSeg
+      eastEs = curEasts + xSeg
+      northN = curNorth + ySeg
+      northS = curNorth - ySeg
+      vertices = ((curEasts - 2.0 * xSeg, curNorth), (eastWs, northN), (eastEs, northN), (curEasts + 2.0 * xSeg, curNorth), (eastEs, northS), (eastWs, northS))
+    numBinBound = len(vertices)
+    ptFlags = np.empty((numBinBound, numStepH), dtype=np.int8)
+    for k in xrange(0, numBinBound):
+      ptFlags[k] = scanRegion.classifyPts(vertices[k][1], vertices[k][0])
+    inFlags = (ptFlags == 1).any(0)
+    candInxs = np.flatnonzero(inFlags | (ptFlags == 2).any(0))
+    if ((coverFlag == 1) and (len(candInxs) > 0)):  ## Bins with an edge near their box
+      if (binType == 0):
+        halfH = lattice["offsetH"]
+        halfV = lattice["offsetV"]
+      else:
+        halfH = 2.0 * lattice["xSeg"]
+        halfV = lattice["ySeg"]
+      touchedFlags = np.zeros(numStepH, dtype=bool)
+      touchedFlags[candInxs] = scanRegion.getTouchedFlags(curNorth - halfV, curNorth + halfV, curEasts[candInxs] - halfH, curEasts[candInxs] + halfH)
+
+    for i in candInxs:
+      curEast = float(curEasts[i])
+      numBinBound, eastingClock, northingClock = getBinBoundUTM(lattice, binType, curEast, curNorth)
+      vertices = vertexCache.getVertices(numBinBound, eastingClock, northingClock)
+
+      inRegionFlag = int(inFlags[i])
+      if (inRegionFlag == 0):  ## Near boundary only
+        inRegionFlag = getVerticesInRegion(vertices, numValInBound, llBound, np.flatnonzero(ptFlags[:, i] == 2), stats)
+
+      if (inRegionFlag == 1):
+        lonClock, latClock = getVerticesLL(vertices)
+        if (coverFlag == 0):
+          yield int(i), curEast, curNorth, numBinBound, eastingClock, northingClock, lonClock, latClock
+        elif (not touchedFlags[i]):
+          yield int(i), curEast, curNorth, numBinBound, eastingClock, northingClock, lonClock, latClock, 1, 1.0
+        else:  ## Boundary
+          if (stats is not None):
+            stats.cur["binsClipped"] += 1
+          crossFlag, coverFraction = scanRegion.getCoverFraction(eastingClock, northingClock)
+          interiorFlag = int((crossFlag == 0) and (coverFraction == 1.0))
+          yield int(i), curEast, curNorth, numBinBound, eastingClock, northingClock, lonClock, latClock, interiorFlag, coverFraction
+
+def getBinRecord(forceZoneFlag, crossZoneFlag, minNorthIn, lattice, curEast, curNorth, numBinBound, eastingClock, northingClock, lonClock, latClock, binSizeMeter, binType, zoneNumForce):
+  ## BinRecord of a bin in region at lattice position (curEast, curNorth); geoID and center
+  latiBand = lattice["latiBand"]
+  xSeg = lattice["xSeg"]
+  if ((forceZoneFlag == 1) and (crossZoneFlag == 1)):  ## Use unique GeoID and center
+    latiFromUTM, longiFromUTM = utmproj.to_latlon(curEast, curNorth, zoneNumForce, latiBand)
+    retValTemp, geoID, centerLongi, centerLati, zoneNumTemp = getGeoIDFromLL(longiFromUTM, latiFromUTM, binSizeMeter, binType)
+  else:
+    curEastUse = curEast
+    curNorthUse = curNorth
+    if (minNorthIn > 0):  ## zone number changed; May not need since curEast = curEastUse and curNorth = curNorthUse; Test/Debug
+      if (binType == 1):
+        curEastUse = eastingClock[0] + 2.0 * xSeg
+        curNorthUse = northingClock[0]
+
+    geoID, centerLongi, centerLati = getGeoIDFromUTM(curEastUse, curNorthUse, binSizeMeter, binType, zoneNumForce, latiBand)
+    #geoID, centerLongi, centerLati = getGeoIDFromUTM(curEast, curNorth, binSizeMeter, binType, zoneNumForce, latiBand)
+
+  #print "getBinRecord():", curEast, curNorth, curEastUse, curNorthUse, xSeg, numBinBound, eastingClock, northingClock, zoneNumForce, latiBand, geoID, centerLongi, centerLati  ## Echo print
+  return BinRecord(geoID, centerLongi, centerLati, numBinBound, lonClock, latClock)
+
+def getBinsOneLLBoundSameZone(forceZoneFlag, crossZoneFlag, minNorthIn, lattice, numValInBound, llBound, binSizeMeter, binType, zoneNumForce, coverMode = 0, inxVStart = 0, inxVEnd = -1, scanRegion = None):
+  ## Yield BinRecord of bins in region in one zone; lattice from getBinsOneLLBoundSameZoneSetup()
+  ## Input minNorthIn (previous zone minNorth) when not force zone and crossZone
+  ## coverMode 0: lattice (walkBinsOneLLBoundSameZone()); 1: scanline (scanBinsOneLLBoundSameZone());
+  ##   2: scanline and BinCoverRecord (interiorFlag, coverFraction)
+  ## Lattice rows [inxVStart, inxVEnd) only (-1: numStepV); strip of getBinsOneLLBoundStrip()
+  if (coverMode >= 1):
+    inRegionBins = scanBinsOneLLBoundSameZone(lattice, numValInBound, llBound, binType, zoneNumForce, inxVStart, inxVEnd, scanRegion, int(coverMode == 2))
+  else:
+    inRegionBins = walkBinsOneLLBoundSameZone(lattice, numValInBound, llBound, binType, zoneNumForce, inxVStart, inxVEnd)
+  stats = binstats.activeStats  ## None unless counting
+
+  for inRegionBin in inRegionBins:  ## Record geoID, center, and boundary
+    i, curEast, curNorth, numBinBound, eastingClock, northingClock, lonClock, latClock = inRegionBin[0:8]
+    if ((i > lattice["endChkH"]) or (i < lattice["startChkH"])):  ## Check whether bin shall use next zone coordinates
+      if (binType == 0):
+        eastT, northT, zoneNumT, latiBandT = utmproj.from_latlon(latClock[2], lonClock[2])
+      else:
+        eastT, northT, zoneNumT, latiBandT = utmproj.from_latlon(latClock[3], lonClock[3])
+      if (zoneNumT != zoneNumForce):  ## zoneNum changed
+        if (stats is not None):
+          stats.cur["binsSkippedSeam"] += 1
+        continue
+
+    if (stats is not None):
+      stats.cur["binsEmitted"] += 1
+    binRec = getBinRecord(forceZoneFlag, crossZoneFlag, minNorthIn, lattice, curEast, curNorth, numBinBound, eastingClock, northingClock, lonClock, latClock, binSizeMeter, binType, zoneNumForce)
+    if (coverMode == 2):
+      binRec = BinCoverRecord._make(binRec + inRegionBin[8:10])
+    yield binRec
+
+def getLatticeStrips(lattice, binType, numStrip):
+  ## Northing strips [inxVStart, inxVEnd) of lattice rows; at least numStrip strips of at most maxCellInStrip cells;
+  ##   hexagon strips have an even number of rows, so every strip starts on an even y row (ySegNum % 2 == 0) as minNorth
+  numStepV = lattice["numStepV"]
+  numRowInStrip = max(1, int(math.ceil(numStepV / float(max(1, numStrip)))))
+  numRowInStrip = max(1, min(numRowInStrip, maxCellInStrip // max(1, lattice["numStepH"])))
+  if ((binType == 1) and ((numRowInStrip % 2) == 1)):
+    numRowInStrip += 1
+  return [(inxVStart, min(inxVStart + numRowInStrip, numStepV)) for inxVStart in xrange(0, numStepV, numRowInStrip)]
+
+## Region of a process pool worker; set by initBinsPoolWorker()
+poolRegion = {}
+maxCellInStrip = 1 << 15  ## Lattice cells per strip task; with 2 tasks per worker in flight, parent memory is bounded
+
+def initBinsPoolWorker(numValInBound, llBound):
+  poolRegion.clear()
+  poolRegion["numValInBound"] = numValInBound
+  poolRegion["llBound"] = llBound
+  poolRegion["scanRegions"] = {}  ## ZoneScanRegion by (zoneNum, latiBand); built once per worker
+
+def getBinsOneLLBoundStrip(task):
+  ## Process pool task: list of BinRecord of one northing strip; same as the strip rows of getBinsOneLLBoundSameZone()
+  ##   and counts of the strip (BinStats) if statsFlag is 1, else None
+  forceZoneFlag, crossZoneFlag, minNorthIn, lattice, binSizeMeter, binType, zoneNumForce, coverMode, inxVStart, inxVEnd, statsFlag = task
+  numValInBound = poolRegion["numValInBound"]
+  llBound = poolRegion["llBound"]
+  stats = None
+  if (statsFlag == 1):  ## Counts of this strip (and of the scan region if built here)
+    stats = binstats.BinStats()
+    stats.start()
+    stats.startZone(zoneNumForce)
+  try:
+    scanRegion = None
+    if (coverMode >= 1):
+      scanKey = (zoneNumForce, lattice["latiBand"])
+      if (scanKey not in poolRegion["scanRegions"]):
+        poolRegion["scanRegions"][scanKey] = getLatticeScanRegion(lattice, numValInBound, llBound, binType, zoneNumForce)
+      scanRegion = poolRegion["scanRegions"][scanKey]
+    binRecs = list(getBinsOneLLBoundSameZone(forceZoneFlag, crossZoneFlag, minNorthIn, lattice, numValInBound, llBound, binSizeMeter, binType, zoneNumForce, coverMode, inxVStart, inxVEnd, scanRegion))
+  finally:
+    if (stats is not None):
+      stats.stop()
+  if (stats is None):
+    return binRecs, None
+  return binRecs, stats.zones[zoneNumForce]
+
+def getLatticeKey(lattice, binType):
+  ## Regions with the same key share one lattice: latiBand and lattice offset (mm) of minEast, minNorth
+  periodH = lattice["stepSizeH"]
+  periodV = lattice["stepSizeV"]
+  if (binType == 1):
+    periodV = 2.0 * lattice["ySeg"]  ## minNorth always on even y
+  offsetHMm = int(round((lattice["minEast"] % periodH) * 1000.0)) % int(round(periodH * 1000.0))
+  offsetVMm = int(round((lattice["minNorth"] % periodV) * 1000.0)) % int(round(periodV * 1000.0))
+  return lattice["latiBand"], offsetHMm, offsetVMm
+
+def getUnionLattice(lattices):
+  ## Lattice covering lattices of the same key; each lattice is a window [inxH, inxH + numStepH) x [inxV, inxV + numStepV)
+  stepSizeH = lattices[0]["stepSizeH"]
+  stepSizeV = lattices[0]["stepSizeV"]
+  inxHs = [int(round((lattice["minEast"] - lattices[0]["minEast"]) / stepSizeH)) for lattice in lattices]
+  inxVs = [int(round((lattice["minNorth"] - lattices[0]["minNorth"]) / stepSizeV)) for lattice in lattices]
+  minInxH = min(inxHs)
+  minInxV = min(inxVs)
+  unionLattice = dict(lattices[0])
+  unionLattice["minEast"] = lattices[inxHs.index(minInxH)]["minEast"]  ## Keep the exact start of one lattice
+  unionLattice["minNorth"] = lattices[inxVs.index(minInxV)]["minNorth"]
+  unionLattice["numStepH"] = max(inxH + lattice["numStepH"] for inxH, lattice in zip(inxHs, lattices)) - minInxH
+  unionLattice["numStepV"] = max(inxV + lattice["numStepV"] for inxV, lattice in zip(inxVs, lattices)) - minInxV
+  unionLattice["distV"] = max(lattice["distV"] for lattice in lattices)
+  unionLattice["startChkH"] = 0
+  unionLattice["endChkH"] = unionLattice["numStepH"]
+  windows = [(inxH - minInxH, inxH - minInxH + lattice["numStepH"], inxV - minInxV, inxV - minInxV + lattice["numStepV"]) for inxH, inxV, lattice in zip(inxHs, inxVs, lattices)]
+  return unionLattice, windows
+
+def getRegionUTMRecBound(numValInBound, llBound, zoneNum, latiBand, marginMeter):
+  ## UTM rectangle of region plus marginMeter; edges are straight in LL, so add twice the UTM bulge of edge middle points
+  if (isinstance(llBound, PreparedRegion)):
+    llBound = llBound.llBound
+  llBoundArr = np.array(llBound[0:numValInBound], dtype=np.float64)
+  longis = llBoundArr[0::2]
+  latis = llBoundArr[1::2]
+  eastings, northings = llsToZoneUTM(np.concatenate((longis, (longis + np.roll(longis, 1)) / 2.0)), np.concatenate((latis, (latis + np.roll(latis, 1)) / 2.0)), zoneNum, latiBand)
+  numPt = len(longis)
+  bulge = np.hypot(eastings[numPt:] - (eastings[0:numPt] + np.roll(eastings[0:numPt], 1)) / 2.0, northings[numPt:] - (northings[0:numPt] + np.roll(northings[0:numPt], 1)) / 2.0).max()
+  marginMeter += 2.0 * bulge + 1.0
+  return eastings.min() - marginMeter, eastings.max() + marginMeter, northings.min() - marginMeter, northings.max() + marginMeter
+
+def walkBinsRegionsSameZone(lattice, windows, utmRecBounds, llBounds, binType, zoneNumForce):
+  ## Lattice cover of several regions in one pass; yields bins with any vertex in a region and the region indices
+  ##   Region i only checks bins of its window (same bins as its own lattice) near its UTM rectangle
+  stepSizeH = lattice["stepSizeH"]
+  numStepH = lattice["numStepH"]
+  startHs, endHs, startVs, endVs = [np.array(vals, dtype=np.int64) for vals in zip(*windows)]
+  minEasts, maxEasts, minNorths, maxNorths = [np.array(vals) for vals in zip(*utmRecBounds)]
+  vertexCache = getLatticeVertexCache(lattice, binType, zoneNumForce)
+  stepSizeHs = np.empty(numStepH + 1)
+  stepSizeHs[1:] = stepSizeH
+
+  curNorth = lattice["minNorth"] - lattice["stepSizeV"]  ## Init. northing
+  for j in xrange(0, lattice["numStepV"]):
+    curNorth += lattice["stepSizeV"]          ## Current northing
+    rowInxs = np.flatnonzero((startVs <= j) & (j < endVs) & (minNorths <= curNorth) & (curNorth <= maxNorths))
+    if (len(rowInxs) == 0):
+      continue
+    vertexCache.nextRow()
+    stepSizeHs[0] = getRowStartEast(lattice, binType, curNorth)
+    curEasts = np.add.accumulate(stepSizeHs)[1:]  ## Same sums as curEast += stepSizeH
+
+    ## (bin, region) candidates of the row, by bin then region order
+    inxStarts = np.maximum(np.searchsorted(curEasts, minEasts[rowInxs], 'left'), startHs[rowInxs])
+    inxEnds = np.minimum(np.searchsorted(curEasts, maxEasts[rowInxs], 'right'), endHs[rowInxs])
+    counts = np.maximum(inxEnds - inxStarts, 0)
+    binInxs = np.repeat(inxStarts, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    regionInxs = np.repeat(rowInxs, counts)
+    order = np.argsort(binInxs, kind='mergesort')
+    binInxs = binInxs[order]
+    regionInxs = regionInxs[order]
+    binStarts = np.flatnonzero(np.diff(binInxs, prepend=-1) != 0)  ## First candidate of each bin
+
+    for inxStart, inxEnd in zip(binStarts, np.append(binStarts[1:], len(binInxs))):
+      i = int(binInxs[inxStart])
+      curEast = float(curEasts[i])
+      numBinBound, eastingClock, northingClock = getBinBoundUTM(lattice, binType, curEast, curNorth)
+      lonClock, latClock = getVerticesLL(vertexCache.getVertices(numBinBound, eastingClock, northingClock))  ## Projected once per vertex
+
+      inRegionInxs = []
+      for regionInx in regionInxs[inxStart:inxEnd]:  ## Inside region check; Any bin vertex in region?
+        for k in xrange(0, numBinBound):
+          if (llBounds[regionInx].ptInRegion(lonClock[k], latClock[k]) == 1):
+            inRegionInxs.append(int(regionInx))
+            break
+
+      if (len(inRegionInxs) > 0):
+        yield i, curEast, curNorth, numBinBound, eastingClock, northingClock, lonClock, latClock, inRegionInxs
+
+##-------------------- Export functions -----
+def getBinGeoJSONFromGeoID(geoID, **kwargs):
+  retStrFlag = 1
+  retVal = 0  ## Init.
+  #data = {}  ## Uncomment this if retStrFlag == 0
+  data = ""   ## Uncomment this if retStrFlag == 1
+  centerLongi = 0.0
+  centerLati = 0.0
+  binSizeMeter = 0
+  binType = 0
+  numValInBound = 0
+  llBound = [0,1,2,3,4,5,6,7,8,9,10,11]
+
+  retVal, numValInBound, llBound, centerLongi, centerLati, binSizeMeter, binType = getLLFromGeoID(geoID)
+  if (retVal == 0):
+    if (isGeoInt(geoID)):  ## Packed GeoID; output GeoID string
+      retValT, geoID = intToGeoID(geoID)
+    if (retStrFlag == 1):
+      data = writeDataJsonGeoStr(geoID, numValInBound, llBound, **kwargs)
+    else:
+      data = writeDataJsonGeoObj(geoID, numValInBound, llBound, **kwargs)
+    #print llBound, data  ## Echo print
+  return retVal, data
+
+def iterBinsInRegion(numValInBound, llBound, binSizeMeter, binType, zoneNum = -1, coverMode = 0, numWorker = 1):
+  ## Generator of BinRecord; zone by zone as getBinsOneLLBound()
+  retVal = getBinsInRegionChkPara(numValInBound, llBound, binSizeMeter, binType, coverMode)  ## Check input parameters
+  if (retVal != 0):
+    raise ValueError("iterBinsInRegion(): invalid parameters ({0})".format(-retVal))
+  if (not (isinstance(llBound, PreparedRegion) and (llBound.numValInBound == numValInBound))):
+    llBound = PreparedRegion(numValInBound, llBound)  ## Prepare once; every bin vertex is checked against it
+
+  forceZoneFlag = 0  ## 1 for force zone if zoneNum < 1; 0 for auto-detect dynamically
+
+  ## Get rectangular boundary from llBound; use minLL as force UTM zone and get minLL bin center.
+  llRecBound = getRecFromBound(numValInBound, llBound)
+  #print llRecBound  ## Echo print
+
+  ## Call one zone by one zone
+  crossZoneFlag, zoneNumMin, zoneNumMax = crossUTMZoneDetect(llRecBound[0], llRecBound[6])  ## Cross zone detection
+  if ((zoneNum >= 1) and (zoneNum <= 60)):  ## Input zoneNum valid
+    forceZoneFlag = 1
+    zoneNumMin = zoneNum
+    zoneNumMax = zoneNum
+  if (forceZoneFlag == 1):
+    zoneNumMax = zoneNumMin
+
+  ## Process pool (numWorker < 1: one per CPU); each zone split into northing strips (at least numWorker * 4, at most
+  ##   maxCellInStrip cells each), at most 2 per worker in flight, merged in strip order
+  if (numWorker != 1):
+    import multiprocessing  ## Imported on first pool use only
+  if (numWorker < 1):
+    numWorker = multiprocessing.cpu_count()
+  pool = None
+  if (numWorker > 1):
+    pool = multiprocessing.Pool(numWorker, initBinsPoolWorker, (numValInBound, llBound))
+
+  try:
+    for binRec in iterBinsInRegionZones(forceZoneFlag, crossZoneFlag, zoneNumMin, zoneNumMax, llRecBound, numValInBound, llBound, binSizeMeter, binType, coverMode, pool, numWorker):
+      yield binRec
+    if (pool is not None):
+      pool.close()
+      pool.join()
+      pool = None
+  finally:
+    if (pool is not None):  ## Generator closed early or error
+      pool.terminate()
+
+def iterBinsInRegionZones(forceZoneFlag, crossZoneFlag, zoneNumMin, zoneNumMax, llRecBound, numValInBound, llBound, binSizeMeter, binType, coverMode, pool, numWorker):
+  ## Zone loop of iterBinsInRegion(); strips on pool if pool is not None
+  numValInRecBound = 8
+  llRecBoundUse = [0] * 8
+  for i in xrange(0, numValInRecBound):  ## Init.
+    llRecBoundUse[i] = llRecBound[i]
+
+  minNorth = -1.0
+  distV = -1.0
+  stats = binstats.activeStats  ## None unless counting
+  for zoneNumUse in xrange(zoneNumMin, zoneNumMax + 1):
+    if (stats is not None):
+      stats.startZone(zoneNumUse)
+    if (zoneNumMin != zoneNumMax):  ## Need to replace some parts in llRecBoundUse
+      if (zoneNumUse != zoneNumMax):
+        llRecBoundUse[4] = llRecBoundUse[6] = -180.0 + zoneNumUse * 6.0
+      else:
+        llRecBoundUse[4] = llRecBoundUse[6] = llRecBound[4]
+      if (zoneNumUse != zoneNumMin):
+        llRecBoundUse[0] = llRecBoundUse[2] = -180.0 + (zoneNumUse - 1) * 6.0
+      else:
+        llRecBoundUse[0] = llRecBoundUse[2] = llRecBound[0]
+    minNorthIn = minNorth
+    distVIn = distV
+    lattice = getBinsOneLLBoundSameZoneSetup(forceZoneFlag, crossZoneFlag, minNorthIn, distVIn, numValInRecBound, llRecBoundUse, binSizeMeter, binType, zoneNumUse)
+    if (pool is None):
+      for binRec in getBinsOneLLBoundSameZone(forceZoneFlag, crossZoneFlag, minNorthIn, lattice, numValInBound, llBound, binSizeMeter, binType, zoneNumUse, coverMode):
+        yield binRec
+    else:
+      strips = deque(getLatticeStrips(lattice, binType, numWorker * 4))
+      pending = deque()
+      while ((len(strips) > 0) or (len(pending) > 0)):
+        while ((len(strips) > 0) and (len(pending) < numWorker * 2)):  ## Backpressure: finished strips wait for the consumer
+          inxVStart, inxVEnd = strips.popleft()
+          task = (forceZoneFlag, crossZoneFlag, minNorthIn, lattice, binSizeMeter, binType, zoneNumUse, coverMode, inxVStart, inxVEnd, int(stats is not None))
+          pending.append(pool.apply_async(getBinsOneLLBoundStrip, (task,)))
+        binRecs, counts = pending.popleft().get()
+        if (stats is not None):
+          stats.addCounts(counts)
+        for binRec in binRecs:
+          yield binRec
+        binRecs = None
+    minNorth = lattice["minNorth"]
+    distV = lattice["distV"]
+    if (stats is not None):
+      stats.endZone()
+
+def getBinsOneLLBound(numValInBound, llBound, binSizeMeter, binType, pathName, zoneNum = -1, coverMode = 0, numWorker = 1, outFormats = outFormatsDef, **kwargs):  ## kwargs is a dictionary: for k,v in kwargs.iteritems():
+  ## Verify json format: $ python -m json.tool GeoBin.json
+  ## http://www.saltycrane.com/blog/2008/01/how-to-use-args-and-kwargs-in-python/: for key in kwargs: print "another keyword arg: %s: %s" % (key, kwargs[key])
+  retVal = getBinsOneLLBoundChkPara(numValInBound, llBound, binSizeMeter, binType, pathName, coverMode)  ## Check input parameters
+  if (retVal == 0):
+    retVal, sinks = getOutSinks(outFormats, pathName, numValInBound, llBound, **kwargs)
+  if (retVal == 0):  ## May cross zone
+
+    ## Prepare output files; Write file header
+    sinksOpen = []
+    for sink in sinks:
+      retVal = sink.open()
+      sinksOpen.append(sink)
+      if (retVal != 0):
+        break
+
+    binIter = None
+    try:
+      if (retVal == 0):
+        binIter = iterBinsInRegion(numValInBound, llBound, binSizeMeter, binType, zoneNum, coverMode, numWorker)
+        while True:  ## Output in batches
+          binRecs = list(itertools.islice(binIter, outBatchSize))
+          if (len(binRecs) == 0):
+            break
+          for sink in sinks:
+            sink.writeBins(binRecs)
+    finally:  ## Also on error: close the generator (and its worker pool) and every opened sink
+      if (binIter is not None):
+        binIter.close()
+      stats = binstats.activeStats  ## None unless counting
+      for sink in sinksOpen:
+        sink.close()
+        if (stats is not None):  ## Bytes written per output file
+          for fname in sink.fnames:
+            if (os.path.isfile(os.path.join(pathName, fname))):
+              stats.addFileBytes(fname, os.path.getsize(os.path.join(pathName, fname)))
+  if (retVal > 0):
+    retVal *= -1
+  return retVal
+
+def getBinsOneLLBoundWStats(numValInBound, llBound, binSizeMeter, binType, pathName, zoneNum = -1, coverMode = 0, numWorker = 1, outFormats = outFormatsDef, stats = None, **kwargs):
+  ## getBinsOneLLBound() with instrumentation; stats: BinStats (e.g. with a callback) or None for a new one
+  if (stats is None):
+    stats = binstats.BinStats()
+  stats.start()
+  try:
+    retVal = getBinsOneLLBound(numValInBound, llBound, binSizeMeter, binType, pathName, zoneNum, coverMode, numWorker, outFormats, **kwargs)
+  finally:
+    stats.stop()
+  return retVal, stats
+
+def iterBinsInRegions(regions, binSizeMeter, binType, zoneNum = -1):
+  ## Generator of (regionId, BinRecord); regions on the same lattice (zone, latiBand, offset) share one pass
+  groups = []  ## [forceZoneFlag, crossZoneFlag, zoneNumUse, key, region indices, lattices]
+  groupInxs = {}
+  llBounds = []
+  for regionInx, (regionId, numValInBound, llBound) in enumerate(regions):
+    retVal = getBinsInRegionChkPara(numValInBound, llBound, binSizeMeter, binType)  ## Check input parameters
+    if (retVal != 0):
+      raise ValueError("iterBinsInRegions(): invalid parameters ({0}) of region {1}".format(-retVal, regionId))
+    if (not (isinstance(llBound, PreparedRegion) and (llBound.numValInBound == numValInBound))):
+      llBound = PreparedRegion(numValInBound, llBound)
+    llBounds.append(llBound)
+
+    llRecBound = getRecFromBound(numValInBound, llBound)
+    crossZoneFlag, zoneNumMin, zoneNumMax = crossUTMZoneDetect(llRecBound[0], llRecBound[6])  ## Cross zone detection
+    forceZoneFlag = 0
+    if ((zoneNum >= 1) and (zoneNum <= 60)):  ## Input zoneNum valid
+      forceZoneFlag = 1
+      zoneNumMin = zoneNum
+    elif (crossZoneFlag == 1):  ## Zone by zone with seam check; own pass
+      groups.append([forceZoneFlag, crossZoneFlag, zoneNumMin, None, [regionInx], []])
+      continue
+
+    lattice = getBinsOneLLBoundSameZoneSetup(forceZoneFlag, crossZoneFlag, -1.0, -1.0, 8, llRecBound, binSizeMeter, binType, zoneNumMin)
+    key = (forceZoneFlag, crossZoneFlag, zoneNumMin) + getLatticeKey(lattice, binType)
+    if (key not in groupInxs):
+      groupInxs[key] = len(groups)
+      groups.append([forceZoneFlag, crossZoneFlag, zoneNumMin, key, [], []])
+    groups[groupInxs[key]][4].append(regionInx)
+    groups[groupInxs[key]][5].append(lattice)
+
+  for forceZoneFlag, crossZoneFlag, zoneNumUse, key, regionInxs, lattices in groups:
+    if (key is None):
+      regionId, numValInBound, llBoundT = regions[regionInxs[0]]
+      for binRec in iterBinsInRegion(numValInBound, llBounds[regionInxs[0]], binSizeMeter, binType, zoneNum):
+        yield regionId, binRec
+      continue
+
+    lattice, windows = getUnionLattice(lattices)
+    utmRecBounds = [getRegionUTMRecBound(llBounds[regionInx].numValInBound, llBounds[regionInx], zoneNumUse, lattice["latiBand"], binSizeMeter) for regionInx in regionInxs]
+    for i, curEast, curNorth, numBinBound, eastingClock, northingClock, lonClock, latClock, inRegionInxs in \
+        walkBinsRegionsSameZone(lattice, windows, utmRecBounds, [llBounds[regionInx] for regionInx in regionInxs], binType, zoneNumUse):
+      binRec = getBinRecord(forceZoneFlag, crossZoneFlag, -1.0, lattice, curEast, curNorth, numBinBound, eastingClock, northingClock, lonClock, latClock, binSizeMeter, binType, zoneNumUse)
+      for inRegionInx in inRegionInxs:
+        yield regions[regionInxs[inRegionInx]][0], binRec
+
+def getBinsLLBounds(regions, binSizeMeter, binType, pathName, zoneNum = -1, outFormats = ("geojson",), **kwargs):
+  ## Membership of bins in several regions; one feature (with regionId property) per region and bin in each output, and one csv line
+  retVal = 0
+  for regionId, numValInBound, llBound in regions:
+    retVal |= getBinsOneLLBoundChkPara(numValInBound, llBound, binSizeMeter, binType, pathName)  ## Check input parameters
+  if (retVal == 0):
+    if (isinstance(outFormats, basestring)):
+      outFormats = (outFormats,)
+    if ("geobound" in outFormats):  ## One input region only
+      print "Output format not supported for several regions:geobound"
+      retVal |= 128
+  if (retVal == 0):
+    retVal, sinks = getOutSinks(outFormats, pathName, 0, [], **kwargs)
+  if (retVal == 0):
+
+    ## Prepare output files; Write file header
+    sinksOpen = []
+    member_file = None
+    for sink in sinks:
+      retVal = sink.open()
+      sinksOpen.append(sink)
+      if (retVal != 0):
+        break
+    if (retVal == 0):
+      retVal, member_file = openFileWMkdir(pathName, "GeoBinRegion.csv", outBufSize)
+
+    binIter = None
+    try:
+      if (retVal == 0):
+        member_file.write("regionId,geoID\n")
+        binIter = iterBinsInRegions(regions, binSizeMeter, binType, zoneNum)
+        while True:  ## Output in batches
+          items = list(itertools.islice(binIter, outBatchSize))
+          if (len(items) == 0):
+            break
+          binRecs = [binRec for regionId, binRec in items]
+          propsList = [{"regionId": regionId} for regionId, binRec in items]
+          for sink in sinks:
+            sink.writeBins(binRecs, propsList)
+          member_file.write("".join(["{0},{1}\n".format(regionId, binRec.geoID) for regionId, binRec in items]))
+    finally:  ## Also on error: close the generator and every opened file
+      if (binIter is not None):
+        binIter.close()
+      for sink in sinksOpen:
+        sink.close()
+      if (member_file is not None):
+        member_file.close()
+  if (retVal > 0):
+    retVal *= -1
+  return retVal
+
+##-------------------- Test -----
+if __name__ == '__main__':
+  ## Function test
+  retVal = 0
+  numValInBound = 8
+  llBound = [-122.51593,37.75312,-122.4993,37.78031,-122.432803,37.795259,-122.44142,37.752214]  ## in region; small region
+  #llBound = [-122.51593,37.75312,-122.4993,37.78031,-118.432803,37.795259,-118.44142,37.752214]  ## in region; for test cross zone region
+  binSizeMeter = 100
+  binType = 1  ## Hexagon
+  #binType = 0  ## Square
+  pathName = 'C:\\Users\\wyang.TTSWIRELESS\\Desktop\\MyProjects\\Python\\MyProjects\\GeoID'  ## Path to store GeoBin.json
+  geoID = '00000000001010010S0000000725200000096535'
+
+  ## Calling function
+  args = {"strokeColor": "#FF0000", "binSize": 100}
+  #retVal = getBinsOneLLBound(numValInBound, llBound, binSizeMeter, binType, pathName, -1, **args)  ## Example for using **args
+  #retVal = getBinsOneLLBound(numValInBound, llBound, binSizeMeter, binType, pathName)
+  print 'getBinsOneLLBound():', retVal, ':', numValInBound, llBound, binSizeMeter, binType, pathName  ## Echo print
+
+  #data = {}  ## Return JSON object; Uncomment this if retStrFlag == 0 
+  data = ""   ## Return string; Uncomment this if retStrFlag == 1
+  retVal, data = getBinGeoJSONFromGeoID(geoID, **args)  ## Return string object by default; can return JSON object
+  print 'getBinGeoJSONFromGeoID():', retVal, data, ':', geoID  ## Echo print
+  #print  data["geometry"]["coordinates"][0][1][0], data["geometry"]["coordinates"][0][1][1]  ## Echo print for returning JSON Object
+
+  ## Interior and boundary bins with cover fraction (coverMode 2)
+  #binRecs = list(iterBinsInRegion(numValInBound, llBound, binSizeMeter, binType, -1, 2))  ## Uncomment to bin with cover fraction
+  #print 'iterBinsInRegion() coverMode 2:', len(binRecs), sum(binRec.interiorFlag for binRec in binRecs), binRecs[0].coverFraction  ## Echo print
+
+  ## Load JSON file test
+  #with open('..\\GeoBinSample.json') as infile:
+    #jsonData = json.load(infile)
+    #print jsonData
+    #print jsonData['features'][0]['geometry']['coordinates']
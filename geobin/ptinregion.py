@@ -1,138 +1,357 @@
-## ptinregion.py
-##
-## Need to install utm: pip install utm
-##
-## Input argument: None
-## Test run: python ptinregion.py
-##
-## Fuctions:
-## llPtInRegion(longi, lati, numValInBound, llBound)
-##   Input: longitude, latitude, numValInBound, llBound
-##   Output: inRegionFlag
-##   Return: negative bit 0: invalid longitude
-##           negative bit 1: invalid latitude
-##           negative bit 2: invalid numValInBound
-##           negative bit 3: invalid llBound
-##           0: successful
-##   Note: Point on boundary is inside.
-## geoIDInRegion(geoID, numValInBound, llBound)
-##   Input: geoID, numValInBound, llBound
-##   Output: inRegionFlag
-##   Return: negative bit 0: invalid geoID length
-##           negative bit 1: invalid geoID binType
-##           negative bit 2: invalid geoID binSize
-##           negative bit 3: invalid geoID zoneNum
-##           negative bit 4: invalid geoID zoneLetter
-##           negative bit 5: invalid numValInBound
-##           negative bit 6: invalid llBound
-##           0: successful
-##   Note: Point on boundary is inside.
-##
-
-import sys
-from geoidutm import getLLFromGeoID
-
-minLenGeoID = 25
-
-## Function
-##-------------------- Export functions -----
-def utmPtInRegion(easting, northing, numValInBound, bound):
-  ## Point on boundary is inside
-  inRegionFlag = 0  ## Init.
-  retVal = 0  ## Init.
-
-  ## Check input parameters
-  if (numValInBound < 6):
-    retVal |= 4
-  if (len(llBound) < numValInBound):
-    retVal |= 8
-  if (retVal != 0):
-    retVal *= -1
-
-  if (retVal == 0):
-    oddNodes = False
-    j = numValInBound - 2
-    for i in xrange(0, numValInBound, 2):
-      if ((bound[i] < easting and bound[j] >= easting) or (bound[j] < easting and bound[i] >= easting)):
-        if ((bound[i+1] + (easting - bound[i]) / (bound[j] - bound[i]) * (bound[j+1] - bound[i+1])) < northing):
-          oddNodes = not oddNodes
-      #print j, i, easting, northing, bound[j], bound[j+1], bound[i], bound[i+1], oddNodes  ## Echo print
-      j = i
-    if (oddNodes):
-      inRegionFlag = 1
-  return retVal, inRegionFlag
-
-def llPtInRegion(longi, lati, numValInBound, llBound):
-  ## Point on boundary is inside
-  inRegionFlag = 0  ## Init.
-  retVal = 0  ## Init.
-
-  ## Check input parameters
-  if ((longi < -180.0) or (longi > 180.0)):
-    retVal |= 1
-  if ((lati < -90.0) or (lati > 90.0)):
-    retVal |= 2
-  if (numValInBound < 6):
-    retVal |= 4
-  if (len(llBound) < numValInBound):
-    retVal |= 8
-  if (retVal != 0):
-    retVal *= -1
-
-  if (retVal == 0):
-    oddNodes = False
-    j = numValInBound - 2
-    for i in xrange(0, numValInBound, 2):
-      if ((llBound[i] < longi and llBound[j] >= longi) or (llBound[j] < longi and llBound[i] >= longi)):
-        if ((llBound[i+1] + (longi - llBound[i]) / (llBound[j] - llBound[i]) * (llBound[j+1] - llBound[i+1])) < lati):
-          oddNodes = not oddNodes
-      #print j, i, longi, lati, llBound[j], llBound[j+1], llBound[i], llBound[i+1], oddNodes  ## Echo print
-      j = i
-    if (oddNodes):
-      inRegionFlag = 1
-  return retVal, inRegionFlag
-
-def geoIDInRegion(geoID, numValInBound, llBound):
-  ## Point on boundary is inside
-  inRegionFlag = 0  ## Init.
-  retVal = 0  ## Init.
-  centerLongi = 0.0
-  centerLati = 0.0
-  numValInBoundGeo = 0
-  binSizeMeter = 0
-  binType = 0
-  llBoundGeo = [0,1,2,3,4,5,6,7,8,9,10,11]
-
-  retVal, numValInBoundGeo, llBoundGeo, centerLongi, centerLati, binSizeMeter, binType = getLLFromGeoID(geoID)
-  if (retVal == 0):
-    if (numValInBound < 6):
-      retVal |= 32
-    if (len(llBound) < numValInBound):
-      retVal |= 64
-    if (retVal == 0):
-      retVal, inRegionFlag = llPtInRegion(centerLongi, centerLati, numValInBound, llBound)
-  if (retVal > 0):
-    retVal *= -1
-  return retVal, inRegionFlag
-
-##-------------------- Test -----
-## Function test
-retVal = 0
-inRegionFlag = 0
-numValInBound = 8
-llBound = [50.0,7.0,50.0,8.0,52.0,8.0,52.0,7.0]  ## in region
-#llBound = [50.0,7.0,50.0,7.5,51.2,7.5,51.2,7.0]  ## on region
-#llBound = [50.0,7.0,50.0,7.2,51.0,7.2,51.0,7.0]   ## out of region
-
-## Setup arguments
-## (longi, lati) = (51.2, 7.5) -> (easting, northing) = (395201.310381, 5673135.24118); 32U
-longi = 51.2
-lati = 7.5
-geoID = '00000000001010032U0000000526900000131015'
-
-## Calling function
-retVal, inRegionFlag = llPtInRegion(longi, lati, numValInBound, llBound)
-#print 'llPtInRegion():', longi, lati, numValInBound, llBound, ':', retVal, inRegionFlag  ## Echo print
-
-retVal, inRegionFlag = geoIDInRegion(geoID, numValInBound, llBound)
-#print 'geoIDInRegion():', geoID, numValInBound, llBound, ':', retVal, inRegionFlag  ## Echo print
+## ptinregion.py
+##
+## Need to install numpy: pip install numpy
+##
+## Input argument: None
+## Test run: python ptinregion.py
+##
+## Fuctions:
+## llPtInRegion(longi, lati, numValInBound, llBound)
+##   Input: longitude, latitude, numValInBound, llBound
+##   Output: inRegionFlag
+##   Return: negative bit 0: invalid longitude
+##           negative bit 1: invalid latitude
+##           negative bit 2: invalid numValInBound
+##           negative bit 3: invalid llBound
+##           0: successful
+##   Note: Point on boundary is inside.
+##   Note: llBound can be a list or a PreparedRegion.
+## llPtsInRegion(longis, latis, numValInBound, llBound)
+##   Input: longitude array, latitude array, numValInBound, llBound
+##   Output: retVal array, inRegionFlag array (bool)
+##     Note: Batch version of llPtInRegion(); element i has the same result
+##           as llPtInRegion(longis[i], latis[i], ...), except NaN is
+##           invalid.
+##     Note: Points are sorted by longitude once and every edge only
+##           visits the points in its longitude range.
+##   Return: same bits as llPtInRegion() per element
+## utmPtsInRegion(eastings, northings, numValInBound, bound)
+##   Input: easting array, northing array, numValInBound, bound (UTM)
+##   Output: retVal array, inRegionFlag array (bool)
+##     Note: Batch version of utmPtInRegion().
+##   Return: negative bit 0: invalid easting (NaN)
+##           negative bit 1: invalid northing (NaN)
+##           negative bit 2: invalid numValInBound
+##           negative bit 3: invalid bound
+##           0: successful
+## geoIDInRegion(geoID, numValInBound, llBound)
+##   Input: geoID (string or packed integer), numValInBound, llBound
+##   Output: inRegionFlag
+##   Return: negative bit 0: invalid geoID length
+##           negative bit 1: invalid geoID binType
+##           negative bit 2: invalid geoID binSize
+##           negative bit 3: invalid geoID zoneNum
+##           negative bit 4: invalid geoID zoneLetter
+##           negative bit 5: invalid numValInBound
+##           negative bit 6: invalid llBound
+##           0: successful
+##   Note: Point on boundary is inside.
+##   Note: llBound can be a list or a PreparedRegion.
+##   Note: Only the bin center is decoded (getCenterLLFromGeoID()).
+## geoIDsInRegion(geoIDs, numValInBound, llBound)
+##   Input: GeoID sequence or array (strings or packed integers),
+##          numValInBound, llBound
+##   Output: retVal array, inRegionFlag array (bool)
+##     Note: Batch version of geoIDInRegion(); bin centers are decoded in
+##           bulk and checked with llPtsInRegion() in one pass.
+##   Return: same bits as geoIDInRegion() per element, plus
+##           negative bit 7: bin out of UTM range (geoIDInRegion() raises
+##             utmproj.OutOfRangeError for it)
+##
+## Classes:
+## PreparedRegion(numValInBound, llBound, numSlab = -1)
+##   Input: numValInBound, llBound, optional number of longitude slabs
+##          (-1: about 4 edges per slab, fewer slabs if edges would be in
+##          more than maxSlabEntryFactor * numEdge slab entries in total)
+##     Note: Built once for a region and passed as llBound to
+##           llPtInRegion(), geoIDInRegion() and getBinsOneLLBound(); it can
+##           be used like the llBound list (len(), indexing).
+##     Note: Bounding box reject, then only the edges of the longitude slab
+##           of the point are checked; same result as the llBound list.
+##     Note: retVal has the bits of llPtInRegion() for numValInBound and
+##           llBound (negative bit 2 or 3); such a region has no edges and
+##           llPtInRegion() returns the same error bits as for the list.
+##   ptInRegion(longi, lati)
+##     Input: longitude, latitude (not checked)
+##     Output: inRegionFlag
+##   getNumEdgeTested(longi, lati)
+##     Output: number of edges ptInRegion() tests for the point
+##
+
+import sys
+import numpy as np
+from geoidutm import getCenterLLFromGeoID, getCenterLLsFromGeoIDs
+
+minLenGeoID = 25
+maxSlabEntryFactor = 8  ## PreparedRegion memory is O(numEdge) for any shape
+
+## Function
+##-------------------- Class -----
+class PreparedRegion(object):
+
+  def __init__(self, numValInBound, llBound, numSlab = -1):
+    self.numValInBound = numValInBound
+    self.llBound = list(llBound[0:max(numValInBound, 0)])
+
+    ## Check input parameters; same bits as llPtInRegion(), which returns them for this region
+    self.retVal = 0
+    if (numValInBound < 6):
+      self.retVal |= 4
+    if (len(llBound) < numValInBound):
+      self.retVal |= 8
+    if (self.retVal != 0):
+      self.retVal *= -1
+      self.numEdge = 0
+      self.minLongi = self.maxLongi = self.minLati = self.maxLati = 0.0
+      self.numSlab = 1
+      self.slabScale = 0.0
+      self.slabs = [()]
+      return
+
+    ## Same edges as llPtInRegion(): (j, i) with j the previous vertex; vertical edges never cross
+    edges = []
+    j = numValInBound - 2
+    for i in xrange(0, numValInBound, 2):
+      longiI = llBound[i]
+      longiJ = llBound[j]
+      if (longiI != longiJ):
+        edges.append((min(longiI, longiJ), max(longiI, longiJ), longiI, llBound[i+1], longiJ - longiI, llBound[j+1] - llBound[i+1]))
+      j = i
+    self.numEdge = len(edges)
+
+    ## Bounding box
+    longis = self.llBound[0::2]
+    latis = self.llBound[1::2]
+    self.minLongi = min(longis)
+    self.maxLongi = max(longis)
+    self.minLati = min(latis)
+    self.maxLati = max(latis)
+
+    ## Longitude slabs; edge in every slab its longitude range touches
+    if (numSlab < 1):
+      numSlab = min(self.numEdge // 4 + 1, 65536)
+      ## An edge is in at most width * slabScale + 2 slabs; long edges (e.g.
+      ##   jagged or comb shapes) get fewer, wider slabs
+      sumWidth = sum([edge[1] - edge[0] for edge in edges])
+      if (sumWidth > 0.0):
+        numSlabMax = int((maxSlabEntryFactor - 2) * self.numEdge * (self.maxLongi - self.minLongi) / sumWidth)
+        numSlab = max(min(numSlab, numSlabMax), 1)
+    self.numSlab = numSlab
+    self.slabScale = 0.0
+    if (self.maxLongi > self.minLongi):
+      self.slabScale = numSlab / (self.maxLongi - self.minLongi)
+    slabs = [[] for k in xrange(0, numSlab)]
+    for edge in edges:
+      for k in xrange(self.getSlab(edge[0]), self.getSlab(edge[1]) + 1):
+        slabs[k].append(edge)
+    self.slabs = [tuple(slab) for slab in slabs]
+
+  def __len__(self):
+    return self.numValInBound
+
+  def __getitem__(self, inx):
+    return self.llBound[inx]
+
+  def getSlab(self, longi):
+    k = int((longi - self.minLongi) * self.slabScale)
+    if (k < 0):
+      k = 0
+    elif (k >= self.numSlab):
+      k = self.numSlab - 1
+    return k
+
+  def ptInRegion(self, longi, lati):
+    ## Same test as llPtInRegion() on the edges of one slab
+    if ((longi <= self.minLongi) or (longi > self.maxLongi) or (lati < self.minLati - 1e-9)):
+      return 0
+    oddNodes = False
+    for longiLo, longiHi, longiI, latiI, dLongi, dLati in self.slabs[self.getSlab(longi)]:
+      if ((longiLo < longi) and (longi <= longiHi)):
+        if ((latiI + (longi - longiI) / dLongi * dLati) < lati):
+          oddNodes = not oddNodes
+    if (oddNodes):
+      return 1
+    return 0
+
+  def getNumEdgeTested(self, longi, lati):
+    ## Edges ptInRegion() tests for the point (0 if bounding box reject)
+    if ((longi <= self.minLongi) or (longi > self.maxLongi) or (lati < self.minLati - 1e-9)):
+      return 0
+    return len(self.slabs[self.getSlab(longi)])
+
+def ptsInBound(xs, ys, numValInBound, bound):
+  ## Crossing test of llPtInRegion() over point arrays; points sorted by x once,
+  ##   each edge flips the points in its x range (a slice of the sorted points)
+  order = np.argsort(xs, kind='mergesort')
+  xsSorted = xs[order]
+  ysSorted = ys[order]
+  oddNodes = np.zeros(len(xs), dtype=np.bool_)
+  j = numValInBound - 2
+  for i in xrange(0, numValInBound, 2):
+    if (bound[i] != bound[j]):
+      inxStart = np.searchsorted(xsSorted, min(bound[i], bound[j]), 'right')
+      inxEnd = np.searchsorted(xsSorted, max(bound[i], bound[j]), 'right')
+      if (inxStart < inxEnd):
+        xsT = xsSorted[inxStart:inxEnd]
+        oddNodes[inxStart:inxEnd] ^= ((bound[i+1] + (xsT - bound[i]) / (bound[j] - bound[i]) * (bound[j+1] - bound[i+1])) < ysSorted[inxStart:inxEnd])
+    j = i
+  inRegionFlags = np.zeros(len(xs), dtype=np.bool_)
+  inRegionFlags[order] = oddNodes
+  return inRegionFlags
+
+def ptsInRegionChkPara(retVals, numValInBound, bound):
+  if (isinstance(bound, PreparedRegion)):
+    bound = bound.llBound
+  if (numValInBound < 6):
+    retVals |= 4
+  if (len(bound) < numValInBound):
+    retVals |= 8
+  return bound
+
+##-------------------- Export functions -----
+def utmPtInRegion(easting, northing, numValInBound, bound):
+  ## Point on boundary is inside
+  inRegionFlag = 0  ## Init.
+  retVal = 0  ## Init.
+
+  ## Check input parameters
+  if (numValInBound < 6):
+    retVal |= 4
+  if (len(bound) < numValInBound):
+    retVal |= 8
+  if (retVal != 0):
+    retVal *= -1
+
+  if (retVal == 0):
+    oddNodes = False
+    j = numValInBound - 2
+    for i in xrange(0, numValInBound, 2):
+      if ((bound[i] < easting and bound[j] >= easting) or (bound[j] < easting and bound[i] >= easting)):
+        if ((bound[i+1] + (easting - bound[i]) / (bound[j] - bound[i]) * (bound[j+1] - bound[i+1])) < northing):
+          oddNodes = not oddNodes
+      #print j, i, easting, northing, bound[j], bound[j+1], bound[i], bound[i+1], oddNodes  ## Echo print
+      j = i
+    if (oddNodes):
+      inRegionFlag = 1
+  return retVal, inRegionFlag
+
+def llPtInRegion(longi, lati, numValInBound, llBound):
+  ## Point on boundary is inside
+  inRegionFlag = 0  ## Init.
+  retVal = 0  ## Init.
+
+  ## Check input parameters
+  if ((longi < -180.0) or (longi > 180.0)):
+    retVal |= 1
+  if ((lati < -90.0) or (lati > 90.0)):
+    retVal |= 2
+  if (numValInBound < 6):
+    retVal |= 4
+  if (len(llBound) < numValInBound):
+    retVal |= 8
+  if (retVal != 0):
+    retVal *= -1
+
+  if ((retVal == 0) and isinstance(llBound, PreparedRegion) and (llBound.numValInBound == numValInBound)):
+    inRegionFlag = llBound.ptInRegion(longi, lati)
+  elif (retVal == 0):
+    oddNodes = False
+    j = numValInBound - 2
+    for i in xrange(0, numValInBound, 2):
+      if ((llBound[i] < longi and llBound[j] >= longi) or (llBound[j] < longi and llBound[i] >= longi)):
+        if ((llBound[i+1] + (longi - llBound[i]) / (llBound[j] - llBound[i]) * (llBound[j+1] - llBound[i+1])) < lati):
+          oddNodes = not oddNodes
+      #print j, i, longi, lati, llBound[j], llBound[j+1], llBound[i], llBound[i+1], oddNodes  ## Echo print
+      j = i
+    if (oddNodes):
+      inRegionFlag = 1
+  return retVal, inRegionFlag
+
+def utmPtsInRegion(eastings, northings, numValInBound, bound):
+  ## Batch utmPtInRegion(); NaN is invalid
+  eastings = np.asarray(eastings, dtype=np.float64)
+  northings = np.asarray(northings, dtype=np.float64)
+  retVals = np.zeros(len(eastings), dtype=np.int32)
+  inRegionFlags = np.zeros(len(eastings), dtype=np.bool_)
+  retVals[np.isnan(eastings)] |= 1
+  retVals[np.isnan(northings)] |= 2
+  bound = ptsInRegionChkPara(retVals, numValInBound, bound)
+  validInx = np.flatnonzero(retVals == 0)
+  if (len(validInx) > 0):
+    inRegionFlags[validInx] = ptsInBound(eastings[validInx], northings[validInx], numValInBound, bound)
+  return -retVals, inRegionFlags
+
+def llPtsInRegion(longis, latis, numValInBound, llBound):
+  ## Batch llPtInRegion(); NaN is invalid
+  longis = np.asarray(longis, dtype=np.float64)
+  latis = np.asarray(latis, dtype=np.float64)
+  retVals = np.zeros(len(longis), dtype=np.int32)
+  inRegionFlags = np.zeros(len(longis), dtype=np.bool_)
+  with np.errstate(invalid='ignore'):
+    retVals[~((longis >= -180.0) & (longis <= 180.0))] |= 1
+    retVals[~((latis >= -90.0) & (latis <= 90.0))] |= 2
+  llBound = ptsInRegionChkPara(retVals, numValInBound, llBound)
+  validInx = np.flatnonzero(retVals == 0)
+  if (len(validInx) > 0):
+    inRegionFlags[validInx] = ptsInBound(longis[validInx], latis[validInx], numValInBound, llBound)
+  return -retVals, inRegionFlags
+
+def geoIDInRegion(geoID, numValInBound, llBound):
+  ## Point on boundary is inside
+  inRegionFlag = 0  ## Init.
+  retVal = 0  ## Init.
+  centerLongi = 0.0
+  centerLati = 0.0
+  binSizeMeter = 0
+  binType = 0
+
+  retVal, centerLongi, centerLati, binSizeMeter, binType = getCenterLLFromGeoID(geoID)  ## Only center is checked
+  if (retVal == 0):
+    if (numValInBound < 6):
+      retVal |= 32
+    if (len(llBound) < numValInBound):
+      retVal |= 64
+    if (retVal == 0):
+      retVal, inRegionFlag = llPtInRegion(centerLongi, centerLati, numValInBound, llBound)
+  if (retVal > 0):
+    retVal *= -1
+  return retVal, inRegionFlag
+
+def geoIDsInRegion(geoIDs, numValInBound, llBound):
+  ## Batch geoIDInRegion(); only bin centers are decoded
+  retVals, centerLongis, centerLatis, binSizeMeters, binTypes, zoneNums, latiBands, xs, ys = getCenterLLsFromGeoIDs(geoIDs)
+  retVals *= -1
+  retVals[(retVals & 32) != 0] = 128  ## Bin out of UTM range; only set on otherwise valid GeoIDs
+  validFlags = (retVals == 0)
+  if (numValInBound < 6):
+    retVals[validFlags] |= 32
+  if (len(llBound) < numValInBound):
+    retVals[validFlags] |= 64
+  inRegionFlags = np.zeros(len(retVals), dtype=np.bool_)
+  validInx = np.flatnonzero(retVals == 0)
+  if (len(validInx) > 0):
+    retValsT, inRegionFlags[validInx] = llPtsInRegion(centerLongis[validInx], centerLatis[validInx], numValInBound, llBound)
+  return -retVals, inRegionFlags
+
+##-------------------- Test -----
+if __name__ == '__main__':
+  ## Function test
+  retVal = 0
+  inRegionFlag = 0
+  numValInBound = 8
+  llBound = [50.0,7.0,50.0,8.0,52.0,8.0,52.0,7.0]  ## in region
+  #llBound = [50.0,7.0,50.0,7.5,51.2,7.5,51.2,7.0]  ## on region
+  #llBound = [50.0,7.0,50.0,7.2,51.0,7.2,51.0,7.0]   ## out of region
+
+  ## Setup arguments
+  ## (longi, lati) = (51.2, 7.5) -> (easting, northing) = (395201.310381, 5673135.24118); 32U
+  longi = 51.2
+  lati = 7.5
+  geoID = '00000000001010032U0000000526900000131015'
+
+  ## Calling function
+  retVal, inRegionFlag = llPtInRegion(longi, lati, numValInBound, llBound)
+  #print 'llPtInRegion():', longi, lati, numValInBound, llBound, ':', retVal, inRegionFlag  ## Echo print
+
+  retVal, inRegionFlag = geoIDInRegion(geoID, numValInBound, llBound)
+  #print 'geoIDInRegion():', geoID, numValInBound, llBound, ':', retVal, inRegionFlag  ## Echo print
@@ -0,0 +1,319 @@
+## regionscan.py
+##
+## Need to install numpy: pip install numpy
+##
+## Input argument: None
+## Test run: python regionscan.py
+##
+## Classes:
+## ZoneScanRegion(numValInBound, llBound, zoneNum, latiBand, rowHeight, tolMeter = 0.05)
+##   Input: numValInBound, llBound (list or PreparedRegion), UTM zone
+##          number and latitude band of the lattice, row height in meters
+##          (bucket size of the edge index), optional densification
+##          tolerance in meters
+##     Note: llBound is projected into the zone once; edges are straight in
+##           longitude and latitude (same as llPtInRegion()), so they are
+##           densified until the UTM chord is within tolMeter of the edge.
+##   classifyPts(northing, eastings)
+##     Input: northing of a lattice row, easting array
+##     Output: flag array; 0: outside, 1: inside, 2: near boundary
+##     Note: Inside and outside come from the edge crossings of the row and
+##           agree with llPtInRegion() on the UTM to LL converted point.
+##           Points within the margin of an edge are flagged 2 and should
+##           be checked with llPtInRegion().
+##   getTouchedFlags(northLo, northHi, eastLos, eastHis)
+##     Input: northing range of a lattice row, easting ranges of its bins
+##     Output: flag array; True if an edge is within the margin of the box
+##     Note: Bins not touched are entirely inside or entirely outside.
+##   getCoverFraction(eastingClock, northingClock)
+##     Input: convex bin boundary in UTM (clockwise)
+##     Output: crossFlag (1: the region boundary crosses the bin), area
+##             fraction of the bin inside the region (0.0 ~ 1.0)
+##     Note: Only edges near the bin are clipped (bin area from the region
+##           edges inside the bin and the bin edges inside the region), so
+##           the cost does not depend on the size of the region.
+##   Note: While a BinStats is active, classifyPts(), getTouchedFlags() and
+##         the cover fraction add the points (lattice vertices, bin boxes)
+##         they classify and the edges of their row or band to its
+##         scanPtsClassified and scanEdgesTested counters.
+##
+
+import math, sys
+import numpy as np
+import utmproj, binstats
+from ptinregion import PreparedRegion
+
+## Function
+def addScanCounts(numPt, numEdge):
+  ## Scan counters of the active BinStats (binstats.py); no-op unless counting
+  stats = binstats.activeStats
+  if ((stats is not None) and (stats.cur is not None)):
+    stats.cur["scanPtsClassified"] += numPt
+    stats.cur["scanEdgesTested"] += numEdge
+
+def llsToZoneUTM(longis, latis, zoneNum, latiBand):
+  ## utmproj.fromLatLons() forced to zoneNum; northing in the hemisphere of latiBand (same frame as the lattice)
+  eastings, northings, zoneNums, latiBands = utmproj.fromLatLons(latis, longis, zoneNum)
+  southFlags = latis < 0
+  if (latiBand >= 'N'):
+    northings[southFlags] -= 10000000.0
+  else:
+    northings[~southFlags] += 10000000.0
+  return eastings, northings
+
+def getUTMRoundTripErr(longis, latis, eastings, northings, zoneNum, latiBand):
+  ## Max distance in meters between LL and to_latlon(from_latlon(LL)); points out of UTM range skipped
+  inRangeFlags = (eastings >= 100000) & (eastings < 1000000) & (northings >= 0) & (northings <= 10000000)
+  if (not inRangeFlags.any()):
+    return 0.0
+  latisT, longisT = utmproj.to_latlon(eastings[inRangeFlags], northings[inRangeFlags], zoneNum, latiBand)
+  dLati = (latisT - latis[inRangeFlags]) * 111320.0
+  dLongi = (longisT - longis[inRangeFlags]) * 111320.0 * np.cos(np.radians(latis[inRangeFlags]))
+  return float(np.sqrt(dLati * dLati + dLongi * dLongi).max())
+
+##-------------------- Class -----
+class ZoneScanRegion(object):
+
+  def __init__(self, numValInBound, llBound, zoneNum, latiBand, rowHeight, tolMeter = 0.05):
+    self.zoneNum = zoneNum
+    self.latiBand = latiBand
+
+    ## Same edges as llPtInRegion(): (j, i) with j the previous vertex
+    inxI = np.arange(0, numValInBound, 2)
+    inxJ = np.concatenate(([numValInBound - 2], inxI[:-1]))
+    if (isinstance(llBound, PreparedRegion)):
+      llBound = llBound.llBound
+    llBoundArr = np.array(llBound[0:numValInBound], dtype=np.float64)
+    longi0 = llBoundArr[inxJ]
+    lati0 = llBoundArr[inxJ + 1]
+    longi1 = llBoundArr[inxI]
+    lati1 = llBoundArr[inxI + 1]
+    east0, north0 = llsToZoneUTM(longi0, lati0, zoneNum, latiBand)
+    east1, north1 = llsToZoneUTM(longi1, lati1, zoneNum, latiBand)
+
+    ## Densify: split edges at LL middle point until UTM middle point is within tolMeter of the chord
+    edges = []
+    for depth in xrange(0, 32):
+      longiM = (longi0 + longi1) / 2.0
+      latiM = (lati0 + lati1) / 2.0
+      eastM, northM = llsToZoneUTM(longiM, latiM, zoneNum, latiBand)
+      devs = np.hypot(eastM - (east0 + east1) / 2.0, northM - (north0 + north1) / 2.0)
+      splitFlags = devs > tolMeter
+      if (depth == 31):
+        splitFlags[:] = False
+      keepFlags = ~splitFlags
+      edges.append((east0[keepFlags], north0[keepFlags], east1[keepFlags], north1[keepFlags], longi0[keepFlags], lati0[keepFlags]))
+      if (not splitFlags.any()):
+        break
+      longi0, lati0, east0, north0, longi1, lati1, east1, north1 = \
+        np.concatenate((longi0[splitFlags], longiM[splitFlags])), np.concatenate((lati0[splitFlags], latiM[splitFlags])), \
+        np.concatenate((east0[splitFlags], eastM[splitFlags])), np.concatenate((north0[splitFlags], northM[splitFlags])), \
+        np.concatenate((longiM[splitFlags], longi1[splitFlags])), np.concatenate((latiM[splitFlags], lati1[splitFlags])), \
+        np.concatenate((eastM[splitFlags], east1[splitFlags])), np.concatenate((northM[splitFlags], north1[splitFlags]))
+    self.x0 = np.concatenate([e[0] for e in edges])
+    self.y0 = np.concatenate([e[1] for e in edges])
+    self.x1 = np.concatenate([e[2] for e in edges])
+    self.y1 = np.concatenate([e[3] for e in edges])
+    self.numEdge = len(self.x0)
+
+    ## Orientation of the region in UTM (shoelace over directed edges); 1.0: counterclockwise
+    refX = self.x0.mean()
+    refY = self.y0.mean()
+    signedArea = np.sum((self.x0 - refX) * (self.y1 - refY) - (self.x1 - refX) * (self.y0 - refY))
+    self.orientSign = 1.0 if (signedArea >= 0) else -1.0
+
+    ## Margin covers densification tolerance and UTM round trip error of lattice points
+    roundTripErr = getUTMRoundTripErr(np.concatenate([e[4] for e in edges]), np.concatenate([e[5] for e in edges]), self.x0, self.y0, zoneNum, latiBand)
+    self.margin = tolMeter + 2.0 * roundTripErr + 0.1
+
+    ## Edge index: bucket b holds edges with [minY - margin, maxY + margin] touching it
+    self.rowHeight = float(rowHeight)
+    minYs = np.minimum(self.y0, self.y1) - self.margin
+    maxYs = np.maximum(self.y0, self.y1) + self.margin
+    self.baseNorth = minYs.min()
+    bucket0s = np.floor((minYs - self.baseNorth) / self.rowHeight).astype(np.int64)
+    bucket1s = np.floor((maxYs - self.baseNorth) / self.rowHeight).astype(np.int64)
+    self.numBucket = int(bucket1s.max()) + 1
+    counts = bucket1s - bucket0s + 1
+    edgeInxs = np.repeat(np.arange(self.numEdge), counts)
+    bucketInxs = np.repeat(bucket0s, counts) + np.arange(len(edgeInxs)) - np.repeat(np.cumsum(counts) - counts, counts)
+    order = np.argsort(bucketInxs, kind='mergesort')
+    self.bucketEdges = edgeInxs[order]
+    self.bucketStarts = np.searchsorted(bucketInxs[order], np.arange(self.numBucket + 1))
+
+  def getRowEdges(self, northing):
+    ## Edges may touch [northing - margin, northing + margin]
+    bucket = int(math.floor((northing - self.baseNorth) / self.rowHeight))
+    if ((bucket < 0) or (bucket >= self.numBucket)):
+      return self.bucketEdges[0:0]
+    return self.bucketEdges[self.bucketStarts[bucket]:self.bucketStarts[bucket+1]]
+
+  def getBandEdges(self, northLo, northHi):
+    ## Edges may touch [northLo - margin, northHi + margin]
+    bucket0 = max(int(math.floor((northLo - self.baseNorth) / self.rowHeight)), 0)
+    bucket1 = min(int(math.floor((northHi - self.baseNorth) / self.rowHeight)), self.numBucket - 1)
+    if (bucket0 > bucket1):
+      return self.bucketEdges[0:0]
+    edgeInxs = self.bucketEdges[self.bucketStarts[bucket0]:self.bucketStarts[bucket1+1]]
+    if (bucket0 < bucket1):  ## Edge in several buckets
+      edgeInxs = np.unique(edgeInxs)
+    return edgeInxs
+
+  def getStripIntervals(self, x0, y0, dx, dy, northLo, northHi, marginH):
+    ## Easting intervals of edge pieces within [northLo, northHi], widened by marginH;
+    ## sorted starts and running max of ends
+    with np.errstate(divide='ignore', invalid='ignore'):
+      tAs = (northLo - y0) / dy
+      tBs = (northHi - y0) / dy
+    flatFlags = dy == 0
+    tLos = np.where(flatFlags, 0.0, np.clip(np.minimum(tAs, tBs), 0.0, 1.0))
+    tHis = np.where(flatFlags, 1.0, np.clip(np.maximum(tAs, tBs), 0.0, 1.0))
+    xAs = x0 + tLos * dx
+    xBs = x0 + tHis * dx
+    los = np.minimum(xAs, xBs) - marginH
+    his = np.maximum(xAs, xBs) + marginH
+    order = np.argsort(los)
+    return los[order], np.maximum.accumulate(his[order])
+
+  def getOverlapFlags(self, los, hiMaxs, eastLos, eastHis):
+    ## Easting ranges [eastLos, eastHis] overlapping an interval of getStripIntervals()
+    inxs = np.searchsorted(los, eastHis, 'right') - 1
+    return (inxs >= 0) & (eastLos <= hiMaxs[np.maximum(inxs, 0)])
+
+  def getPtsInside(self, eastings, northings, edgeInxs = None):
+    ## Inside flags of points from edge crossings (same rule as classifyPts()); points in a narrow band of northings
+    ## edgeInxs: getBandEdges() of a band holding the points (None: the band of the points)
+    if (edgeInxs is None):
+      edgeInxs = self.getBandEdges(northings.min(), northings.max())
+    addScanCounts(len(eastings), len(edgeInxs))
+    x0 = self.x0[edgeInxs][:, np.newaxis]
+    y0 = self.y0[edgeInxs][:, np.newaxis]
+    x1 = self.x1[edgeInxs][:, np.newaxis]
+    y1 = self.y1[edgeInxs][:, np.newaxis]
+    crossFlags = ((y0 <= northings) & (northings < y1)) | ((y1 <= northings) & (northings < y0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+      crossXs = x0 + (northings - y0) * (x1 - x0) / (y1 - y0)
+    return (np.count_nonzero(crossFlags & (crossXs < eastings), 0) % 2).astype(np.int8)
+
+  def classifyPts(self, northing, eastings):
+    flags = np.zeros(len(eastings), dtype=np.int8)
+    edgeInxs = self.getRowEdges(northing)
+    addScanCounts(len(eastings), len(edgeInxs))
+    if (len(edgeInxs) == 0):
+      return flags
+    x0 = self.x0[edgeInxs]
+    y0 = self.y0[edgeInxs]
+    x1 = self.x1[edgeInxs]
+    y1 = self.y1[edgeInxs]
+    dx = x1 - x0
+    dy = y1 - y0
+    margin = self.margin
+
+    ## Inside: odd number of crossings on the left; half-open rule counts a vertex once
+    crossFlags = ((y0 <= northing) & (northing < y1)) | ((y1 <= northing) & (northing < y0))
+    crossXs = np.sort(x0[crossFlags] + (northing - y0[crossFlags]) * dx[crossFlags] / dy[crossFlags])
+    flags[:] = np.searchsorted(crossXs, eastings, 'left') % 2
+
+    ## Near boundary: easting within margin of an edge piece in the row strip
+    stripFlags = (np.minimum(y0, y1) <= northing + margin) & (np.maximum(y0, y1) >= northing - margin)
+    if (stripFlags.any()):
+      los, hiMaxs = self.getStripIntervals(x0[stripFlags], y0[stripFlags], dx[stripFlags], dy[stripFlags], northing - margin, northing + margin, margin)
+      flags[self.getOverlapFlags(los, hiMaxs, eastings, eastings)] = 2
+    return flags
+
+  def getTouchedFlags(self, northLo, northHi, eastLos, eastHis):
+    flags = np.zeros(len(eastLos), dtype=bool)
+    margin = self.margin
+    edgeInxs = self.getBandEdges(northLo - margin, northHi + margin)
+    addScanCounts(len(eastLos), len(edgeInxs))
+    if (len(edgeInxs) == 0):
+      return flags
+    x0 = self.x0[edgeInxs]
+    y0 = self.y0[edgeInxs]
+    x1 = self.x1[edgeInxs]
+    y1 = self.y1[edgeInxs]
+    stripFlags = (np.minimum(y0, y1) <= northHi + margin) & (np.maximum(y0, y1) >= northLo - margin)
+    if (not stripFlags.any()):
+      return flags
+    x0 = x0[stripFlags]
+    y0 = y0[stripFlags]
+    los, hiMaxs = self.getStripIntervals(x0, y0, x1[stripFlags] - x0, y1[stripFlags] - y0, northLo - margin, northHi + margin, margin)
+    return self.getOverlapFlags(los, hiMaxs, eastLos, eastHis)
+
+  def getCoverFraction(self, eastingClock, northingClock):
+    ## Green's theorem on the boundary of bin and region intersection: region edge pieces inside the bin
+    ## plus bin edge pieces inside the region; coordinates relative to the bin center
+    numBinBound = len(eastingClock)
+    centerX = sum(eastingClock) / float(numBinBound)
+    centerY = sum(northingClock) / float(numBinBound)
+    vxs = np.array(eastingClock[::-1], dtype=np.float64) - centerX  ## Counterclockwise
+    vys = np.array(northingClock[::-1], dtype=np.float64) - centerY
+    exs = np.concatenate((vxs[1:], vxs[0:1])) - vxs  ## Bin edge k: vertex k to k + 1
+    eys = np.concatenate((vys[1:], vys[0:1])) - vys
+    binArea = 0.5 * np.sum(vxs * eys - vys * exs)
+
+    ## Region edges overlapping the bin box
+    edgeInxs = self.getBandEdges(min(northingClock), max(northingClock))
+    addScanCounts(0, len(edgeInxs))
+    axs = self.x0[edgeInxs] - centerX
+    ays = self.y0[edgeInxs] - centerY
+    bxs = self.x1[edgeInxs] - centerX
+    bys = self.y1[edgeInxs] - centerY
+    boxFlags = (np.maximum(axs, bxs) >= vxs.min()) & (np.minimum(axs, bxs) <= vxs.max()) & \
+               (np.maximum(ays, bys) >= vys.min()) & (np.minimum(ays, bys) <= vys.max())
+    if (not boxFlags.any()):
+      return 0, float(self.getPtsInside(np.array([centerX]), np.array([centerY]), edgeInxs)[0])
+    axs = axs[boxFlags]
+    ays = ays[boxFlags]
+    dxs = bxs[boxFlags] - axs
+    dys = bys[boxFlags] - ays
+
+    ## Region edges clipped to the bin (Cyrus-Beck; inside is left of every bin edge)
+    area = 0.0
+    crossFlag = 0
+    nums = exs * (ays[:, np.newaxis] - vys) - eys * (axs[:, np.newaxis] - vxs)
+    dens = exs * dys[:, np.newaxis] - eys * dxs[:, np.newaxis]
+    with np.errstate(divide='ignore', invalid='ignore'):
+      ts = -nums / dens
+    tLos = np.where(dens > 0, ts, 0.0).max(1)
+    tHis = np.where(dens < 0, ts, 1.0).min(1)
+    clipFlags = (tLos < tHis) & ~((dens == 0) & (nums < 0)).any(1)
+    if (clipFlags.any()):
+      crossFlag = 1
+      pxs = axs[clipFlags] + tLos[clipFlags] * dxs[clipFlags]
+      pys = ays[clipFlags] + tLos[clipFlags] * dys[clipFlags]
+      qxs = axs[clipFlags] + tHis[clipFlags] * dxs[clipFlags]
+      qys = ays[clipFlags] + tHis[clipFlags] * dys[clipFlags]
+      area += self.orientSign * 0.5 * np.sum(pxs * qys - qxs * pys)
+
+    ## Bin edges split where region edges cross them (u = k + s on bin edge k); pieces inside the region by midpoint
+    wxs = axs[:, np.newaxis] - vxs
+    wys = ays[:, np.newaxis] - vys
+    with np.errstate(divide='ignore', invalid='ignore'):
+      ss = (wxs * dys[:, np.newaxis] - wys * dxs[:, np.newaxis]) / dens
+      ts = (wxs * eys - wys * exs) / dens
+    splitFlags = (dens != 0) & (ss > 0) & (ss < 1) & (ts >= 0) & (ts <= 1)
+    if (splitFlags.any()):
+      crossFlag = 1
+    if (crossFlag == 0):  ## Bin entirely inside or outside
+      return 0, float(self.getPtsInside(np.array([centerX]), np.array([centerY]), edgeInxs)[0])
+    us = np.sort(np.concatenate(((np.arange(numBinBound) + ss)[splitFlags], np.arange(numBinBound + 1, dtype=np.float64))))
+    ks = np.minimum(us.astype(np.int64), numBinBound - 1)
+    pxs = vxs[ks] + (us - ks) * exs[ks]
+    pys = vys[ks] + (us - ks) * eys[ks]
+    p0xs = pxs[:-1]
+    p0ys = pys[:-1]
+    p1xs = pxs[1:]
+    p1ys = pys[1:]
+    insideFlags = self.getPtsInside((p0xs + p1xs) / 2.0 + centerX, (p0ys + p1ys) / 2.0 + centerY, edgeInxs) == 1
+    area += 0.5 * np.sum(p0xs[insideFlags] * p1ys[insideFlags] - p1xs[insideFlags] * p0ys[insideFlags])
+    return crossFlag, min(max(area / binArea, 0.0), 1.0)
+
+##-------------------- Test -----
+if __name__ == '__main__':
+  ## Function test
+  numValInBound = 8
+  llBound = [-122.51593,37.75312,-122.4993,37.78031,-122.432803,37.795259,-122.44142,37.752214]  ## in region; small region
+  scanRegion = ZoneScanRegion(numValInBound, llBound, 10, 'S', 43.30127018922193)
+  flags = scanRegion.classifyPts(4180000.0, np.array([545000.0, 547000.0, 550000.0]))
+  #print 'ZoneScanRegion():', scanRegion.numEdge, scanRegion.margin, flags  ## Echo print
@@ -0,0 +1,334 @@
+## utmproj.py
+##
+## Need to install numpy: pip install numpy
+##
+## Input argument: None
+## Test run: python utmproj.py
+##
+## Fuctions:
+## from_latlon(latitude, longitude, force_zone_number = None, force_zone_letter = None)
+##   Input: Latitude, Longitude (float or NumPy array), optional forced zone
+##          number and zone letter
+##   Output: easting, northing, zoneNum, latiBand
+##     Note: Same interface, formulas and errors as utm.from_latlon() (utm
+##           0.7); an array uses the zone and band of its first element.
+##     Note: Float input is computed with math (no NumPy scalar overhead).
+## to_latlon(easting, northing, zone_number, zone_letter = None, northern = None, strict = True)
+##   Input: Easting, Northing (float or NumPy array), zone number, zone letter
+##          or northern flag, optional range check
+##   Output: latitude, longitude
+##     Note: Same interface, formulas and errors as utm.to_latlon().
+## fromLatLons(latis, longis, zoneNumForce = -1)
+##   Input: Latitude array, Longitude array, optional forced zone number
+##   Output: easting array, northing array, zoneNum array, latiBand array
+##     Note: Zone number and band per element (Norway and Svalbard
+##           exceptions included); both hemispheres in one call. Element i is
+##           the same as from_latlon(latis[i], longis[i], zoneNumForce).
+##     Note: No range check; latitude should be in -80 ~ 84.
+## toLatLons(eastings, northings, zoneNums, latiBands)
+##   Input: Easting array, Northing array, zoneNum array (or int), latiBand
+##          array (or letter)
+##   Output: latitude array, longitude array
+##     Note: Element i is the same as to_latlon(eastings[i], northings[i],
+##           zoneNums[i], latiBands[i]); no range check.
+## getZoneNumsFromLLs(latis, longis), getLatiBandsFromLatis(latis)
+##   Zone number and latitude band per element; same rules as utm.
+## OutOfRangeError
+##   Raised for input out of range (subclass of ValueError, as utm).
+## callCounts
+##   None, or [from_latlon count, to_latlon count] updated by every
+##   conversion (batch functions count each element); set by binstats.py.
+##
+
+import math, sys
+import numpy as np
+
+## WGS84 constants; same as utm
+K0 = 0.9996
+
+E = 0.00669438
+E2 = E * E
+E3 = E2 * E
+E_P2 = E / (1.0 - E)
+
+SQRT_E = math.sqrt(1 - E)
+_E = (1 - SQRT_E) / (1 + SQRT_E)
+_E2 = _E * _E
+_E3 = _E2 * _E
+_E4 = _E3 * _E
+_E5 = _E4 * _E
+
+M1 = (1 - E / 4 - 3 * E2 / 64 - 5 * E3 / 256)
+M2 = (3 * E / 8 + 3 * E2 / 32 + 45 * E3 / 1024)
+M3 = (15 * E2 / 256 + 45 * E3 / 1024)
+M4 = (35 * E3 / 3072)
+
+P2 = (3. / 2 * _E - 27. / 32 * _E3 + 269. / 512 * _E5)
+P3 = (21. / 16 * _E2 - 55. / 32 * _E4)
+P4 = (151. / 96 * _E3 - 417. / 128 * _E5)
+P5 = (1097. / 512 * _E4)
+
+R = 6378137
+
+sZoneLetters = 'CDEFGHJKLMNPQRSTUVWXX'  ## Same lookup as utm; 'X' extends to 84N
+zoneLetterArr = np.array(list(sZoneLetters), dtype='S1')
+
+## Per zone constants: central meridian (degrees, radians); zone 61 is longitude 180 (utm auto zone)
+centralLongis = [(zoneNum - 1) * 6 - 180 + 3 for zoneNum in xrange(0, 62)]
+centralLongiRads = np.radians(np.array(centralLongis, dtype=np.float64))
+
+## Conversion counts [from_latlon, to_latlon] while counting (binstats.py); None: not counted
+##   Batch functions (fromLatLons(), toLatLons()) count one per element
+callCounts = None
+
+class OutOfRangeError(ValueError):
+  pass
+
+## Function
+def getMathLib(x):
+  ## NumPy for arrays; math for float
+  if (isinstance(x, np.ndarray)):
+    return np
+  return math
+
+def inBounds(x, lower, upper, upperStrictFlag = 0):
+  if (isinstance(x, np.ndarray)):
+    xMin = np.min(x)
+    xMax = np.max(x)
+  else:
+    xMin = xMax = x
+  if (upperStrictFlag == 1):
+    return (lower <= xMin) and (xMax < upper)
+  return (lower <= xMin) and (xMax <= upper)
+
+def check_valid_zone(zone_number, zone_letter):
+  if not 1 <= zone_number <= 60:
+    raise OutOfRangeError('zone number out of range (must be between 1 and 60)')
+  if zone_letter:
+    zone_letter = zone_letter.upper()
+    if not 'C' <= zone_letter <= 'X' or zone_letter in ['I', 'O']:
+      raise OutOfRangeError('zone letter out of range (must be between C and X)')
+
+def getCentralLongiRad(zoneNum):
+  if ((zoneNum >= 0) and (zoneNum <= 61)):
+    return centralLongiRads[zoneNum]
+  return math.radians((zoneNum - 1) * 6 - 180 + 3)
+
+def modAngle(value):
+  ## Angle in radians to be between -pi and pi
+  return (value + math.pi) % (2 * math.pi) - math.pi
+
+def latlon_to_zone_number(latitude, longitude):
+  ## Same as utm; array uses its first element
+  if (isinstance(latitude, np.ndarray)):
+    latitude = latitude.flat[0]
+  if (isinstance(longitude, np.ndarray)):
+    longitude = longitude.flat[0]
+  if 56 <= latitude < 64 and 3 <= longitude < 12:
+    return 32
+  if 72 <= latitude <= 84 and longitude >= 0:
+    if longitude < 9:
+      return 31
+    elif longitude < 21:
+      return 33
+    elif longitude < 33:
+      return 35
+    elif longitude < 42:
+      return 37
+  return int((longitude + 180) / 6) + 1
+
+def latitude_to_zone_letter(latitude):
+  ## Same as utm; array uses its first element
+  if (isinstance(latitude, np.ndarray)):
+    latitude = latitude.flat[0]
+  if -80 <= latitude <= 84:
+    return sZoneLetters[int(latitude + 80) >> 3]
+  return None
+
+def projectLLToUTM(lib, latitude, longitude, centralLongiRad):
+  ## Transverse Mercator forward; northing without southern false northing
+  lat_rad = lib.radians(latitude)
+  lat_sin = lib.sin(lat_rad)
+  lat_cos = lib.cos(lat_rad)
+
+  lat_tan = lat_sin / lat_cos
+  lat_tan2 = lat_tan * lat_tan
+  lat_tan4 = lat_tan2 * lat_tan2
+
+  lon_rad = lib.radians(longitude)
+
+  n = R / lib.sqrt(1 - E * lat_sin**2)
+  c = E_P2 * lat_cos**2
+
+  a = lat_cos * modAngle(lon_rad - centralLongiRad)
+  a2 = a * a
+  a3 = a2 * a
+  a4 = a3 * a
+  a5 = a4 * a
+  a6 = a5 * a
+
+  m = R * (M1 * lat_rad -
+           M2 * lib.sin(2 * lat_rad) +
+           M3 * lib.sin(4 * lat_rad) -
+           M4 * lib.sin(6 * lat_rad))
+
+  easting = K0 * n * (a +
+                      a3 / 6 * (1 - lat_tan2 + c) +
+                      a5 / 120 * (5 - 18 * lat_tan2 + lat_tan4 + 72 * c - 58 * E_P2)) + 500000
+
+  northing = K0 * (m + n * lat_tan * (a2 / 2 +
+                                      a4 / 24 * (5 - lat_tan2 + 9 * c + 4 * c**2) +
+                                      a6 / 720 * (61 - 58 * lat_tan2 + lat_tan4 + 600 * c - 330 * E_P2)))
+  return easting, northing
+
+def projectUTMToLL(lib, x, y, centralLongiRad):
+  ## Transverse Mercator inverse; x: easting - 500000, y: northing in the northern frame
+  m = y / K0
+  mu = m / (R * M1)
+
+  p_rad = (mu +
+           P2 * lib.sin(2 * mu) +
+           P3 * lib.sin(4 * mu) +
+           P4 * lib.sin(6 * mu) +
+           P5 * lib.sin(8 * mu))
+
+  p_sin = lib.sin(p_rad)
+  p_sin2 = p_sin * p_sin
+
+  p_cos = lib.cos(p_rad)
+
+  p_tan = p_sin / p_cos
+  p_tan2 = p_tan * p_tan
+  p_tan4 = p_tan2 * p_tan2
+
+  ep_sin = 1 - E * p_sin2
+  ep_sin_sqrt = lib.sqrt(1 - E * p_sin2)
+
+  n = R / ep_sin_sqrt
+  r = (1 - E) / ep_sin
+
+  c = E_P2 * p_cos**2
+  c2 = c * c
+
+  d = x / (n * K0)
+  d2 = d * d
+  d3 = d2 * d
+  d4 = d3 * d
+  d5 = d4 * d
+  d6 = d5 * d
+
+  latitude = (p_rad - (p_tan / r) *
+              (d2 / 2 -
+               d4 / 24 * (5 + 3 * p_tan2 + 10 * c - 4 * c2 - 9 * E_P2)) +
+               d6 / 720 * (61 + 90 * p_tan2 + 298 * c + 45 * p_tan4 - 252 * E_P2 - 3 * c2))
+
+  longitude = (d -
+               d3 / 6 * (1 + 2 * p_tan2 + c) +
+               d5 / 120 * (5 - 2 * c + 28 * p_tan2 - 3 * c2 + 8 * E_P2 + 24 * p_tan4)) / p_cos
+
+  longitude = modAngle(longitude + centralLongiRad)
+  return lib.degrees(latitude), lib.degrees(longitude)
+
+##-------------------- Export functions (utm interface) -----
+def from_latlon(latitude, longitude, force_zone_number = None, force_zone_letter = None):
+  if (callCounts is not None):
+    callCounts[0] += 1
+  if not inBounds(latitude, -80.0, 84.0):
+    raise OutOfRangeError('latitude out of range (must be between 80 deg S and 84 deg N)')
+  if not inBounds(longitude, -180.0, 180.0):
+    raise OutOfRangeError('longitude out of range (must be between 180 deg W and 180 deg E)')
+  if force_zone_number is not None:
+    check_valid_zone(force_zone_number, force_zone_letter)
+
+  if force_zone_number is None:
+    zone_number = latlon_to_zone_number(latitude, longitude)
+  else:
+    zone_number = force_zone_number
+  if force_zone_letter is None:
+    zone_letter = latitude_to_zone_letter(latitude)
+  else:
+    zone_letter = force_zone_letter
+
+  easting, northing = projectLLToUTM(getMathLib(latitude), latitude, longitude, getCentralLongiRad(zone_number))
+
+  if (isinstance(latitude, np.ndarray)):
+    if ((np.min(latitude) < 0) and (np.max(latitude) >= 0)):
+      raise ValueError("latitudes must all have the same sign")
+    if (np.max(latitude) < 0):
+      northing += 10000000
+  elif (latitude < 0):
+    northing += 10000000
+  return easting, northing, zone_number, zone_letter
+
+def to_latlon(easting, northing, zone_number, zone_letter = None, northern = None, strict = True):
+  if (callCounts is not None):
+    callCounts[1] += 1
+  if not zone_letter and northern is None:
+    raise ValueError('either zone_letter or northern needs to be set')
+  elif zone_letter and northern is not None:
+    raise ValueError('set either zone_letter or northern, but not both')
+
+  if strict:
+    if not inBounds(easting, 100000, 1000000, 1):
+      raise OutOfRangeError('easting out of range (must be between 100,000 m and 999,999 m)')
+    if not inBounds(northing, 0, 10000000):
+      raise OutOfRangeError('northing out of range (must be between 0 m and 10,000,000 m)')
+  check_valid_zone(zone_number, zone_letter)
+
+  if zone_letter:
+    zone_letter = zone_letter.upper()
+    northern = (zone_letter >= 'N')
+
+  y = northing
+  if not northern:
+    y = y - 10000000
+  return projectUTMToLL(getMathLib(easting), easting - 500000, y, getCentralLongiRad(zone_number))
+
+##-------------------- Batch (NumPy arrays) -----
+def getZoneNumsFromLLs(latis, longis):
+  ## Same rule as utm latlon_to_zone_number(), one value per element (incl. Norway and Svalbard)
+  zoneNums = ((longis + 180.0) / 6).astype(np.int64) + 1
+  norwayFlags = (latis >= 56) & (latis < 64) & (longis >= 3) & (longis < 12)
+  zoneNums[norwayFlags] = 32
+  svalbardFlags = (latis >= 72) & (latis <= 84) & (longis >= 0)
+  zoneNums[svalbardFlags & (longis < 9)] = 31
+  zoneNums[svalbardFlags & (longis >= 9) & (longis < 21)] = 33
+  zoneNums[svalbardFlags & (longis >= 21) & (longis < 33)] = 35
+  zoneNums[svalbardFlags & (longis >= 33) & (longis < 42)] = 37
+  return zoneNums
+
+def getLatiBandsFromLatis(latis):
+  ## Same rule as utm latitude_to_zone_letter(); latis should be in -80 ~ 84
+  bandInx = (latis + 80).astype(np.int64) >> 3
+  return zoneLetterArr[bandInx]
+
+def fromLatLons(latis, longis, zoneNumForce = -1):
+  latis = np.asarray(latis, dtype=np.float64)
+  longis = np.asarray(longis, dtype=np.float64)
+  if (callCounts is not None):
+    callCounts[0] += len(latis)
+  latiBands = getLatiBandsFromLatis(latis)
+  if ((zoneNumForce <= 0) or (zoneNumForce > 60)):
+    zoneNums = getZoneNumsFromLLs(latis, longis)
+  else:
+    zoneNums = np.empty(len(latis), dtype=np.int64)
+    zoneNums[:] = zoneNumForce
+  eastings, northings = projectLLToUTM(np, latis, longis, centralLongiRads[zoneNums])
+  northings[latis < 0] += 10000000
+  return eastings, northings, zoneNums, latiBands
+
+def toLatLons(eastings, northings, zoneNums, latiBands):
+  eastings = np.asarray(eastings, dtype=np.float64)
+  northings = np.asarray(northings, dtype=np.float64)
+  if (callCounts is not None):
+    callCounts[1] += eastings.size
+  southFlags = np.asarray(latiBands) < 'N'
+  ys = np.where(southFlags, northings - 10000000, northings)
+  return projectUTMToLL(np, eastings - 500000, ys, centralLongiRads[np.asarray(zoneNums, dtype=np.int64)])
+
+##-------------------- Test -----
+if __name__ == '__main__':
+  ## Function test
+  easting, northing, zoneNum, latiBand = from_latlon(7.5, 51.2)
+  lati, longi = to_latlon(easting, northing, zoneNum, latiBand)
+  #print 'from_latlon():', easting, northing, zoneNum, latiBand, ':', lati, longi  ## Echo print